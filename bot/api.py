@@ -1,14 +1,24 @@
 import asyncio
+import copy
 import logging
-from typing import Optional
+import time
+from typing import Any, Dict, Hashable, NamedTuple, Optional
 from urllib.parse import quote as quote_url
 
 import aiohttp
+from statsd.client.base import StatsClientBase
 
 from .constants import Keys, URLs
+from .utils.cache import AsyncTTLCache
 
 log = logging.getLogger(__name__)
 
+# The maximum number of cached GET responses.
+RESPONSE_CACHE_SIZE = 512
+
+# How long a stale response is kept after its TTL if it can be revalidated with a conditional request.
+STALE_RESPONSE_TTL = 60 * 60
+
 
 class ResponseCodeError(ValueError):
     """Raised when a non-OK HTTP response is received."""
@@ -29,15 +39,41 @@ class ResponseCodeError(ValueError):
         return f"Status: {self.status} Response: {response}"
 
 
+class CachedResponse(NamedTuple):
+    """A cached GET response of the site API."""
+
+    endpoint: str
+    data: Any
+    fresh_until: float
+    # Headers which turn a request for the resource into a conditional request, e.g. `If-None-Match`.
+    validators: Dict[str, str]
+
+
+def _normalise_endpoint(endpoint: str) -> str:
+    return endpoint.strip("/")
+
+
+def _resources_overlap(first: str, second: str) -> bool:
+    """Return True if one of the endpoints is the other one or a sub-resource of it."""
+    return first == second or first.startswith(second + "/") or second.startswith(first + "/")
+
+
 class APIClient:
-    """Django Site API wrapper."""
+    """
+    Django Site API wrapper.
+
+    GET requests given a `cache_ttl` are cached for that many seconds. When a cached response goes
+    stale and the site sent an `ETag` or `Last-Modified` header with it, it is revalidated with a
+    conditional request rather than fetched again. Any other request to a resource invalidates the
+    cached responses of the resource, its sub-resources, and its parent resources.
+    """
 
     # These are class attributes so they can be seen when being mocked for tests.
     # See commit 22a55534ef13990815a6f69d361e2a12693075d5 for details.
     session: Optional[aiohttp.ClientSession] = None
     loop: asyncio.AbstractEventLoop = None
 
-    def __init__(self, loop: asyncio.AbstractEventLoop, **kwargs):
+    def __init__(self, loop: asyncio.AbstractEventLoop, *, stats: Optional[StatsClientBase] = None, **kwargs):
         auth_headers = {
             'Authorization': f"Token {Keys.site_api}"
         }
@@ -54,6 +90,11 @@ class APIClient:
         self._creation_task = None
         self._default_session_kwargs = kwargs
 
+        self.stats = stats
+        self._cache = AsyncTTLCache(RESPONSE_CACHE_SIZE, ttl=STALE_RESPONSE_TTL)
+        # Incremented on every invalidation, so a response fetched before a write isn't cached after it.
+        self._cache_generation = 0
+
         self.recreate()
 
     @staticmethod
@@ -106,17 +147,108 @@ class APIClient:
                 response_text = await response.text()
                 raise ResponseCodeError(response=response, response_text=response_text)
 
-    async def request(self, method: str, endpoint: str, *, raise_for_status: bool = True, **kwargs) -> dict:
-        """Send an HTTP request to the site API and return the JSON response."""
+    def _incr_stat(self, stat: str) -> None:
+        if self.stats:
+            self.stats.incr(stat)
+
+    @staticmethod
+    def _cache_key(endpoint: str, params: Any) -> Hashable:
+        """Return the key of the cached response to a GET of `endpoint` with the query `params`."""
+        if isinstance(params, dict):
+            params = params.items()
+
+        return _normalise_endpoint(endpoint), tuple(sorted((str(k), str(v)) for k, v in params or ()))
+
+    def invalidate(self, endpoint: str) -> None:
+        """Drop the cached responses of `endpoint`, its sub-resources, and its parent resources."""
+        endpoint = _normalise_endpoint(endpoint)
+        self._cache_generation += 1
+
+        for key in self._cache.keys():
+            if _resources_overlap(endpoint, key[0]):
+                self._cache.pop(key)
+                self._incr_stat("api.cache.invalidate")
+
+    async def _cached_get(self, endpoint: str, cache_ttl: float, raise_for_status: bool, **kwargs) -> Any:
+        """Return the response to a GET of `endpoint`, using and filling the response cache."""
+        key = self._cache_key(endpoint, kwargs.get("params"))
+        cached = self._cache.get(key)
+
+        if cached is not None and cached.fresh_until > time.monotonic():
+            self._incr_stat("api.cache.hit")
+            return copy.deepcopy(cached.data)
+
+        if cached is not None:
+            kwargs["headers"] = {**cached.validators, **kwargs.get("headers", {})}
+
+        generation = self._cache_generation
+        await self._ready.wait()
+
+        async with self.session.get(self._url_for(endpoint), **kwargs) as resp:
+            if cached is not None and resp.status == 304:
+                self._incr_stat("api.cache.revalidate")
+                data = cached.data
+            else:
+                self._incr_stat("api.cache.miss")
+                await self.maybe_raise_for_status(resp, raise_for_status)
+                data = await resp.json()
+
+                if resp.status >= 400:
+                    return data
+
+            validators = {}
+            if "ETag" in resp.headers:
+                validators["If-None-Match"] = resp.headers["ETag"]
+            if "Last-Modified" in resp.headers:
+                validators["If-Modified-Since"] = resp.headers["Last-Modified"]
+
+        if generation == self._cache_generation:
+            entry = CachedResponse(endpoint, data, time.monotonic() + cache_ttl, validators)
+            self._cache.set(key, entry, ttl=cache_ttl + STALE_RESPONSE_TTL if validators else cache_ttl)
+
+        # Callers are free to modify the response, which mustn't change the cached one.
+        return copy.deepcopy(data)
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        raise_for_status: bool = True,
+        cache_ttl: Optional[float] = None,
+        **kwargs
+    ) -> dict:
+        """
+        Send an HTTP request to the site API and return the JSON response.
+
+        If `cache_ttl` is given for a GET request, a cached response up to `cache_ttl` seconds old may
+        be returned instead. Requests with other methods invalidate the cached responses of `endpoint`.
+        """
+        method = method.upper()
+        if method == "GET" and cache_ttl is not None:
+            return await self._cached_get(endpoint, cache_ttl, raise_for_status, **kwargs)
+
         await self._ready.wait()
 
-        async with self.session.request(method.upper(), self._url_for(endpoint), **kwargs) as resp:
+        async with self.session.request(method, self._url_for(endpoint), **kwargs) as resp:
+            if method != "GET":
+                self.invalidate(endpoint)
+
             await self.maybe_raise_for_status(resp, raise_for_status)
             return await resp.json()
 
-    async def get(self, endpoint: str, *, raise_for_status: bool = True, **kwargs) -> dict:
-        """Site API GET."""
-        return await self.request("GET", endpoint, raise_for_status=raise_for_status, **kwargs)
+    async def get(
+        self,
+        endpoint: str,
+        *,
+        raise_for_status: bool = True,
+        cache_ttl: Optional[float] = None,
+        **kwargs
+    ) -> dict:
+        """Site API GET, optionally served from the response cache for up to `cache_ttl` seconds."""
+        return await self.request(
+            "GET", endpoint, raise_for_status=raise_for_status, cache_ttl=cache_ttl, **kwargs
+        )
 
     async def patch(self, endpoint: str, *, raise_for_status: bool = True, **kwargs) -> dict:
         """Site API PATCH."""
@@ -135,6 +267,8 @@ class APIClient:
         await self._ready.wait()
 
         async with self.session.delete(self._url_for(endpoint), **kwargs) as resp:
+            self.invalidate(endpoint)
+
             if resp.status == 204:
                 return None
 
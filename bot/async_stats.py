@@ -1,11 +1,29 @@
 import asyncio
+import logging
 import socket
+from collections import Counter
+from typing import List, Optional
 
 from statsd.client.base import StatsClientBase
 
+log = logging.getLogger(__name__)
+
+# How long metrics are buffered before being sent, in seconds.
+FLUSH_INTERVAL = 0.5
+
+# The largest payload sent in one datagram. This is the size recommended by statsd for networks
+# with a standard 1500 byte MTU, leaving room for the IP and UDP headers.
+MAX_PACKET_SIZE = 1432
+
 
 class AsyncStatsClient(StatsClientBase):
-    """An async transport method for statsd communication."""
+    """
+    An async transport method for statsd communication.
+
+    Metrics are buffered and sent every `FLUSH_INTERVAL` seconds, several to a datagram, or as soon
+    as a full datagram's worth has been buffered. Unsampled `incr` calls for the same stat within
+    that window are summed and sent as a single counter.
+    """
 
     def __init__(
         self,
@@ -22,6 +40,11 @@ class AsyncStatsClient(StatsClientBase):
         self._loop = loop
         self._transport = None
 
+        self._buffer: List[str] = []
+        self._buffer_size = 0
+        self._counters: Counter = Counter()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
     async def create_socket(self) -> None:
         """Use the loop.create_datagram_endpoint method to create a socket."""
         self._transport, _ = await self._loop.create_datagram_endpoint(
@@ -30,10 +53,79 @@ class AsyncStatsClient(StatsClientBase):
             remote_addr=self._addr
         )
 
+    async def close(self) -> None:
+        """Send any buffered metrics and close the socket."""
+        self.flush()
+
+        if self._transport:
+            self._transport.close()
+
+    def incr(self, stat: str, count: int = 1, rate: float = 1) -> None:
+        """Increment a stat by `count`, adding it to any other increments of the stat since the last flush."""
+        if rate < 1:
+            # Sampled counters can't be summed, as each increment has to be scaled by its own rate.
+            super().incr(stat, count, rate)
+            return
+
+        self._counters[stat] += count
+        self._schedule_flush()
+
     def _send(self, data: str) -> None:
-        """Start an async task to send data to statsd."""
-        self._loop.create_task(self._async_send(data))
+        """Add a metric to the buffer, sending the buffer first if the metric wouldn't fit in the same datagram."""
+        if self._buffer and self._buffer_size + len(data) > MAX_PACKET_SIZE:
+            self.flush()
+
+        self._buffer.append(data)
+        self._buffer_size += len(data) + 1
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Schedule the buffer to be sent after `FLUSH_INTERVAL` unless it already is."""
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(FLUSH_INTERVAL, self.flush)
+
+    def flush(self) -> None:
+        """Send all buffered metrics, packing as many of them into each datagram as fit."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        metrics = self._buffer
+        for stat, count in self._counters.items():
+            metrics.append(self._prepare(stat, f"{count}|c", 1))
+
+        self._buffer = []
+        self._buffer_size = 0
+        self._counters.clear()
+
+        if not metrics:
+            return
+
+        if self._transport is None:
+            log.debug(f"Dropping {len(metrics)} metrics because the statsd socket isn't open.")
+            return
+
+        for packet in self._pack(metrics):
+            self._transport.sendto(packet.encode('ascii'), self._addr)
+
+    @staticmethod
+    def _pack(metrics: List[str]) -> List[str]:
+        """Join `metrics` with newlines into packets of at most `MAX_PACKET_SIZE` bytes where possible."""
+        packets = []
+        packet = []
+        size = 0
+
+        for metric in metrics:
+            # A metric longer than a whole packet is still sent, on its own.
+            if packet and size + len(metric) > MAX_PACKET_SIZE:
+                packets.append("\n".join(packet))
+                packet = []
+                size = 0
+
+            packet.append(metric)
+            size += len(metric) + 1
+
+        if packet:
+            packets.append("\n".join(packet))
 
-    async def _async_send(self, data: str) -> None:
-        """Send data to the statsd server using the async transport."""
-        self._transport.sendto(data.encode('ascii'), self._addr)
+        return packets
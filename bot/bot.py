@@ -2,7 +2,7 @@ import asyncio
 import logging
 import socket
 import warnings
-from typing import Optional
+from typing import List, Optional
 
 import aiohttp
 import discord
@@ -26,13 +26,6 @@ class Bot(commands.Bot):
 
         super().__init__(*args, **kwargs)
 
-        self.http_session: Optional[aiohttp.ClientSession] = None
-        self.api_client = api.APIClient(loop=self.loop)
-
-        self._connector = None
-        self._resolver = None
-        self._guild_available = asyncio.Event()
-
         statsd_url = constants.Stats.statsd_host
 
         if DEBUG_MODE:
@@ -43,6 +36,16 @@ class Bot(commands.Bot):
 
         self.stats = AsyncStatsClient(self.loop, statsd_url, 8125, prefix="bot")
 
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self.api_client = api.APIClient(loop=self.loop, stats=self.stats)
+
+        self._connector = None
+        self._resolver = None
+        self._guild_available = asyncio.Event()
+
+        # Tasks which are awaited when the bot is closed, before the API client is closed.
+        self.closing_tasks: List[asyncio.Task] = []
+
     def add_cog(self, cog: commands.Cog) -> None:
         """Adds a "cog" to the bot and logs the operation."""
         super().add_cog(cog)
@@ -63,6 +66,12 @@ class Bot(commands.Bot):
         """Close the Discord connection and the aiohttp session, connector, statsd client, and resolver."""
         await super().close()
 
+        # Unloading the cogs above may have started tasks which still need the API client.
+        for result in await asyncio.gather(*self.closing_tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                log.error("A task failed while closing the bot.", exc_info=result)
+        self.closing_tasks.clear()
+
         await self.api_client.close()
 
         if self.http_session:
@@ -74,8 +83,7 @@ class Bot(commands.Bot):
         if self._resolver:
             await self._resolver.close()
 
-        if self.stats._transport:
-            await self.stats._transport.close()
+        await self.stats.close()
 
     async def login(self, *args, **kwargs) -> None:
         """Re-create the connector and set up sessions before logging into Discord."""
@@ -2,11 +2,11 @@ import asyncio
 import logging
 from collections.abc import Mapping
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from operator import itemgetter
 from typing import Dict, Iterable, List, Set
 
-from discord import Colour, Member, Message, NotFound, Object, TextChannel
+from discord import (
+    Colour, Member, Message, NotFound, Object, RawBulkMessageDeleteEvent, RawMessageDeleteEvent, TextChannel
+)
 from discord.ext.commands import Cog
 
 from bot import rules
@@ -19,11 +19,15 @@ from bot.constants import (
     STAFF_ROLES,
 )
 from bot.converters import Duration
+from bot.rules.engine import RuleEngine
 from bot.utils.messages import send_attachments
 
 
 log = logging.getLogger(__name__)
 
+# Upper bound on the number of messages counted per channel, regardless of how recent they are.
+MAX_CACHED_MESSAGES = 1000
+
 RULE_FUNCTION_MAPPING = {
     'attachments': rules.apply_attachments,
     'burst': rules.apply_burst,
@@ -114,6 +118,12 @@ class AntiSpam(Cog):
 
         self.message_deletion_queue = dict()
 
+        # Invalid rules are left out; the cog unloads itself once the validation errors are reported.
+        valid_rules = {
+            name: config for name, config in AntiSpamConfig.rules.items() if name not in validation_errors
+        }
+        self.engine = RuleEngine(valid_rules, RULE_FUNCTION_MAPPING, maxlen=MAX_CACHED_MESSAGES)
+
         self.bot.loop.create_task(self.alert_on_validation_error())
 
     @property
@@ -143,37 +153,21 @@ class AntiSpam(Cog):
     @Cog.listener()
     async def on_message(self, message: Message) -> None:
         """Applies the antispam rules to each received message."""
+        if not message.guild or message.guild.id != GuildConfig.id or message.author.bot:
+            return
+
+        # Every user message is cached, even those which are exempt from the rules themselves,
+        # since they still count towards rules such as `burst_shared`.
+        self.engine.add(message)
+
         if (
-            not message.guild or message.guild.id != GuildConfig.id or message.author.bot or (
-                message.channel.id in Filter.channel_whitelist and not DEBUG_MODE
-            ) or (any(role.id in STAFF_ROLES for role in message.author.roles) and not DEBUG_MODE)
+            (message.channel.id in Filter.channel_whitelist and not DEBUG_MODE)
+            or (any(role.id in STAFF_ROLES for role in message.author.roles) and not DEBUG_MODE)
         ):
             return
 
-        # Fetch the rule configuration with the highest rule interval.
-        max_interval_config = max(
-            AntiSpamConfig.rules.values(),
-            key=itemgetter('interval')
-        )
-        max_interval = max_interval_config['interval']
-
-        # Store history messages since `interval` seconds ago in a list to prevent unnecessary API calls.
-        earliest_relevant_at = datetime.utcnow() - timedelta(seconds=max_interval)
-        relevant_messages = [
-            msg async for msg in message.channel.history(after=earliest_relevant_at, oldest_first=False)
-            if not msg.author.bot
-        ]
-
-        for rule_name in AntiSpamConfig.rules:
-            rule_config = AntiSpamConfig.rules[rule_name]
-            rule_function = RULE_FUNCTION_MAPPING[rule_name]
-
-            # Create a list of messages that were sent in the interval that the rule cares about.
-            latest_interesting_stamp = datetime.utcnow() - timedelta(seconds=rule_config['interval'])
-            messages_for_rule = [
-                msg for msg in relevant_messages if msg.created_at > latest_interesting_stamp
-            ]
-            result = await rule_function(message, messages_for_rule, rule_config)
+        for rule_name in self.engine.rules:
+            result = await self.engine.apply(rule_name, message)
 
             # If the rule returns `None`, that means the message didn't violate it.
             # If it doesn't, it returns a tuple in the form `(str, Iterable[discord.Member])`
@@ -209,6 +203,21 @@ class AntiSpam(Cog):
                 await self.maybe_delete_messages(channel, relevant_messages)
                 break
 
+    @Cog.listener()
+    async def on_message_edit(self, _: Message, after: Message) -> None:
+        """Keep the cached copy of edited messages up to date."""
+        self.engine.update(after)
+
+    @Cog.listener()
+    async def on_raw_message_delete(self, payload: RawMessageDeleteEvent) -> None:
+        """Remove deleted messages from the cache."""
+        self.engine.remove(payload.channel_id, payload.message_id)
+
+    @Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: RawBulkMessageDeleteEvent) -> None:
+        """Remove bulk deleted messages from the cache."""
+        self.engine.remove(payload.channel_id, *payload.message_ids)
+
     async def punish(self, msg: Message, member: Member, reason: str) -> None:
         """Punishes the given member for triggering an antispam rule."""
         if not any(role.id == self.muted_role.id for role in member.roles):
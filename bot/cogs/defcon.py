@@ -28,6 +28,8 @@ will be resolved soon. In the meantime, please feel free to peruse the resources
 
 BASE_CHANNEL_TOPIC = "Python Discord Defense Mechanism"
 
+SETTINGS_CACHE_TTL = 5 * 60  # Seconds; updating the settings clears the cached ones.
+
 
 class Action(Enum):
     """Defcon Action."""
@@ -63,7 +65,7 @@ class Defcon(Cog):
         self.channel = await self.bot.fetch_channel(Channels.defcon)
 
         try:
-            response = await self.bot.api_client.get('bot/bot-settings/defcon')
+            response = await self.bot.api_client.get('bot/bot-settings/defcon', cache_ttl=SETTINGS_CACHE_TTL)
             data = response['data']
 
         except Exception:  # Yikes!
@@ -127,7 +129,7 @@ class Defcon(Cog):
     async def _defcon_action(self, ctx: Context, days: int, action: Action) -> None:
         """Providing a structured way to do an defcon action."""
         try:
-            response = await self.bot.api_client.get('bot/bot-settings/defcon')
+            response = await self.bot.api_client.get('bot/bot-settings/defcon', cache_ttl=SETTINGS_CACHE_TTL)
             data = response['data']
 
             if "enable_date" in data and action is Action.DISABLED:
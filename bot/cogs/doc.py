@@ -1,42 +1,38 @@
 import asyncio
 import functools
+import itertools
+import json
 import logging
 import re
 import textwrap
-from collections import OrderedDict
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
-from types import SimpleNamespace
-from typing import Any, Callable, Optional, Tuple
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urldefrag
 
+import aiohttp
 import discord
 from bs4 import BeautifulSoup
 from bs4.element import PageElement, Tag
 from discord.errors import NotFound
 from discord.ext import commands
 from markdownify import MarkdownConverter
-from requests import ConnectTimeout, ConnectionError, HTTPError
-from sphinx.ext import intersphinx
-from urllib3.exceptions import ProtocolError
 
 from bot.bot import Bot
 from bot.constants import MODERATION_ROLES, RedirectOutput
 from bot.converters import ValidPythonIdentifier, ValidURL
 from bot.decorators import with_role
 from bot.pagination import LinePaginator
+from bot.utils.cache import AsyncTTLCache, async_cache
+from bot.utils.inventory_cache import CachedInventory, InventoryCache, InventoryDecoder
+from bot.utils.trigrams import TrigramIndex
 
 
 log = logging.getLogger(__name__)
-logging.getLogger('urllib3').setLevel(logging.WARNING)
-
-# Since Intersphinx is intended to be used with Sphinx,
-# we need to mock its configuration.
-SPHINX_MOCK_APP = SimpleNamespace(
-    config=SimpleNamespace(
-        intersphinx_timeout=3,
-        tls_verify=True,
-        user_agent="python3:python-discord/bot:1.0.0"
-    )
-)
+
+USER_AGENT = "python3:python-discord/bot:1.0.0"
 
 NO_OVERRIDE_GROUPS = (
     "2to3fixer",
@@ -62,37 +58,64 @@ SEARCH_END_TAG_ATTRS = (
 UNWANTED_SIGNATURE_SYMBOLS_RE = re.compile(r"\[source]|\\\\|¶")
 WHITESPACE_AFTER_NEWLINES_RE = re.compile(r"(?<=\n\n)(\s+)")
 
-FAILED_REQUEST_RETRY_AMOUNT = 3
 NOT_FOUND_DELETE_DELAY = RedirectOutput.delete_delay
 
+# Where downloaded inventories are kept between restarts.
+INVENTORY_CACHE_DIRECTORY = Path("data", "doc", "inventories")
 
-def async_cache(max_size: int = 128, arg_offset: int = 0) -> Callable:
-    """
-    LRU cache implementation for coroutines.
+# Inventories are downloaded in chunks of this many bytes, each decoded as soon as it arrives.
+INVENTORY_CHUNK_SIZE = 16 * 1024
+INVENTORY_TIMEOUT = aiohttp.ClientTimeout(total=30, sock_connect=3)
 
-    Once the cache exceeds the maximum size, keys are deleted in FIFO order.
+# The number of inventories downloaded at the same time.
+MAX_CONCURRENT_FETCHES = 4
+
+# Failed downloads are attempted this many times in total, waiting `FETCH_BACKOFF` seconds before the
+# second attempt and twice as long before each attempt after that.
+FETCH_ATTEMPTS = 4
+FETCH_BACKOFF = 1
+
+# Limits of the cache of rendered symbol embeds, which is also cleared when the inventory is refreshed.
+# The size of an embed is the number of characters in it.
+SYMBOL_CACHE_SIZE = 512
+SYMBOL_CACHE_MAX_BYTES = 2 * 1024 * 1024
+SYMBOL_CACHE_TTL = 6 * 60 * 60
+SYMBOL_CACHE_NEGATIVE_TTL = 60
+
+# Parsing and rendering documentation pages is done by this many threads, so it doesn't block the
+# event loop. Once this many jobs are queued or running, new jobs wait for one of them to finish.
+PARSER_THREADS = 2
+MAX_PENDING_PARSES = 8
+
+# The sections scraped from a page are kept, so that looking up several symbols on the same page downloads
+# and parses it once. The size of a page is the number of characters in its sections.
+PAGE_CACHE_SIZE = 16
+PAGE_CACHE_MAX_BYTES = 4 * 1024 * 1024
+PAGE_CACHE_TTL = SYMBOL_CACHE_TTL
+
+# After the inventory is refreshed, the embeds of this many of the most requested symbols are rendered
+# ahead of time, so they're cached before anyone asks for them. Set to 0 to disable the warm-up.
+WARM_UP_SYMBOLS = 50
+
+# The number of requests of each symbol is kept in this file between restarts. Only the counts of
+# the `MAX_TRACKED_SYMBOLS` most requested symbols are kept.
+SYMBOL_REQUESTS_PATH = Path("data", "doc", "symbol_requests.json")
+MAX_TRACKED_SYMBOLS = 1000
+
+# The number of similar symbols suggested when a symbol isn't found.
+MAX_SUGGESTIONS = 5
 
-    An offset may be optionally provided to be applied to the coroutine's arguments when creating the cache key.
-    """
-    # Assign the cache to the function itself so we can clear it from outside.
-    async_cache.cache = OrderedDict()
 
-    def decorator(function: Callable) -> Callable:
-        """Define the async_cache decorator."""
-        @functools.wraps(function)
-        async def wrapper(*args) -> Any:
-            """Decorator wrapper for the caching logic."""
-            key = ':'.join(args[arg_offset:])
+# The signatures and description of each symbol on a documentation page, by the ID of its section.
+PageSections = Dict[str, Tuple[Optional[List[str]], str]]
 
-            value = async_cache.cache.get(key)
-            if value is None:
-                if len(async_cache.cache) > max_size:
-                    async_cache.cache.popitem(last=False)
 
-                async_cache.cache[key] = await function(*args)
-            return async_cache.cache[key]
-        return wrapper
-    return decorator
+def page_size(sections: PageSections) -> int:
+    """Return the number of characters in the scraped `sections` of a page."""
+    return sum(
+        len(symbol_id) + len(description) + sum(map(len, signatures or ()))
+        for symbol_id, (signatures, description) in sections.items()
+    )
 
 
 class DocMarkdownConverter(MarkdownConverter):
@@ -113,6 +136,42 @@ def markdownify(html: str) -> DocMarkdownConverter:
     return DocMarkdownConverter(bullets='•').convert(html)
 
 
+class DownloadedInventory(NamedTuple):
+    """An inventory downloaded by `download_inventory`."""
+
+    data: bytes
+    inventory: dict
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+async def download_inventory(
+    session: aiohttp.ClientSession, url: str, headers: Optional[Dict[str, str]] = None
+) -> Optional[DownloadedInventory]:
+    """
+    Download and decode the inventory at `url`, or return None if the server responds with 304.
+
+    Raise `aiohttp.ClientError` or `asyncio.TimeoutError` if the download fails, and ValueError if
+    the inventory isn't valid.
+    """
+    headers = {"User-Agent": USER_AGENT, **(headers or {})}
+    async with session.get(url, headers=headers, timeout=INVENTORY_TIMEOUT) as response:
+        if response.status == 304:
+            return None
+        response.raise_for_status()
+
+        decoder = InventoryDecoder()
+        async for chunk in response.content.iter_chunked(INVENTORY_CHUNK_SIZE):
+            decoder.feed(chunk)
+
+        return DownloadedInventory(
+            decoder.data,
+            decoder.close(),
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+
+
 class InventoryURL(commands.Converter):
     """
     Represents an Intersphinx inventory URL.
@@ -127,10 +186,8 @@ class InventoryURL(commands.Converter):
     async def convert(ctx: commands.Context, url: str) -> str:
         """Convert url to Intersphinx inventory URL."""
         try:
-            intersphinx.fetch_inventory(SPHINX_MOCK_APP, '', url)
-        except AttributeError:
-            raise commands.BadArgument(f"Failed to fetch Intersphinx inventory from URL `{url}`.")
-        except ConnectionError:
+            await download_inventory(ctx.bot.http_session, url)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
             if url.startswith('https'):
                 raise commands.BadArgument(
                     f"Cannot establish a connection to `{url}`. Does it support HTTPS?"
@@ -141,6 +198,8 @@ class InventoryURL(commands.Converter):
                 f"Failed to read Intersphinx inventory from URL `{url}`. "
                 "Are you sure that it's a valid inventory file?"
             )
+        except aiohttp.ClientError:
+            raise commands.BadArgument(f"Failed to fetch Intersphinx inventory from URL `{url}`.")
         return url
 
 
@@ -152,33 +211,90 @@ class Doc(commands.Cog):
         self.bot = bot
         self.inventories = {}
         self.renamed_symbols = set()
+        self.symbol_index = TrigramIndex(())
+
+        self.inventory_cache = InventoryCache(INVENTORY_CACHE_DIRECTORY)
+        # Maps inventory URLs to the digest and parsed contents of the inventory last read from them,
+        # so that an inventory which didn't change isn't parsed again.
+        self._parsed_inventories: Dict[str, Tuple[str, dict]] = {}
+        self._fetch_slots = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+        self._parser = ThreadPoolExecutor(PARSER_THREADS, thread_name_prefix="doc-parser")
+        self._parse_slots = asyncio.Semaphore(MAX_PENDING_PARSES)
+        self._pages = AsyncTTLCache(PAGE_CACHE_SIZE, PAGE_CACHE_TTL, max_bytes=PAGE_CACHE_MAX_BYTES, sizeof=page_size)
+
+        self.symbol_requests = self._load_symbol_requests()
+        self._warm_up_task: Optional[asyncio.Task] = None
 
         self.bot.loop.create_task(self.init_refresh_inventory())
 
+    def cog_unload(self) -> None:
+        """Save the symbol request counts and stop the background work."""
+        if self._warm_up_task:
+            self._warm_up_task.cancel()
+
+        self._save_symbol_requests()
+        self._parser.shutdown(wait=False)
+
+    @staticmethod
+    def _load_symbol_requests() -> Counter:
+        """Return the symbol request counts saved on the last shutdown."""
+        try:
+            with SYMBOL_REQUESTS_PATH.open(encoding="utf-8") as file:
+                return Counter({str(symbol): int(count) for symbol, count in json.load(file).items()})
+        except FileNotFoundError:
+            return Counter()
+        except (OSError, ValueError, TypeError, AttributeError):
+            log.warning("Failed to read the symbol request counts; starting from zero.", exc_info=True)
+            return Counter()
+
+    def _save_symbol_requests(self) -> None:
+        """Write the counts of the most requested symbols to disk."""
+        data = dict(self.symbol_requests.most_common(MAX_TRACKED_SYMBOLS))
+
+        SYMBOL_REQUESTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = SYMBOL_REQUESTS_PATH.with_suffix(".tmp")
+        with temp_path.open("w", encoding="utf-8") as file:
+            json.dump(data, file)
+        temp_path.replace(SYMBOL_REQUESTS_PATH)
+
+    async def warm_up(self) -> None:
+        """Render the embeds of the most requested symbols into the cache, most requested first."""
+        symbols = [
+            symbol for symbol, _ in self.symbol_requests.most_common(MAX_TRACKED_SYMBOLS)
+            if symbol in self.inventories
+        ][:WARM_UP_SYMBOLS]
+
+        log.debug(f"Warming up the documentation cache with {len(symbols)} symbols.")
+        for symbol in symbols:
+            try:
+                await self.get_symbol_embed(symbol)
+            except Exception:
+                log.warning(f"Failed to render the documentation of `{symbol}` during warm-up.", exc_info=True)
+
+        log.debug("Finished warming up the documentation cache.")
+
     async def init_refresh_inventory(self) -> None:
-        """Refresh documentation inventory on cog initialization."""
+        """
+        Refresh documentation inventory on cog initialization.
+
+        The inventories cached on disk are loaded first, so that lookups work right away, and are
+        then refreshed from the network.
+        """
         await self.bot.wait_until_guild_available()
+        await self.refresh_inventory(offline=True)
         await self.refresh_inventory()
 
-    async def update_single(
-        self, package_name: str, base_url: str, inventory_url: str
-    ) -> None:
+    def update_single(self, package_name: str, base_url: str, package: dict) -> None:
         """
-        Rebuild the inventory for a single package.
+        Add the symbols of a single package to the inventory.
 
         Where:
             * `package_name` is the package name to use, appears in the log
             * `base_url` is the root documentation URL for the specified package, used to build
                 absolute paths that link to specific symbols
-            * `inventory_url` is the absolute URL to the intersphinx inventory, fetched by running
-                `intersphinx.fetch_inventory` in an executor on the bot's event loop
+            * `package` is the parsed intersphinx inventory of the package
         """
-        self.base_urls[package_name] = base_url
-
-        package = await self._fetch_inventory(inventory_url)
-        if not package:
-            return None
-
         for group, value in package.items():
             for symbol, (package_name, _version, relative_doc_url, _) in value.items():
                 absolute_doc_url = base_url + relative_doc_url
@@ -203,28 +319,56 @@ class Doc(commands.Cog):
 
                 self.inventories[symbol] = absolute_doc_url
 
-        log.trace(f"Fetched inventory for {package_name}.")
+        log.trace(f"Added inventory for {package_name}.")
 
-    async def refresh_inventory(self) -> None:
-        """Refresh internal documentation inventory."""
+    async def refresh_inventory(self, offline: bool = False) -> None:
+        """
+        Refresh internal documentation inventory.
+
+        Inventories are only downloaded again if the server reports that they changed since they
+        were cached, and only parsed again if their contents changed. If `offline` is True, only
+        the cached inventories are used.
+        """
         log.debug("Refreshing documentation inventory...")
+        packages = await self.bot.api_client.get('bot/documentation-links')
+
+        # Run all coroutines concurrently - since each of them may perform a HTTP
+        # request, this speeds up fetching the inventory data heavily.
+        inventories = await asyncio.gather(*(
+            self._get_inventory(package["inventory_url"], offline=offline) for package in packages
+        ))
+
+        old_symbols = (dict(self.inventories), set(self.renamed_symbols))
 
         # Clear the old base URLS and inventories to ensure
         # that we start from a fresh local dataset.
-        # Also, reset the cache used for fetching documentation.
         self.base_urls.clear()
         self.inventories.clear()
         self.renamed_symbols.clear()
-        async_cache.cache = OrderedDict()
 
-        # Run all coroutines concurrently - since each of them performs a HTTP
-        # request, this speeds up fetching the inventory data heavily.
-        coros = [
-            self.update_single(
-                package["package"], package["base_url"], package["inventory_url"]
-            ) for package in await self.bot.api_client.get('bot/documentation-links')
-        ]
-        await asyncio.gather(*coros)
+        for package, inventory in zip(packages, inventories):
+            self.base_urls[package["package"]] = package["base_url"]
+            if inventory:
+                self.update_single(package["package"], package["base_url"], inventory)
+
+        # Reset the cache used for fetching documentation, unless the inventory stayed the same.
+        if (self.inventories, self.renamed_symbols) != old_symbols:
+            log.trace("The documentation inventory changed; clearing the documentation cache.")
+            self.get_symbol_embed.cache.clear()
+            self._pages.clear()
+
+            self.symbol_index = await self.bot.loop.run_in_executor(None, TrigramIndex, list(self.inventories))
+
+        if WARM_UP_SYMBOLS:
+            if self._warm_up_task:
+                self._warm_up_task.cancel()
+            self._warm_up_task = self.bot.loop.create_task(self.warm_up())
+
+        if not offline:
+            urls = {package["inventory_url"] for package in packages}
+            for url in self._parsed_inventories.keys() - urls:
+                del self._parsed_inventories[url]
+            await self.bot.loop.run_in_executor(None, self.inventory_cache.prune, urls)
 
     async def get_symbol_html(self, symbol: str) -> Optional[Tuple[list, str]]:
         """
@@ -240,47 +384,90 @@ class Doc(commands.Cog):
         if url is None:
             return None
 
+        page_url, symbol_id = urldefrag(url)
+        sections = await self._pages.get_or_fetch(page_url, functools.partial(self._fetch_page, page_url))
+        return sections.get(symbol_id)
+
+    async def _run_in_parser(self, func: Callable, *args) -> Any:
+        """Run `func` with `args` in a parser thread, waiting for a free slot in the queue first."""
+        async with self._parse_slots:
+            return await self.bot.loop.run_in_executor(self._parser, func, *args)
+
+    async def _fetch_page(self, url: str) -> PageSections:
+        """Download the documentation page at `url` and scrape its sections in a parser thread."""
+        log.trace(f"Fetching documentation page {url}.")
         async with self.bot.http_session.get(url) as response:
             html = await response.text(encoding='utf-8')
 
-        # Find the signature header and parse the relevant parts.
-        symbol_id = url.split('#')[-1]
+        return await self._run_in_parser(self._scrape_page, html)
+
+    @classmethod
+    def _scrape_page(cls, html: str) -> PageSections:
+        """Return the signatures and description of every symbol on the page `html`, by their IDs."""
         soup = BeautifulSoup(html, 'lxml')
-        symbol_heading = soup.find(id=symbol_id)
         search_html = str(soup)
+        sections = {}
 
-        if symbol_heading is None:
-            return None
+        for symbol_heading in soup.find_all(id=True):
+            symbol_id = symbol_heading["id"]
 
-        if symbol_id == f"module-{symbol}":
-            # Get page content from the module headerlink to the
-            # first tag that has its class in `SEARCH_END_TAG_ATTRS`
-            start_tag = symbol_heading.find("a", attrs={"class": "headerlink"})
-            if start_tag is None:
-                return [], ""
-
-            end_tag = start_tag.find_next(self._match_end_tag)
-            if end_tag is None:
-                return [], ""
+            if symbol_heading.name == "dt":
+                sections[symbol_id] = cls._scrape_definition(symbol_heading)
+            elif symbol_id.startswith("module-"):
+                sections[symbol_id] = cls._scrape_module(symbol_heading, search_html)
+            else:
+                # Anything else, like a section label, isn't tied to a specific symbol.
+                sections[symbol_id] = ([], "")
 
-            description_start_index = search_html.find(str(start_tag.parent)) + len(str(start_tag.parent))
-            description_end_index = search_html.find(str(end_tag))
-            description = search_html[description_start_index:description_end_index]
-            signatures = None
+        return sections
 
-        else:
-            signatures = []
-            description = str(symbol_heading.find_next_sibling("dd"))
-            description_pos = search_html.find(description)
-            # Get text of up to 3 signatures, remove unwanted symbols
-            for element in [symbol_heading] + symbol_heading.find_next_siblings("dt", limit=2):
+    @staticmethod
+    def _scrape_definition(symbol_heading: Tag) -> Tuple[List[str], str]:
+        """Return the signatures and description of the symbol defined by the `dt` tag `symbol_heading`."""
+        signatures = []
+        description = ""
+        signature_tags = 0
+
+        # Get text of up to 3 signatures before the description, remove unwanted symbols
+        for element in itertools.chain([symbol_heading], symbol_heading.next_siblings):
+            if element.name == "dd":
+                description = str(element)
+                break
+
+            if element.name == "dt" and signature_tags < 3:
+                signature_tags += 1
                 signature = UNWANTED_SIGNATURE_SYMBOLS_RE.sub("", element.text)
-                if signature and search_html.find(str(element)) < description_pos:
+                if signature:
                     signatures.append(signature)
 
         return signatures, description.replace('¶', '')
 
-    @async_cache(arg_offset=1)
+    @classmethod
+    def _scrape_module(cls, symbol_heading: Tag, search_html: str) -> Tuple[Optional[List[str]], str]:
+        """Return the description of the module whose section is `symbol_heading` in the page `search_html`."""
+        # Get page content from the module headerlink to the
+        # first tag that has its class in `SEARCH_END_TAG_ATTRS`
+        start_tag = symbol_heading.find("a", attrs={"class": "headerlink"})
+        if start_tag is None:
+            return [], ""
+
+        end_tag = start_tag.find_next(cls._match_end_tag)
+        if end_tag is None:
+            return [], ""
+
+        description_start_index = search_html.find(str(start_tag.parent)) + len(str(start_tag.parent))
+        description_end_index = search_html.find(str(end_tag))
+        description = search_html[description_start_index:description_end_index]
+        return None, description.replace('¶', '')
+
+    @async_cache(
+        SYMBOL_CACHE_SIZE,
+        SYMBOL_CACHE_TTL,
+        SYMBOL_CACHE_NEGATIVE_TTL,
+        max_bytes=SYMBOL_CACHE_MAX_BYTES,
+        sizeof=lambda embed: len(embed) if embed else 0,
+        arg_offset=1,
+    )
     async def get_symbol_embed(self, symbol: str) -> Optional[discord.Embed]:
         """
         Attempt to scrape and fetch the data for the given `symbol`, and build an embed from its contents.
@@ -293,7 +480,7 @@ class Doc(commands.Cog):
 
         signatures = scraped_html[0]
         permalink = self.inventories[symbol]
-        description = markdownify(scraped_html[1])
+        description = await self._run_in_parser(markdownify, scraped_html[1])
 
         # Truncate the description of the embed to the last occurrence
         # of a double newline (interpreted as a paragraph) before index 1000.
@@ -382,8 +569,14 @@ class Doc(commands.Cog):
                 doc_embed = await self.get_symbol_embed(symbol)
 
             if doc_embed is None:
+                description = f"Sorry, I could not find any documentation for `{symbol}`."
+                if symbol not in self.inventories:
+                    suggestions = self.symbol_index.search(symbol, MAX_SUGGESTIONS)
+                    if suggestions:
+                        description += "\nDid you mean: " + ", ".join(f"`{match}`" for match in suggestions)
+
                 error_embed = discord.Embed(
-                    description=f"Sorry, I could not find any documentation for `{symbol}`.",
+                    description=description,
                     colour=discord.Colour.red()
                 )
                 error_message = await ctx.send(embed=error_embed)
@@ -391,6 +584,7 @@ class Doc(commands.Cog):
                     await error_message.delete(delay=NOT_FOUND_DELETE_DELAY)
                     await ctx.message.delete(delay=NOT_FOUND_DELETE_DELAY)
             else:
+                self.symbol_requests[symbol] += 1
                 await ctx.send(embed=doc_embed)
 
     @docs_group.command(name='set', aliases=('s',))
@@ -469,31 +663,94 @@ class Doc(commands.Cog):
         )
         await ctx.send(embed=embed)
 
-    async def _fetch_inventory(self, inventory_url: str) -> Optional[dict]:
-        """Get and return inventory from `inventory_url`. If fetching fails, return None."""
-        fetch_func = functools.partial(intersphinx.fetch_inventory, SPHINX_MOCK_APP, '', inventory_url)
-        for retry in range(1, FAILED_REQUEST_RETRY_AMOUNT + 1):
+    async def _get_inventory(self, inventory_url: str, offline: bool = False) -> Optional[dict]:
+        """
+        Return the parsed inventory from `inventory_url`, or None if it isn't available.
+
+        Unless `offline` is True, the cached inventory is first refreshed from the network. If that
+        fails, the cached inventory is used, even if it may be outdated.
+        """
+        entry = await self.bot.loop.run_in_executor(None, self.inventory_cache.get, inventory_url)
+        if not offline:
+            entry = await self._fetch_inventory(inventory_url, entry) or entry
+
+        if entry is None:
+            return None
+
+        parsed = self._parsed_inventories.get(inventory_url)
+        if parsed and parsed[0] == entry.digest:
+            log.trace(f"Inventory {inventory_url} didn't change; reusing it.")
+            return parsed[1]
+
+        try:
+            package = await self.bot.loop.run_in_executor(None, self.inventory_cache.load, entry)
+        except (OSError, ValueError):
+            log.warning(f"Failed to load the cached inventory {inventory_url}.", exc_info=True)
+            return None
+
+        self._parsed_inventories[inventory_url] = (entry.digest, package)
+        return package
+
+    async def _download_inventory(self, inventory_url: str, entry: Optional[CachedInventory]) -> CachedInventory:
+        """
+        Download the inventory from `inventory_url` into the cache and return its cache entry.
+
+        If the inventory didn't change since `entry` was cached, it isn't downloaded again.
+        """
+        headers = entry.conditional_headers if entry else {}
+        async with self._fetch_slots:
+            downloaded = await download_inventory(self.bot.http_session, inventory_url, headers)
+
+        if downloaded is None:
+            log.trace(f"Inventory {inventory_url} wasn't modified.")
+            return entry
+
+        entry = await self.bot.loop.run_in_executor(
+            None,
+            self.inventory_cache.store,
+            inventory_url,
+            downloaded.data,
+            downloaded.etag,
+            downloaded.last_modified,
+        )
+
+        # The inventory was parsed while it was downloaded, so it doesn't need to be parsed from the cache.
+        self._parsed_inventories[inventory_url] = (entry.digest, downloaded.inventory)
+        return entry
+
+    async def _fetch_inventory(self, inventory_url: str, entry: Optional[CachedInventory]) -> Optional[CachedInventory]:
+        """
+        Refresh the cached inventory `entry` from `inventory_url`. If fetching fails, return None.
+
+        Timeouts, connection errors, and server errors are retried with an exponential backoff.
+        """
+        for attempt in range(1, FETCH_ATTEMPTS + 1):
             try:
-                package = await self.bot.loop.run_in_executor(None, fetch_func)
-            except ConnectTimeout:
-                log.error(
-                    f"Fetching of inventory {inventory_url} timed out,"
-                    f" trying again. ({retry}/{FAILED_REQUEST_RETRY_AMOUNT})"
-                )
-            except ProtocolError:
-                log.error(
-                    f"Connection lost while fetching inventory {inventory_url},"
-                    f" trying again. ({retry}/{FAILED_REQUEST_RETRY_AMOUNT})"
-                )
-            except HTTPError as e:
-                log.error(f"Fetching of inventory {inventory_url} failed with status code {e.response.status_code}.")
-                return None
-            except ConnectionError:
-                log.error(f"Couldn't establish connection to inventory {inventory_url}.")
+                return await self._download_inventory(inventory_url, entry)
+            except aiohttp.ClientResponseError as e:
+                if e.status < 500 and e.status != 429:
+                    log.error(f"Fetching of inventory {inventory_url} failed with status code {e.status}.")
+                    return None
+                error = f"failed with status code {e.status}"
+            except asyncio.TimeoutError:
+                error = "timed out"
+            except aiohttp.ClientError as e:
+                error = f"failed: {e!r}"
+            except ValueError as e:
+                log.error(f"Inventory {inventory_url} isn't a valid intersphinx inventory: {e}")
                 return None
-            else:
-                return package
-        log.error(f"Fetching of inventory {inventory_url} failed.")
+
+            if attempt == FETCH_ATTEMPTS:
+                break
+
+            delay = FETCH_BACKOFF * 2 ** (attempt - 1)
+            log.warning(
+                f"Fetching of inventory {inventory_url} {error}, trying again in {delay} seconds."
+                f" ({attempt}/{FETCH_ATTEMPTS})"
+            )
+            await asyncio.sleep(delay)
+
+        log.error(f"Fetching of inventory {inventory_url} {error}; giving up after {FETCH_ATTEMPTS} attempts.")
         return None
 
     @staticmethod
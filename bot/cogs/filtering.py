@@ -1,6 +1,8 @@
+import asyncio
 import logging
 import re
-from typing import Optional, Union, Tuple
+from functools import partial
+from typing import Any, List, Optional, Union, Tuple
 
 import discord.errors
 from dateutil.relativedelta import relativedelta
@@ -8,12 +10,17 @@ from discord import Colour, DMChannel, Member, Message, TextChannel
 from discord.ext.commands import Cog, command
 from discord.utils import escape_markdown
 
+from bot.api import ResponseCodeError
 from bot.bot import Bot
 from bot.cogs.moderation import ModLog
 from bot.constants import (
     Channels, Colours,
     Filter, Icons, URLs
 )
+from bot.utils.cache import AsyncTTLCache
+from bot.utils.domains import DomainBlacklist
+from bot.utils.message_features import get_features
+from bot.utils.watchlist import Watchlist
 
 log = logging.getLogger(__name__)
 
@@ -32,13 +39,11 @@ SPOILER_RE = re.compile(r"(\|\|.+?\|\|)", re.DOTALL)
 URL_RE = re.compile(r"(https?://[^\s]+)", flags=re.IGNORECASE)
 ZALGO_RE = re.compile(r"[\u0300-\u036F\u0489]")
 
-WORD_WATCHLIST_PATTERNS = [
-    re.compile(fr'{expression}', flags=re.IGNORECASE) for expression in Filter.word_watchlist
-]
-TOKEN_WATCHLIST_PATTERNS = [
-    re.compile(fr'{expression}', flags=re.IGNORECASE) for expression in Filter.token_watchlist
-]
-WATCHLIST_PATTERNS = WORD_WATCHLIST_PATTERNS + TOKEN_WATCHLIST_PATTERNS
+# Invite lookups are cached to avoid hitting the API for every message of a raid pasting the same invite.
+# Invalid and expired invites are cached for a shorter time in case the code gets reused.
+INVITE_CACHE_SIZE = 1024
+INVITE_CACHE_TTL = 10 * 60
+INVITE_NEGATIVE_CACHE_TTL = 60
 
 
 def expand_spoilers(text: str) -> str:
@@ -54,12 +59,21 @@ class Filtering(Cog):
 
     def __init__(self, bot: Bot):
         self.bot = bot
+        self.watchlist = Watchlist((*Filter.word_watchlist, *Filter.token_watchlist))
+        self.domain_blacklist = DomainBlacklist(Filter.domain_blacklist)
+        self._invite_cache = AsyncTTLCache(
+            INVITE_CACHE_SIZE, INVITE_CACHE_TTL, negative_ttl=INVITE_NEGATIVE_CACHE_TTL
+        )
 
+        # Filters which delete messages run before those which only alert. Within each of those stages,
+        # filters run in ascending order of `priority`, and those that are `io_bound` run last, concurrently.
         staff_mistake_str = "If you believe this was a mistake, please let staff know!"
         self.filters = {
             "filter_zalgo": {
                 "enabled": Filter.filter_zalgo,
                 "function": self._has_zalgo,
+                "priority": 10,
+                "io_bound": False,
                 "type": "filter",
                 "content_only": True,
                 "user_notification": Filter.notify_user_zalgo,
@@ -71,6 +85,8 @@ class Filtering(Cog):
             "filter_invites": {
                 "enabled": Filter.filter_invites,
                 "function": self._has_invites,
+                "priority": 60,
+                "io_bound": True,
                 "type": "filter",
                 "content_only": True,
                 "user_notification": Filter.notify_user_invites,
@@ -82,6 +98,8 @@ class Filtering(Cog):
             "filter_domains": {
                 "enabled": Filter.filter_domains,
                 "function": self._has_urls,
+                "priority": 20,
+                "io_bound": False,
                 "type": "filter",
                 "content_only": True,
                 "user_notification": Filter.notify_user_domains,
@@ -93,6 +111,8 @@ class Filtering(Cog):
                 "enabled": Filter.watch_regex,
                 "type": "filter",
                 "function": self._has_watch_regex_match,
+                "priority": 30,
+                "io_bound": False,
                 "content_only": True,
                 "user_notification": Filter.notify_user_invites,
                 "notification_msg": (
@@ -103,6 +123,8 @@ class Filtering(Cog):
                 "enabled": Filter.watch_regex,
                 "type": "filter",
                 "function": self._has_watch_regex_match,
+                "priority": 40,
+                "io_bound": False,
                 "content_only": True,
                 "user_notification": Filter.notify_user_invites,
                 "notification_msg": (
@@ -113,6 +135,8 @@ class Filtering(Cog):
             "watch_rich_embeds": {
                 "enabled": Filter.watch_rich_embeds,
                 "function": self._has_rich_embed,
+                "priority": 50,
+                "io_bound": False,
                 "type": "watchlist",
                 "content_only": False,
             },
@@ -168,6 +192,7 @@ class Filtering(Cog):
                 surroundings = match.string[max(match.start() - 10, 0): match.end() + 10]
                 message_content = (
                     f"**Match:** '{match[0]}'\n"
+                    f"**Pattern:** `{match.re.pattern}`\n"
                     f"**Nickname:** '{escape_markdown(surroundings)}'"
                 )
                 message = (
@@ -208,114 +233,168 @@ class Filtering(Cog):
             role_whitelisted and not msg.author.bot
         )
 
-        if filter_message:
-            for filter_name, _filter in self.filters.items():
-                # Is this specific filter enabled in the config?
-                if _filter["enabled"]:
-                    # Double trigger check for the embeds filter
-                    if filter_name == "watch_rich_embeds":
-                        # If the edit delta is less than 0.001 seconds, then we're probably dealing
-                        # with a double filter trigger.
-                        if delta is not None and delta < 100:
-                            continue
-
-                    # Does the filter only need the message content or the full message?
-                    if _filter["content_only"]:
-                        match = await _filter["function"](msg.content)
-                    else:
-                        match = await _filter["function"](msg)
-
-                    if match:
-                        # If this is a filter (not a watchlist), we should delete the message.
-                        if _filter["type"] == "filter":
-                            try:
-                                # Embeds (can?) trigger both the `on_message` and `on_message_edit`
-                                # event handlers, triggering filtering twice for the same message.
-                                #
-                                # If `on_message`-triggered filtering already deleted the message
-                                # then `on_message_edit`-triggered filtering will raise exception
-                                # since the message no longer exists.
-                                #
-                                # In addition, to avoid sending two notifications to the user, the
-                                # logs, and mod_alert, we return if the message no longer exists.
-                                await msg.delete()
-                            except discord.errors.NotFound:
-                                return
-
-                            # Notify the user if the filter specifies
-                            if _filter["user_notification"]:
-                                await self.notify_member(msg.author, _filter["notification_msg"], msg.channel)
-
-                        if isinstance(msg.channel, DMChannel):
-                            channel_str = "via DM"
-                        else:
-                            channel_str = f"in {msg.channel.mention}"
-
-                        # Word and match stats for watch_regex
-                        if filter_name == "watch_regex":
-                            surroundings = match.string[max(match.start() - 10, 0): match.end() + 10]
-                            message_content = (
-                                f"**Match:** '{match[0]}'\n"
-                                f"**Location:** '...{escape_markdown(surroundings)}...'\n"
-                                f"\n**Original Message:**\n{escape_markdown(msg.content)}"
-                            )
-                        else:  # Use content of discord Message
-                            message_content = msg.content
-
-                        message = (
-                            f"The {filter_name} {_filter['type']} was triggered "
-                            f"by **{msg.author}** "
-                            f"(`{msg.author.id}`) {channel_str} with [the "
-                            f"following message]({msg.jump_url}):\n\n"
-                            f"{message_content}"
-                        )
+        if not filter_message:
+            return
 
-                        log.debug(message)
-
-                        self.bot.stats.incr(f"filters.{filter_name}")
-
-                        additional_embeds = None
-                        additional_embeds_msg = None
-
-                        if filter_name == "filter_invites":
-                            additional_embeds = []
-                            for invite, data in match.items():
-                                embed = discord.Embed(description=(
-                                    f"**Members:**\n{data['members']}\n"
-                                    f"**Active:**\n{data['active']}"
-                                ))
-                                embed.set_author(name=data["name"])
-                                embed.set_thumbnail(url=data["icon"])
-                                embed.set_footer(text=f"Guild Invite Code: {invite}")
-                                additional_embeds.append(embed)
-                            additional_embeds_msg = "For the following guild(s):"
-
-                        elif filter_name == "watch_rich_embeds":
-                            additional_embeds = msg.embeds
-                            additional_embeds_msg = "With the following embed(s):"
-
-                        # Send pretty mod log embed to mod-alerts
-                        await self.mod_log.send_log_message(
-                            icon_url=Icons.filtering,
-                            colour=Colour(Colours.soft_red),
-                            title=f"{_filter['type'].title()} triggered!",
-                            text=message,
-                            thumbnail=msg.author.avatar_url_as(static_format="png"),
-                            channel_id=Channels.mod_alerts,
-                            ping_everyone=Filter.ping_everyone,
-                            additional_embeds=additional_embeds,
-                            additional_embeds_msg=additional_embeds_msg
-                        )
+        filters = self._filters_to_run(delta)
 
-                        break  # We don't want multiple filters to trigger
+        # Alert-only filters run last, so that their matches can't keep a filter which deletes the
+        # message from running.
+        deleting_filters = [(name, _filter) for name, _filter in filters if _filter["type"] == "filter"]
+        alert_filters = [(name, _filter) for name, _filter in filters if _filter["type"] != "filter"]
 
-    @staticmethod
-    async def _has_watch_regex_match(text: str) -> Union[bool, re.Match]:
+        for stage in (deleting_filters, alert_filters):
+            if await self._run_stage(msg, stage):
+                return  # We don't want multiple filters to trigger
+
+    async def _run_stage(self, msg: Message, filters: List[Tuple[str, dict]]) -> bool:
+        """
+        Run the `filters` on `msg`, handle the first match, and return whether there was one.
+
+        The cheap filters run one after another, so that a match skips all remaining filters,
+        including the network-bound ones. The network-bound filters then run concurrently, and of
+        those that match, the one with the highest priority is handled.
+        """
+        cheap_filters = [(name, _filter) for name, _filter in filters if not _filter["io_bound"]]
+        io_bound_filters = [(name, _filter) for name, _filter in filters if _filter["io_bound"]]
+
+        for filter_name, _filter in cheap_filters:
+            match = await self._run_filter(filter_name, _filter, msg)
+            if match:
+                await self._handle_match(msg, filter_name, _filter, match)
+                return True
+
+        matches = await asyncio.gather(
+            *(self._run_filter(filter_name, _filter, msg) for filter_name, _filter in io_bound_filters)
+        )
+        for (filter_name, _filter), match in zip(io_bound_filters, matches):
+            if match:
+                await self._handle_match(msg, filter_name, _filter, match)
+                return True
+
+        return False
+
+    def _filters_to_run(self, delta: Optional[int]) -> List[Tuple[str, dict]]:
+        """Return the names and definitions of the filters that should run on a message, in priority order."""
+        filters = []
+
+        for filter_name, _filter in self.filters.items():
+            # Is this specific filter enabled in the config?
+            if not _filter["enabled"]:
+                continue
+
+            # Double trigger check for the embeds filter
+            if filter_name == "watch_rich_embeds":
+                # If the edit delta is less than 0.001 seconds, then we're probably dealing
+                # with a double filter trigger.
+                if delta is not None and delta < 100:
+                    continue
+
+            filters.append((filter_name, _filter))
+
+        return sorted(filters, key=lambda item: item[1]["priority"])
+
+    async def _run_filter(self, filter_name: str, _filter: dict, msg: Message) -> Any:
+        """Run the filter on `msg` and send the time it took to statsd."""
+        with self.bot.stats.timer(f"filters.latency.{filter_name}"):
+            # Does the filter only need the message content or the full message?
+            if _filter["content_only"]:
+                return await _filter["function"](msg.content)
+            else:
+                return await _filter["function"](msg)
+
+    async def _handle_match(self, msg: Message, filter_name: str, _filter: dict, match: Any) -> None:
+        """Take action on a message that triggered a filter: delete it if necessary, and alert the mods."""
+        # If this is a filter (not a watchlist), we should delete the message.
+        if _filter["type"] == "filter":
+            try:
+                # Embeds (can?) trigger both the `on_message` and `on_message_edit`
+                # event handlers, triggering filtering twice for the same message.
+                #
+                # If `on_message`-triggered filtering already deleted the message
+                # then `on_message_edit`-triggered filtering will raise exception
+                # since the message no longer exists.
+                #
+                # In addition, to avoid sending two notifications to the user, the
+                # logs, and mod_alert, we return if the message no longer exists.
+                await msg.delete()
+            except discord.errors.NotFound:
+                return
+
+            # Notify the user if the filter specifies
+            if _filter["user_notification"]:
+                await self.notify_member(msg.author, _filter["notification_msg"], msg.channel)
+
+        if isinstance(msg.channel, DMChannel):
+            channel_str = "via DM"
+        else:
+            channel_str = f"in {msg.channel.mention}"
+
+        # Word and match stats for watch_regex
+        if filter_name == "watch_regex":
+            surroundings = match.string[max(match.start() - 10, 0): match.end() + 10]
+            message_content = (
+                f"**Match:** '{match[0]}'\n"
+                f"**Pattern:** `{match.re.pattern}`\n"
+                f"**Location:** '...{escape_markdown(surroundings)}...'\n"
+                f"\n**Original Message:**\n{escape_markdown(msg.content)}"
+            )
+        else:  # Use content of discord Message
+            message_content = msg.content
+
+        message = (
+            f"The {filter_name} {_filter['type']} was triggered "
+            f"by **{msg.author}** "
+            f"(`{msg.author.id}`) {channel_str} with [the "
+            f"following message]({msg.jump_url}):\n\n"
+            f"{message_content}"
+        )
+
+        log.debug(message)
+
+        self.bot.stats.incr(f"filters.{filter_name}")
+
+        additional_embeds = None
+        additional_embeds_msg = None
+
+        if filter_name == "filter_invites":
+            additional_embeds = []
+            for invite, data in match.items():
+                embed = discord.Embed(description=(
+                    f"**Members:**\n{data['members']}\n"
+                    f"**Active:**\n{data['active']}"
+                ))
+                embed.set_author(name=data["name"])
+                embed.set_thumbnail(url=data["icon"])
+                embed.set_footer(text=f"Guild Invite Code: {invite}")
+                additional_embeds.append(embed)
+            additional_embeds_msg = "For the following guild(s):"
+
+        elif filter_name == "watch_rich_embeds":
+            additional_embeds = msg.embeds
+            additional_embeds_msg = "With the following embed(s):"
+
+        # Send pretty mod log embed to mod-alerts
+        await self.mod_log.send_log_message(
+            icon_url=Icons.filtering,
+            colour=Colour(Colours.soft_red),
+            title=f"{_filter['type'].title()} triggered!",
+            text=message,
+            thumbnail=msg.author.avatar_url_as(static_format="png"),
+            channel_id=Channels.mod_alerts,
+            ping_everyone=Filter.ping_everyone,
+            additional_embeds=additional_embeds,
+            additional_embeds_msg=additional_embeds_msg
+        )
+
+    async def _has_watch_regex_match(self, text: str) -> Union[bool, re.Match]:
         """
         Return True if `text` matches any regex from `word_watchlist` or `token_watchlist` configs.
 
         `word_watchlist`'s patterns are placed between word boundaries while `token_watchlist` is
         matched as-is. Spoilers are expanded, if any, and URLs are ignored.
+
+        The match of the first expression that matches is returned; `match.re.pattern` is the expression.
         """
         if SPOILER_RE.search(text):
             text = expand_spoilers(text)
@@ -324,22 +403,22 @@ class Filtering(Cog):
         if URL_RE.search(text):
             return False
 
-        for pattern in WATCHLIST_PATTERNS:
-            match = pattern.search(text)
-            if match:
-                return match
+        return self.watchlist.search(text)
 
-    @staticmethod
-    async def _has_urls(text: str) -> bool:
-        """Returns True if the text contains one of the blacklisted URLs from the config file."""
-        if not URL_RE.search(text):
-            return False
+    async def _has_urls(self, text: str) -> bool:
+        """
+        Returns True if the text contains a URL to one of the blacklisted domains from the config file.
 
-        text = text.lower()
+        Subdomains of blacklisted domains are blacklisted as well.
+        """
+        urls = URL_RE.findall(text)
+        if not urls:
+            return False
 
-        for url in Filter.domain_blacklist:
-            if url.lower() in text:
-                return True
+        domain = self.domain_blacklist.search(urls)
+        if domain:
+            log.trace(f"Found a URL to the blacklisted domain {domain}.")
+            return True
 
         return False
 
@@ -365,48 +444,73 @@ class Filtering(Cog):
         # discord\.gg/gdudes-pony-farm
         text = text.replace("\\", "")
 
-        invites = INVITE_RE.findall(text)
-        invite_data = dict()
-        for invite in invites:
-            if invite in invite_data:
-                continue
+        # Look up every distinct invite concurrently, keeping the order they appear in.
+        invites = list(dict.fromkeys(INVITE_RE.findall(text)))
+        guilds = await asyncio.gather(*(self._get_invite_guild(invite) for invite in invites))
 
-            response = await self.bot.http_session.get(
-                f"{URLs.discord_invite_api}/{invite}", params={"with_counts": "true"}
-            )
-            response = await response.json()
-            guild = response.get("guild")
+        invite_data = dict()
+        for invite, guild in zip(invites, guilds):
             if guild is None:
-                # Lack of a "guild" key in the JSON response indicates either an group DM invite, an
-                # expired invite, or an invalid invite. The API does not currently differentiate
-                # between invalid and expired invites
+                # Either a group DM invite, an expired invite, or an invalid invite. The API does not
+                # currently differentiate between invalid and expired invites
                 return True
 
-            guild_id = int(guild.get("id"))
-
-            if guild_id not in Filter.guild_invite_whitelist:
-                guild_icon_hash = guild["icon"]
-                guild_icon = (
-                    "https://cdn.discordapp.com/icons/"
-                    f"{guild_id}/{guild_icon_hash}.png?size=512"
-                )
-
+            if guild["id"] not in Filter.guild_invite_whitelist:
                 invite_data[invite] = {
                     "name": guild["name"],
-                    "icon": guild_icon,
-                    "members": response["approximate_member_count"],
-                    "active": response["approximate_presence_count"]
+                    "icon": guild["icon"],
+                    "members": guild["members"],
+                    "active": guild["active"]
                 }
 
         return invite_data if invite_data else False
 
+    async def _get_invite_guild(self, invite: str) -> Optional[dict]:
+        """
+        Return data about the guild `invite` leads to, or None if it doesn't lead to a guild.
+
+        Lookups are cached, and concurrent lookups of the same invite share a single API request.
+        Failed requests aren't cached and are treated like invalid invites.
+        """
+        try:
+            return await self._invite_cache.get_or_fetch(invite, partial(self._fetch_invite_guild, invite))
+        except ResponseCodeError as e:
+            log.warning(f"Failed to look up invite `{invite}`: {e}")
+            return None
+
+    async def _fetch_invite_guild(self, invite: str) -> Optional[dict]:
+        """Fetch data about the guild `invite` leads to from the Discord API."""
+        async with self.bot.http_session.get(
+            f"{URLs.discord_invite_api}/{invite}", params={"with_counts": "true"}
+        ) as response:
+            response_json = await response.json()
+
+        # Discord responds with 404 to unknown invites. Other errors, e.g. rate limits, shouldn't be cached.
+        if response.status >= 400 and response.status != 404:
+            raise ResponseCodeError(response=response, response_json=response_json)
+
+        # Lack of a "guild" key in the JSON response indicates either an group DM invite, an
+        # expired invite, or an invalid invite.
+        guild = response_json.get("guild")
+        if guild is None:
+            return None
+
+        guild_id = int(guild.get("id"))
+        return {
+            "id": guild_id,
+            "name": guild["name"],
+            "icon": f"https://cdn.discordapp.com/icons/{guild_id}/{guild['icon']}.png?size=512",
+            "members": response_json["approximate_member_count"],
+            "active": response_json["approximate_presence_count"]
+        }
+
     @staticmethod
     async def _has_rich_embed(msg: Message) -> bool:
         """Determines if `msg` contains any rich embeds not auto-generated from a URL."""
         if msg.embeds:
             for embed in msg.embeds:
                 if embed.type == "rich":
-                    urls = URL_RE.findall(msg.content)
+                    urls = get_features(msg).links
                     if not embed.url or embed.url not in urls:
                         # If `embed.url` does not exist or if `embed.url` is not part of the content
                         # of the message, it's unlikely to be an auto-generated embed by Discord.
@@ -4,7 +4,7 @@ import json
 import logging
 import random
 import typing as t
-from collections import deque
+from collections import Counter, deque
 from contextlib import suppress
 from datetime import datetime
 from pathlib import Path
@@ -65,6 +65,19 @@ AVAILABLE_EMOJI = "✅"
 IN_USE_EMOJI = "⌛"
 NAME_SEPARATOR = "｜"
 
+HELP_CATEGORIES = (
+    constants.Categories.help_available,
+    constants.Categories.help_in_use,
+    constants.Categories.help_dormant,
+)
+
+# Where the state of the help channels is kept between restarts.
+STATE_PATH = Path("data", "help_channels.json")
+
+# Seconds to wait after a change to the state of the help channels before writing it, so that bursts
+# of changes, such as a busy help channel, are written once.
+STATE_SAVE_DELAY = 30
+
 
 class TaskData(t.NamedTuple):
     """Data for a scheduled task."""
@@ -73,6 +86,18 @@ class TaskData(t.NamedTuple):
     callback: t.Awaitable
 
 
+class ChannelState(t.NamedTuple):
+    """The state of a help channel, kept up to date from gateway events."""
+
+    # The name of the channel without a status emoji prefix.
+    name: str
+    category_id: t.Optional[int]
+    claimant_id: t.Optional[int] = None
+    last_message_id: t.Optional[int] = None
+    # The last dormant message sent in the channel, which is edited when the channel becomes available.
+    dormant_message_id: t.Optional[int] = None
+
+
 class HelpChannels(Scheduler, commands.Cog):
     """
     Manage the help channel system of the guild.
@@ -103,15 +128,18 @@ class HelpChannels(Scheduler, commands.Cog):
     * Channels are used to refill the Available category
 
     Help channels are named after the chemical elements in `bot/resources/elements.json`.
+
+    The category, name, claimant and last message of each help channel are tracked in memory from
+    gateway events, so no messages have to be fetched to decide what to do with a channel. The
+    state is saved to `STATE_PATH` for the claimants and dormant messages to be known after a restart.
     """
 
     def __init__(self, bot: Bot):
         super().__init__()
 
         self.bot = bot
-        self.help_channel_claimants: (
-            t.Dict[discord.TextChannel, t.Union[discord.Member, discord.User]]
-        ) = {}
+        self.channel_states: t.Dict[int, ChannelState] = {}
+        self._save_handle: t.Optional[asyncio.TimerHandle] = None
 
         # Categories
         self.available_category: discord.CategoryChannel = None
@@ -145,6 +173,9 @@ class HelpChannels(Scheduler, commands.Cog):
 
         self.cancel_all()
 
+        if self._save_handle:
+            self.save_channel_states()
+
     def create_channel_queue(self) -> asyncio.Queue:
         """
         Return a queue of dormant channels to use for getting the next available channel.
@@ -153,7 +184,7 @@ class HelpChannels(Scheduler, commands.Cog):
         """
         log.trace("Creating the channel queue.")
 
-        channels = list(self.get_category_channels(self.dormant_category))
+        channels = self.get_channels_in(self.dormant_category)
         random.shuffle(channels)
 
         log.trace("Populating the channel queue with channels.")
@@ -180,7 +211,12 @@ class HelpChannels(Scheduler, commands.Cog):
             return None
 
         log.debug(f"Creating a new dormant channel named {name}.")
-        return await self.dormant_category.create_text_channel(name)
+        channel = await self.dormant_category.create_text_channel(name)
+
+        self.channel_states[channel.id] = ChannelState(name, self.dormant_category.id)
+        self.schedule_state_save()
+
+        return channel
 
     def create_name_queue(self) -> deque:
         """Return a queue of element names to use for creating new channels."""
@@ -196,7 +232,8 @@ class HelpChannels(Scheduler, commands.Cog):
 
     async def dormant_check(self, ctx: commands.Context) -> bool:
         """Return True if the user is the help channel claimant or passes the role check."""
-        if self.help_channel_claimants.get(ctx.channel) == ctx.author:
+        state = self.channel_states.get(ctx.channel.id)
+        if state and state.claimant_id == ctx.author.id:
             log.trace(f"{ctx.author} is the help channel claimant, passing the check for dormant.")
             self.bot.stats.incr("help.dormant_invoke.claimant")
             return True
@@ -221,9 +258,6 @@ class HelpChannels(Scheduler, commands.Cog):
         log.trace("dormant command invoked; checking if the channel is in-use.")
         if ctx.channel.category == self.in_use_category:
             if await self.dormant_check(ctx):
-                with suppress(KeyError):
-                    del self.help_channel_claimants[ctx.channel]
-
                 with suppress(discord.errors.HTTPException, discord.errors.NotFound):
                     await self.reset_claimant_send_permission(ctx.channel)
 
@@ -299,14 +333,20 @@ class HelpChannels(Scheduler, commands.Cog):
         else:
             return all_names[:count]
 
+    def get_channels_in(self, category: discord.CategoryChannel) -> t.List[discord.TextChannel]:
+        """Return the help channels in the `category` according to their state."""
+        channels = (
+            self.bot.get_channel(channel_id)
+            for channel_id, state in self.channel_states.items()
+            if state.category_id == category.id
+        )
+        return [channel for channel in channels if channel is not None]
+
     def get_used_names(self) -> t.Set[str]:
         """Return channel names which are already being used."""
         log.trace("Getting channel names which are already being used.")
 
-        names = set()
-        for cat in (self.available_category, self.in_use_category, self.dormant_category):
-            for channel in self.get_category_channels(cat):
-                names.add(self.get_clean_channel_name(channel))
+        names = {state.name for state in self.channel_states.values()}
 
         if len(names) > MAX_CHANNELS_PER_CATEGORY:
             log.warning(
@@ -317,8 +357,7 @@ class HelpChannels(Scheduler, commands.Cog):
         log.trace(f"Got {len(names)} used names: {names}")
         return names
 
-    @classmethod
-    async def get_idle_time(cls, channel: discord.TextChannel) -> t.Optional[int]:
+    def get_idle_time(self, channel: discord.TextChannel) -> t.Optional[int]:
         """
         Return the time elapsed, in seconds, since the last message sent in the `channel`.
 
@@ -326,12 +365,13 @@ class HelpChannels(Scheduler, commands.Cog):
         """
         log.trace(f"Getting the idle time for #{channel} ({channel.id}).")
 
-        msg = await cls.get_last_message(channel)
-        if not msg:
+        state = self.channel_states.get(channel.id)
+        if not state or state.last_message_id is None:
             log.debug(f"No idle time available; #{channel} ({channel.id}) has no messages.")
             return None
 
-        idle_time = (datetime.utcnow() - msg.created_at).seconds
+        last_message_at = discord.utils.snowflake_time(state.last_message_id)
+        idle_time = int((datetime.utcnow() - last_message_at).total_seconds())
 
         log.trace(f"#{channel} ({channel.id}) has been idle for {idle_time} seconds.")
         return idle_time
@@ -351,7 +391,7 @@ class HelpChannels(Scheduler, commands.Cog):
         """Initialise the Available category with channels."""
         log.trace("Initialising the Available category with channels.")
 
-        channels = list(self.get_category_channels(self.available_category))
+        channels = self.get_channels_in(self.available_category)
         missing = constants.HelpChannels.max_available - len(channels)
 
         log.trace(f"Moving {missing} missing channels to the Available category.")
@@ -381,12 +421,13 @@ class HelpChannels(Scheduler, commands.Cog):
         log.trace("Initialising the cog.")
         await self.init_categories()
         await self.reset_send_permissions()
+        self.init_channel_states()
 
         self.channel_queue = self.create_channel_queue()
         self.name_queue = self.create_name_queue()
 
         log.trace("Moving or rescheduling in-use channels.")
-        for channel in self.get_category_channels(self.in_use_category):
+        for channel in self.get_channels_in(self.in_use_category):
             await self.move_idle_channel(channel, has_task=False)
 
         # Prevent the command from being used until ready.
@@ -402,15 +443,83 @@ class HelpChannels(Scheduler, commands.Cog):
 
         self.report_stats()
 
+    def init_channel_states(self) -> None:
+        """
+        Build the state of the help channels from the guild's channel cache and the saved state.
+
+        The last message of each channel is the one last reported by the gateway. Claimants are only
+        restored for channels which are still in use.
+        """
+        log.trace("Initialising the state of the help channels.")
+        saved_states = self.load_channel_states()
+
+        for category in (self.available_category, self.in_use_category, self.dormant_category):
+            for channel in self.get_category_channels(category):
+                saved = saved_states.get(channel.id)
+                claimed = saved is not None and category == self.in_use_category
+
+                self.channel_states[channel.id] = ChannelState(
+                    name=self.get_clean_channel_name(channel),
+                    category_id=category.id,
+                    claimant_id=saved.claimant_id if claimed else None,
+                    last_message_id=channel.last_message_id,
+                    dormant_message_id=saved.dormant_message_id if saved else None,
+                )
+
+        log.trace(f"Initialised the state of {len(self.channel_states)} help channels.")
+        self.schedule_state_save()
+
+    @staticmethod
+    def load_channel_states() -> t.Dict[int, ChannelState]:
+        """Return the channel states saved by the last run, or an empty dict if there are none."""
+        try:
+            with STATE_PATH.open(encoding="utf-8") as file:
+                data = json.load(file)
+
+            return {int(channel_id): ChannelState(**state) for channel_id, state in data.items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError, AttributeError):
+            log.warning("Failed to read the saved help channel states; ignoring them.", exc_info=True)
+            return {}
+
+    def save_channel_states(self) -> None:
+        """Write the channel states to disk."""
+        if self._save_handle:
+            self._save_handle.cancel()
+            self._save_handle = None
+
+        log.trace(f"Saving the state of {len(self.channel_states)} help channels.")
+        STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so an interrupted write can't leave a truncated file.
+        temp_path = STATE_PATH.with_suffix(".tmp")
+        with temp_path.open("w", encoding="utf-8") as file:
+            json.dump({channel_id: state._asdict() for channel_id, state in self.channel_states.items()}, file)
+        temp_path.replace(STATE_PATH)
+
+    def schedule_state_save(self) -> None:
+        """Save the channel states after `STATE_SAVE_DELAY` seconds, unless a save is already scheduled."""
+        if not self._save_handle:
+            self._save_handle = self.bot.loop.call_later(STATE_SAVE_DELAY, self.save_channel_states)
+
+    def update_channel_state(self, channel_id: int, **changes) -> None:
+        """Apply the `changes` to the state of the channel with `channel_id`, if it's a help channel."""
+        state = self.channel_states.get(channel_id)
+        if state is None:
+            log.debug(f"Not updating the state of channel {channel_id} since it's not a help channel.")
+            return
+
+        self.channel_states[channel_id] = state._replace(**changes)
+        self.schedule_state_save()
+
     def report_stats(self) -> None:
         """Report the channel count stats."""
-        total_in_use = sum(1 for _ in self.get_category_channels(self.in_use_category))
-        total_available = sum(1 for _ in self.get_category_channels(self.available_category))
-        total_dormant = sum(1 for _ in self.get_category_channels(self.dormant_category))
+        totals = Counter(state.category_id for state in self.channel_states.values())
 
-        self.bot.stats.gauge("help.total.in_use", total_in_use)
-        self.bot.stats.gauge("help.total.available", total_available)
-        self.bot.stats.gauge("help.total.dormant", total_dormant)
+        self.bot.stats.gauge("help.total.in_use", totals[self.in_use_category.id])
+        self.bot.stats.gauge("help.total.available", totals[self.available_category.id])
+        self.bot.stats.gauge("help.total.dormant", totals[self.dormant_category.id])
 
     def is_dormant_message(self, message: t.Optional[discord.Message]) -> bool:
         """Return True if the contents of the `message` match `DORMANT_MSG`."""
@@ -436,7 +545,7 @@ class HelpChannels(Scheduler, commands.Cog):
         log.trace(f"Handling in-use channel #{channel} ({channel.id}).")
 
         idle_seconds = constants.HelpChannels.idle_minutes * 60
-        time_elapsed = await self.get_idle_time(channel)
+        time_elapsed = self.get_idle_time(channel)
 
         if time_elapsed is None or time_elapsed >= idle_seconds:
             log.info(
@@ -476,6 +585,7 @@ class HelpChannels(Scheduler, commands.Cog):
             sync_permissions=True,
             topic=AVAILABLE_TOPIC,
         )
+        self.update_channel_state(channel.id, category_id=self.available_category.id, claimant_id=None)
 
         log.trace(
             f"Ensuring that all channels in `{self.available_category}` have "
@@ -498,6 +608,7 @@ class HelpChannels(Scheduler, commands.Cog):
             sync_permissions=True,
             topic=DORMANT_TOPIC,
         )
+        self.update_channel_state(channel.id, category_id=self.dormant_category.id, claimant_id=None)
 
         self.bot.stats.incr(f"help.dormant_calls.{caller}")
 
@@ -510,7 +621,8 @@ class HelpChannels(Scheduler, commands.Cog):
 
         log.trace(f"Sending dormant message for #{channel} ({channel.id}).")
         embed = discord.Embed(description=DORMANT_MSG)
-        await channel.send(embed=embed)
+        message = await channel.send(embed=embed)
+        self.update_channel_state(channel.id, last_message_id=message.id, dormant_message_id=message.id)
 
         log.trace(f"Pushing #{channel} ({channel.id}) into the channel queue.")
         self.channel_queue.put_nowait(channel)
@@ -526,6 +638,7 @@ class HelpChannels(Scheduler, commands.Cog):
             sync_permissions=True,
             topic=IN_USE_TOPIC,
         )
+        self.update_channel_state(channel.id, category_id=self.in_use_category.id)
 
         timeout = constants.HelpChannels.idle_minutes * 60
 
@@ -583,10 +696,13 @@ class HelpChannels(Scheduler, commands.Cog):
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
         """Move an available channel to the In Use category and replace it with a dormant one."""
+        channel = message.channel
+        if channel.id in self.channel_states:
+            self.update_channel_state(channel.id, last_message_id=message.id)
+
         if message.author.bot:
             return  # Ignore messages sent by bots.
 
-        channel = message.channel
         if not self.is_in_category(channel, constants.Categories.help_available):
             return  # Ignore messages outside the Available category.
 
@@ -597,7 +713,8 @@ class HelpChannels(Scheduler, commands.Cog):
         async with self.on_message_lock:
             log.trace(f"on_message lock acquired for {message.id}.")
 
-            if not self.is_in_category(channel, constants.Categories.help_available):
+            state = self.channel_states.get(channel.id)
+            if not state or state.category_id != self.available_category.id:
                 log.debug(
                     f"Message {message.id} will not make #{channel} ({channel.id}) in-use "
                     f"because another message in the channel already triggered that."
@@ -607,7 +724,7 @@ class HelpChannels(Scheduler, commands.Cog):
             await self.move_to_in_use(channel)
             await self.revoke_send_permissions(message.author)
             # Add user with channel for dormant check.
-            self.help_channel_claimants[channel] = message.author
+            self.update_channel_state(channel.id, claimant_id=message.author.id)
 
             self.bot.stats.incr("help.claimed")
 
@@ -620,6 +737,50 @@ class HelpChannels(Scheduler, commands.Cog):
         # be put in the queue.
         await self.move_to_available()
 
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
+        """Start tracking the state of channels created in a help category."""
+        if isinstance(channel, discord.TextChannel) and channel.category_id in HELP_CATEGORIES:
+            log.trace(f"Tracking the state of new help channel #{channel} ({channel.id}).")
+            self.channel_states.setdefault(
+                channel.id, ChannelState(self.get_clean_channel_name(channel), channel.category_id)
+            )
+            self.schedule_state_save()
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel) -> None:
+        """Update the state of help channels which were moved or renamed."""
+        if not isinstance(after, discord.TextChannel):
+            return
+
+        if after.category_id in HELP_CATEGORIES:
+            name = self.get_clean_channel_name(after)
+            if after.id in self.channel_states:
+                self.update_channel_state(after.id, name=name, category_id=after.category_id)
+            else:
+                log.trace(f"Tracking the state of #{after} ({after.id}), which was moved to a help category.")
+                self.channel_states[after.id] = ChannelState(
+                    name, after.category_id, last_message_id=after.last_message_id
+                )
+                self.schedule_state_save()
+        elif self.channel_states.pop(after.id, None):
+            log.trace(f"No longer tracking the state of #{after} ({after.id}), which left the help categories.")
+            self.schedule_state_save()
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        """Stop tracking the state of deleted help channels and make their names available again."""
+        state = self.channel_states.pop(channel.id, None)
+        if state is None:
+            return
+
+        log.trace(f"No longer tracking the state of deleted help channel #{channel} ({channel.id}).")
+        self.schedule_state_save()
+
+        name_is_free = state.name in self.name_positions and state.name not in self.get_used_names()
+        if self.name_queue is not None and name_is_free:
+            self.name_queue.append(state.name)
+
     @staticmethod
     async def ensure_permissions_synchronization(category: discord.CategoryChannel) -> None:
         """
@@ -671,10 +832,10 @@ class HelpChannels(Scheduler, commands.Cog):
     async def reset_claimant_send_permission(self, channel: discord.TextChannel) -> None:
         """Reset send permissions in the Available category for the help `channel` claimant."""
         log.trace(f"Attempting to find claimant for #{channel.name} ({channel.id}).")
-        try:
-            member = self.help_channel_claimants[channel]
-        except KeyError:
-            log.trace(f"Channel #{channel.name} ({channel.id}) not in claimant cache, permissions unchanged.")
+        state = self.channel_states.get(channel.id)
+        member = state and state.claimant_id and channel.guild.get_member(state.claimant_id)
+        if not member:
+            log.trace(f"Channel #{channel.name} ({channel.id}) has no claimant in the guild, permissions unchanged.")
             return
 
         log.trace(f"Resetting send permissions for {member} ({member.id}).")
@@ -712,13 +873,25 @@ class HelpChannels(Scheduler, commands.Cog):
 
         embed = discord.Embed(description=AVAILABLE_MSG)
 
-        msg = await self.get_last_message(channel)
-        if self.is_dormant_message(msg):
-            log.trace(f"Found dormant message {msg.id} in {channel_info}; editing it.")
-            await msg.edit(embed=embed)
+        state = self.channel_states.get(channel.id)
+        if state and state.dormant_message_id is not None:
+            # The dormant message is the last message unless something was sent after it.
+            dormant_message_id = state.dormant_message_id if state.dormant_message_id == state.last_message_id else None
         else:
-            log.trace(f"Dormant message not found in {channel_info}; sending a new message.")
-            await channel.send(embed=embed)
+            # The dormant message, if any, was sent before its ID was tracked.
+            msg = await self.get_last_message(channel)
+            dormant_message_id = msg.id if self.is_dormant_message(msg) else None
+
+        if dormant_message_id is not None:
+            log.trace(f"Found dormant message {dormant_message_id} in {channel_info}; editing it.")
+            try:
+                await self.bot.http.edit_message(channel.id, dormant_message_id, embed=embed.to_dict())
+                return
+            except discord.NotFound:
+                log.debug(f"Dormant message {dormant_message_id} in {channel_info} was deleted.")
+
+        log.trace(f"Dormant message not found in {channel_info}; sending a new message.")
+        await channel.send(embed=embed)
 
     async def try_get_channel(self, channel_id: int) -> discord.abc.GuildChannel:
         """Attempt to get or fetch a channel and return it."""
@@ -33,6 +33,9 @@ import rootpath
 
 log = logging.getLogger(__name__)
 
+# Infraction counts may be up to this many seconds out of date if infractions are edited on the site.
+INFRACTION_COUNTS_CACHE_TTL = 60
+
 
 def time_difference_milliseconds(time, message: Message):
     return (time.timestamp() - message.created_at.timestamp()) * 1000
@@ -297,7 +300,8 @@ class Information(Cog):
             params={
                 'hidden': 'False',
                 'user__id': str(member.id)
-            }
+            },
+            cache_ttl=INFRACTION_COUNTS_CACHE_TTL
         )
 
         total_infractions = len(infractions)
@@ -318,7 +322,8 @@ class Information(Cog):
             'bot/infractions',
             params={
                 'user__id': str(member.id)
-            }
+            },
+            cache_ttl=INFRACTION_COUNTS_CACHE_TTL
         )
 
         infraction_output = ["**Infractions**"]
@@ -1,8 +1,12 @@
 import asyncio
 import difflib
 import itertools
+import json
 import logging
+import tempfile
+import time
 import typing as t
+from collections import defaultdict, deque
 from datetime import datetime
 from itertools import zip_longest
 
@@ -12,10 +16,12 @@ from deepdiff import DeepDiff
 from discord import Colour
 from discord.abc import GuildChannel
 from discord.ext.commands import Cog, Context
+from discord.http import Route
 from discord.utils import escape_markdown
 
 from bot.bot import Bot
 from bot.constants import Categories, Channels, Colours, Emojis, Event, Guild as GuildConstant, Icons, URLs
+from bot.utils.cache import ExpiringSet
 from bot.utils.time import humanize_delta
 
 log = logging.getLogger(__name__)
@@ -33,16 +39,50 @@ VOICE_STATE_ATTRIBUTES = {
     "self_video": "Broadcasting",
 }
 
+# Seconds after which an ignored item is forgotten if its event never arrived, e.g. because the action failed.
+IGNORED_ITEM_TTL = 5 * 60
+
+# Logs for these channels are sent straight away instead of waiting to be packed with others.
+PRIORITY_LOG_CHANNELS = (Channels.mod_alerts,)
+
+# Seconds a log waits for others to be sent in the same message.
+LOG_FLUSH_DELAY = 0.5
+
+# Discord's limits on the embeds of a single message.
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARACTERS = 6000
+
+# The number of messages serialised for a log upload between giving other tasks a chance to run.
+UPLOAD_SERIALISATION_BATCH = 100
+
+
+class QueuedLog(t.NamedTuple):
+    """A log waiting to be sent, possibly in the same message as other logs."""
+
+    content: t.Optional[str]
+    embed: t.Optional[discord.Embed]
+    files: t.Optional[t.List[discord.File]]
+    queued_at: float
+    # Resolved with the message the log was sent in, if anyone waits for it.
+    sent: t.Optional[asyncio.Future]
+
 
 class ModLog(Cog, name="ModLog"):
     """Logging for server events and staff actions."""
 
     def __init__(self, bot: Bot):
         self.bot = bot
-        self._ignored = {event: [] for event in Event}
+        self._ignored = {event: ExpiringSet(IGNORED_ITEM_TTL) for event in Event}
+
+        # Logs waiting to be sent and the tasks sending them, by channel id.
+        self._log_queues: t.Dict[int, t.Deque[QueuedLog]] = defaultdict(deque)
+        self._log_senders: t.Dict[int, asyncio.Task] = {}
+        self._queued_logs = 0
 
-        self._cached_deletes = []
-        self._cached_edits = []
+    def cog_unload(self) -> None:
+        """Cancel the sending of queued logs."""
+        for task in self._log_senders.values():
+            task.cancel()
 
     async def upload_log(
         self,
@@ -50,36 +90,65 @@ class ModLog(Cog, name="ModLog"):
         actor_id: int,
         attachments: t.Iterable[t.List[str]] = None
     ) -> str:
-        """Upload message logs to the database and return a URL to a page for viewing the logs."""
+        """
+        Upload message logs to the database and return a URL to a page for viewing the logs.
+
+        The request body is serialised one message at a time into a temporary file, which the
+        request is then streamed from, rather than built in memory as a whole.
+        """
         if attachments is None:
             attachments = []
 
-        response = await self.bot.api_client.post(
-            'bot/deleted-messages',
-            json={
-                'actor': actor_id,
-                'creation': datetime.utcnow().isoformat(),
-                'deletedmessage_set': [
-                    {
-                        'id': message.id,
-                        'author': message.author.id,
-                        'channel_id': message.channel.id,
-                        'content': message.content,
-                        'embeds': [embed.to_dict() for embed in message.embeds],
-                        'attachments': attachment,
-                    }
-                    for message, attachment in zip_longest(messages, attachments, fillvalue=[])
-                ]
-            }
-        )
+        with tempfile.TemporaryFile() as body:
+            await self._write_log(body, messages, actor_id, attachments)
+            body.seek(0)
+
+            response = await self.bot.api_client.post(
+                'bot/deleted-messages',
+                data=body,
+                headers={'Content-Type': 'application/json'},
+            )
 
         return f"{URLs.site_logs_view}/{response['id']}"
 
+    @staticmethod
+    async def _write_log(
+        body: t.BinaryIO,
+        messages: t.Iterable[discord.Message],
+        actor_id: int,
+        attachments: t.Iterable[t.List[str]],
+    ) -> None:
+        """Write the JSON of a deleted messages log of `messages` to `body` as the messages are iterated."""
+        body.write(
+            f'{{"actor": {json.dumps(actor_id)}, '
+            f'"creation": {json.dumps(datetime.utcnow().isoformat())}, '
+            f'"deletedmessage_set": ['.encode()
+        )
+
+        for index, (message, attachment) in enumerate(zip_longest(messages, attachments, fillvalue=[])):
+            if index:
+                body.write(b", ")
+                if index % UPLOAD_SERIALISATION_BATCH == 0:
+                    await asyncio.sleep(0)
+
+            body.write(json.dumps({
+                'id': message.id,
+                'author': message.author.id,
+                'channel_id': message.channel.id,
+                'content': message.content,
+                'embeds': [embed.to_dict() for embed in message.embeds],
+                'attachments': attachment,
+            }).encode())
+
+        body.write(b"]}")
+
     def ignore(self, event: Event, *items: int) -> None:
         """Add event to ignored events to suppress log emission."""
+        ignored = self._ignored[event]
         for item in items:
-            if item not in self._ignored[event]:
-                self._ignored[event].append(item)
+            ignored.add(item)
+
+        self.bot.stats.gauge(f"mod_log.ignored.{event.value}", len(ignored))
 
     async def send_log_message(
         self,
@@ -118,17 +187,141 @@ class ModLog(Cog, name="ModLog"):
             else:
                 content = "@everyone"
 
-        channel = self.bot.get_channel(channel_id)
-        log_message = await channel.send(content=content, embed=embed, files=files)
+        sent = self._queue_log(channel_id, content=content, embed=embed, files=files, wait=True)
 
         if additional_embeds:
             if additional_embeds_msg:
-                await channel.send(additional_embeds_msg)
+                self._queue_log(channel_id, content=additional_embeds_msg)
             for additional_embed in additional_embeds:
-                await channel.send(embed=additional_embed)
+                self._queue_log(channel_id, embed=additional_embed)
 
+        log_message = await sent
         return await self.bot.get_context(log_message)  # Optionally return for use with antispam
 
+    def _queue_log(
+        self,
+        channel_id: int,
+        *,
+        content: t.Optional[str] = None,
+        embed: t.Optional[discord.Embed] = None,
+        files: t.Optional[t.List[discord.File]] = None,
+        wait: bool = False,
+    ) -> t.Optional[asyncio.Future]:
+        """
+        Queue a log to be sent to the channel with `channel_id`, starting a task to send it if needed.
+
+        If `wait` is True, return a future resolved with the message the log is sent in.
+        """
+        sent = asyncio.get_event_loop().create_future() if wait else None
+        self._log_queues[channel_id].append(QueuedLog(content, embed, files, time.monotonic(), sent))
+
+        self._queued_logs += 1
+        self.bot.stats.gauge("mod_log.queue_depth", self._queued_logs)
+
+        if channel_id not in self._log_senders:
+            self._log_senders[channel_id] = asyncio.create_task(self._send_queued_logs(channel_id))
+
+        return sent
+
+    async def _send_queued_logs(self, channel_id: int) -> None:
+        """
+        Send the logs queued for the channel with `channel_id` until there are none left.
+
+        Logs are packed into as few messages as possible. Unless the channel is one of
+        `PRIORITY_LOG_CHANNELS`, a log is held back for up to `LOG_FLUSH_DELAY` seconds so that
+        the logs which follow it can be packed with it. Since a single task sends the messages of a
+        channel, one at a time, only one request is made to the channel's rate limit bucket at once,
+        and a bucket exhausted by routine logs doesn't hold up the logs of other channels.
+        """
+        queue = self._log_queues[channel_id]
+        delay = 0 if channel_id in PRIORITY_LOG_CHANNELS else LOG_FLUSH_DELAY
+
+        try:
+            while queue:
+                wait = queue[0].queued_at + delay - time.monotonic()
+                if wait > 0 and len(queue) < MAX_EMBEDS_PER_MESSAGE:
+                    await asyncio.sleep(wait)
+
+                batch = self._take_log_batch(queue)
+                self._queued_logs -= len(batch)
+                self.bot.stats.gauge("mod_log.queue_depth", self._queued_logs)
+
+                await self._send_log_batch(channel_id, batch)
+        finally:
+            del self._log_senders[channel_id]
+
+            # Only left over if the task was cancelled.
+            self._queued_logs -= len(queue)
+            for queued in queue:
+                if queued.sent:
+                    queued.sent.cancel()
+            queue.clear()
+
+    @staticmethod
+    def _take_log_batch(queue: t.Deque[QueuedLog]) -> t.List[QueuedLog]:
+        """
+        Remove and return the logs at the start of `queue` which can be sent in one message.
+
+        A log with content or files starts a new message, and logs with files are sent on their own.
+        """
+        batch = [queue.popleft()]
+        if batch[0].files:
+            return batch
+
+        characters = len(batch[0].embed) if batch[0].embed else 0
+        while queue and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            queued = queue[0]
+            if queued.content or queued.files or queued.embed is None:
+                break
+
+            characters += len(queued.embed)
+            if characters > MAX_EMBED_CHARACTERS:
+                break
+
+            batch.append(queue.popleft())
+
+        return batch
+
+    async def _send_log_batch(self, channel_id: int, batch: t.List[QueuedLog]) -> None:
+        """Send the logs of `batch` in one message and resolve their futures with it."""
+        futures = [queued.sent for queued in batch if queued.sent]
+        first = batch[0]
+        embeds = [queued.embed for queued in batch if queued.embed]
+
+        try:
+            channel = self.bot.get_channel(channel_id)
+            if first.files or len(embeds) <= 1:
+                message = await channel.send(content=first.content, embed=next(iter(embeds), None), files=first.files)
+            else:
+                # `Messageable.send` can't send more than one embed in a message.
+                payload = {"embeds": [embed.to_dict() for embed in embeds]}
+                if first.content:
+                    payload["content"] = first.content
+
+                route = Route("POST", "/channels/{channel_id}/messages", channel_id=channel_id)
+                data = await self.bot.http.request(route, json=payload)
+                message = self.bot._connection.create_message(channel=channel, data=data)
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            # Errors are raised to whoever waits for the logs, and logged if nobody does.
+            waiting = [future for future in futures if not future.done()]
+            if not waiting:
+                log.exception(f"Failed to send {len(batch)} logs to channel {channel_id}.")
+            for future in waiting:
+                future.set_exception(e)
+            return
+
+        self.bot.stats.incr("mod_log.messages_sent")
+        now = time.monotonic()
+        for queued in batch:
+            self.bot.stats.timing("mod_log.queue_latency", (now - queued.queued_at) * 1000)
+        for future in futures:
+            if not future.done():
+                future.set_result(message)
+
     @Cog.listener()
     async def on_guild_channel_create(self, channel: GUILD_CHANNEL) -> None:
         """Log channel create event to mod log."""
@@ -184,8 +377,7 @@ class ModLog(Cog, name="ModLog"):
         if before.guild.id != GuildConstant.id:
             return
 
-        if before.id in self._ignored[Event.guild_channel_update]:
-            self._ignored[Event.guild_channel_update].remove(before.id)
+        if self._ignored[Event.guild_channel_update].discard(before.id):
             return
 
         # Two channel updates are sent for a single edit: 1 for topic and 1 for category change.
@@ -379,8 +571,7 @@ class ModLog(Cog, name="ModLog"):
         if guild.id != GuildConstant.id:
             return
 
-        if member.id in self._ignored[Event.member_ban]:
-            self._ignored[Event.member_ban].remove(member.id)
+        if self._ignored[Event.member_ban].discard(member.id):
             return
 
         await self.send_log_message(
@@ -419,8 +610,7 @@ class ModLog(Cog, name="ModLog"):
         if member.guild.id != GuildConstant.id:
             return
 
-        if member.id in self._ignored[Event.member_remove]:
-            self._ignored[Event.member_remove].remove(member.id)
+        if self._ignored[Event.member_remove].discard(member.id):
             return
 
         member_str = escape_markdown(str(member))
@@ -437,8 +627,7 @@ class ModLog(Cog, name="ModLog"):
         if guild.id != GuildConstant.id:
             return
 
-        if member.id in self._ignored[Event.member_unban]:
-            self._ignored[Event.member_unban].remove(member.id)
+        if self._ignored[Event.member_unban].discard(member.id):
             return
 
         member_str = escape_markdown(str(member))
@@ -455,8 +644,7 @@ class ModLog(Cog, name="ModLog"):
         if before.guild.id != GuildConstant.id:
             return
 
-        if before.id in self._ignored[Event.member_update]:
-            self._ignored[Event.member_update].remove(before.id)
+        if self._ignored[Event.member_update].discard(before.id):
             return
 
         diff = DeepDiff(before, after)
@@ -555,10 +743,7 @@ class ModLog(Cog, name="ModLog"):
         if message.guild.id != GuildConstant.id or channel.id in GuildConstant.modlog_blacklist:
             return
 
-        self._cached_deletes.append(message.id)
-
-        if message.id in self._ignored[Event.message_delete]:
-            self._ignored[Event.message_delete].remove(message.id)
+        if self._ignored[Event.message_delete].discard(message.id):
             return
 
         if author.bot:
@@ -609,15 +794,11 @@ class ModLog(Cog, name="ModLog"):
         if event.guild_id != GuildConstant.id or event.channel_id in GuildConstant.modlog_blacklist:
             return
 
-        await asyncio.sleep(1)  # Wait here in case the normal event was fired
-
-        if event.message_id in self._cached_deletes:
-            # It was in the cache and the normal event was fired, so we can just ignore it
-            self._cached_deletes.remove(event.message_id)
+        if event.cached_message is not None:
+            # The message was cached, so `on_message_delete` is dispatched for it and logs it.
             return
 
-        if event.message_id in self._ignored[Event.message_delete]:
-            self._ignored[Event.message_delete].remove(event.message_id)
+        if self._ignored[Event.message_delete].discard(event.message_id):
             return
 
         channel = self.bot.get_channel(event.channel_id)
@@ -644,6 +825,49 @@ class ModLog(Cog, name="ModLog"):
             channel_id=Channels.message_log
         )
 
+    @Cog.listener()
+    async def on_raw_bulk_message_delete(self, event: discord.RawBulkMessageDeleteEvent) -> None:
+        """Log a bulk message delete event to message change log as a single entry."""
+        if event.guild_id != GuildConstant.id or event.channel_id in GuildConstant.modlog_blacklist:
+            return
+
+        # Deletes of ignored messages, e.g. by the clean command or antispam, are logged by those instead.
+        ignored = self._ignored[Event.message_delete]
+        message_ids = {message_id for message_id in event.message_ids if not ignored.discard(message_id)}
+
+        cached_messages = [message for message in event.cached_messages if message.id in message_ids]
+        bot_messages = sum(message.author.bot for message in cached_messages)
+        cached_messages = [message for message in cached_messages if not message.author.bot]
+
+        # Like single deletes, those of messages sent by bots aren't logged.
+        total = len(message_ids) - bot_messages
+        if not total:
+            return
+
+        channel = self.bot.get_channel(event.channel_id)
+        channel_name = f"{channel.category}/#{channel.name}" if channel.category else f"#{channel.name}"
+
+        response = (
+            f"**Channel:** {channel_name} (`{channel.id}`)\n"
+            f"**Messages:** {total}\n"
+            "\n"
+        )
+
+        if cached_messages:
+            botlog_url = await self.upload_log(messages=cached_messages, actor_id=self.bot.user.id)
+            response += f"[View the {len(cached_messages)} cached messages]({botlog_url})\n"
+
+        uncached = total - len(cached_messages)
+        if uncached:
+            response += f"{uncached} of the messages were not cached, so their content cannot be displayed."
+
+        await self.send_log_message(
+            Icons.message_bulk_delete, Colours.soft_red,
+            "Messages bulk deleted",
+            response,
+            channel_id=Channels.message_log
+        )
+
     @Cog.listener()
     async def on_message_edit(self, msg_before: discord.Message, msg_after: discord.Message) -> None:
         """Log message edit event to message change log."""
@@ -655,8 +879,6 @@ class ModLog(Cog, name="ModLog"):
         ):
             return
 
-        self._cached_edits.append(msg_before.id)
-
         if msg_before.content == msg_after.content:
             return
 
@@ -725,6 +947,10 @@ class ModLog(Cog, name="ModLog"):
     @Cog.listener()
     async def on_raw_message_edit(self, event: discord.RawMessageUpdateEvent) -> None:
         """Log raw message edit event to message change log."""
+        if event.cached_message is not None:
+            # The message was cached, so `on_message_edit` is dispatched for it and logs it.
+            return
+
         try:
             channel = self.bot.get_channel(int(event.data["channel_id"]))
             message = await channel.fetch_message(event.message_id)
@@ -739,13 +965,6 @@ class ModLog(Cog, name="ModLog"):
         ):
             return
 
-        await asyncio.sleep(1)  # Wait here in case the normal event was fired
-
-        if event.message_id in self._cached_edits:
-            # It was in the cache and the normal event was fired, so we can just ignore it
-            self._cached_edits.remove(event.message_id)
-            return
-
         author = message.author
         channel = message.channel
         channel_name = f"{channel.category}/#{channel.name}" if channel.category else f"#{channel.name}"
@@ -790,8 +1009,7 @@ class ModLog(Cog, name="ModLog"):
         ):
             return
 
-        if member.id in self._ignored[Event.voice_state_update]:
-            self._ignored[Event.voice_state_update].remove(member.id)
+        if self._ignored[Event.voice_state_update].discard(member.id):
             return
 
         # Exclude all channel attributes except the name.
@@ -19,6 +19,10 @@ from .scheduler import InfractionScheduler
 log = logging.getLogger(__name__)
 NICKNAME_POLICY_URL = "https://pythondiscord.com/pages/rules/#nickname-policy"
 
+# Nickname changes are frequent, so a member's active superstars are looked up in the API client's cache first.
+# Infractions changed by the bot invalidate it; the TTL bounds how stale changes made on the site can be.
+ACTIVE_SUPERSTARS_CACHE_TTL = 60
+
 with Path("bot/resources/stars.json").open(encoding="utf-8") as stars_file:
     STAR_NAMES = json.load(stars_file)
 
@@ -46,7 +50,8 @@ class Superstarify(InfractionScheduler, Cog):
                 "active": "true",
                 "type": "superstar",
                 "user__id": str(before.id)
-            }
+            },
+            cache_ttl=ACTIVE_SUPERSTARS_CACHE_TTL
         )
 
         if not active_superstarifies:
@@ -91,7 +96,8 @@ class Superstarify(InfractionScheduler, Cog):
                 "active": "true",
                 "type": "superstar",
                 "user__id": member.id
-            }
+            },
+            cache_ttl=ACTIVE_SUPERSTARS_CACHE_TTL
         )
 
         if active_superstarifies:
@@ -14,6 +14,7 @@ from bot.pagination import LinePaginator
 
 
 CHANNELS = (Channels.off_topic_0, Channels.off_topic_1, Channels.off_topic_2)
+NAMES_CACHE_TTL = 10 * 60  # Adding or removing a name clears the cached list early.
 log = logging.getLogger(__name__)
 
 
@@ -107,7 +108,7 @@ class OffTopicNames(Cog):
 
         The name is not added if it is too similar to an existing name.
         """
-        existing_names = await self.bot.api_client.get('bot/off-topic-channel-names')
+        existing_names = await self.bot.api_client.get('bot/off-topic-channel-names', cache_ttl=NAMES_CACHE_TTL)
         close_match = difflib.get_close_matches(name, existing_names, n=1, cutoff=0.8)
 
         if close_match:
@@ -152,7 +153,7 @@ class OffTopicNames(Cog):
 
         Restricted to Moderator and above to not spoil the surprise.
         """
-        result = await self.bot.api_client.get('bot/off-topic-channel-names')
+        result = await self.bot.api_client.get('bot/off-topic-channel-names', cache_ttl=NAMES_CACHE_TTL)
         lines = sorted(f"• {name}" for name in result)
         embed = Embed(
             title=f"Known off-topic names (`{len(result)}` total)",
@@ -168,7 +169,7 @@ class OffTopicNames(Cog):
     @with_role(*MODERATION_ROLES)
     async def search_command(self, ctx: Context, *, query: OffTopicName) -> None:
         """Search for an off-topic name."""
-        result = await self.bot.api_client.get('bot/off-topic-channel-names')
+        result = await self.bot.api_client.get('bot/off-topic-channel-names', cache_ttl=NAMES_CACHE_TTL)
         in_matches = {name for name in result if query in name}
         close_matches = difflib.get_close_matches(query, result, n=10, cutoff=0.70)
         lines = sorted(f"• {name}" for name in in_matches.union(close_matches))
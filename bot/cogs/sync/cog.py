@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from discord import Member, Role, User
 from discord.ext import commands
@@ -12,6 +13,15 @@ from bot.cogs.sync import syncers
 
 log = logging.getLogger(__name__)
 
+# Changes to a user are held back for this many seconds, so further changes can be sent with them.
+UPDATE_DELAY = 2
+
+# Once this many users have changes waiting, they are sent right away; new changes wait until they are.
+MAX_PENDING_UPDATES = 500
+
+# The maximum number of PATCH requests in flight while sending pending changes.
+MAX_CONCURRENT_UPDATES = 10
+
 
 class Sync(Cog):
     """Captures relevant events and sends them to the site."""
@@ -21,8 +31,26 @@ class Sync(Cog):
         self.role_syncer = syncers.RoleSyncer(self.bot)
         self.user_syncer = syncers.UserSyncer(self.bot)
 
+        # Maps user IDs to the changed fields that weren't sent to the site yet.
+        self._pending_updates: Dict[int, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
         self.bot.loop.create_task(self.sync_guild())
 
+    def cog_unload(self) -> None:
+        """Save the snapshots of the synced state and send the pending user changes before the bot closes."""
+        if self._flush_task:
+            self._flush_task.cancel()
+
+        # Users with pending changes keep the entry of the state last sent to the site. If the changes
+        # aren't sent before the bot shuts down, the next sync finds that entry outdated, or the user
+        # missing from the guild, and sends them again.
+        for syncer in (self.role_syncer, self.user_syncer):
+            syncer.save_snapshot()
+
+        self.bot.closing_tasks.append(self.bot.loop.create_task(self.flush_user_updates()))
+
     async def sync_guild(self) -> None:
         """Syncs the roles/users of the guild with the database."""
         await self.bot.wait_until_guild_available()
@@ -32,7 +60,7 @@ class Sync(Cog):
             return
 
         for syncer in (self.role_syncer, self.user_syncer):
-            await syncer.sync(guild)
+            await syncer.sync(guild, use_snapshot=True)
 
     async def patch_user(self, user_id: int, updated_information: Dict[str, Any]) -> None:
         """Send a PATCH request to partially update a user in the database."""
@@ -43,6 +71,64 @@ class Sync(Cog):
                 raise
             log.warning("Unable to update user, got 404. Assuming race condition from join event.")
 
+    async def queue_user_update(self, user_id: int, updated_information: Dict[str, Any]) -> None:
+        """
+        Queue a partial update of a user in the database, to be sent after `UPDATE_DELAY` seconds.
+
+        Changes to the same user made until then are merged and sent with a single PATCH request.
+        If `MAX_PENDING_UPDATES` users have pending changes, they are sent before this returns.
+        """
+        self._pending_updates.setdefault(user_id, {}).update(updated_information)
+        self.bot.stats.gauge("sync.pending_updates", len(self._pending_updates))
+
+        if len(self._pending_updates) >= MAX_PENDING_UPDATES:
+            await self.flush_user_updates()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = self.bot.loop.create_task(self._flush_user_updates_later())
+
+    async def _flush_user_updates_later(self) -> None:
+        """Send the pending user changes after `UPDATE_DELAY` seconds."""
+        await asyncio.sleep(UPDATE_DELAY)
+
+        # Changes queued during the flush schedule a new one.
+        self._flush_task = None
+        await self.flush_user_updates()
+
+    async def flush_user_updates(self) -> None:
+        """Send all pending user changes, with up to `MAX_CONCURRENT_UPDATES` requests at once."""
+        async with self._flush_lock:
+            updates, self._pending_updates = self._pending_updates, {}
+            if not updates:
+                return
+
+            log.trace(f"Sending pending changes of {len(updates)} users.")
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPDATES)
+
+            async def send(user_id: int, updated_information: Dict[str, Any]) -> None:
+                async with semaphore:
+                    await self.patch_user(user_id, updated_information=updated_information)
+
+            with self.bot.stats.timer("sync.flush_updates"):
+                results = await asyncio.gather(
+                    *(send(user_id, info) for user_id, info in updates.items()),
+                    return_exceptions=True
+                )
+
+            self.bot.stats.incr("sync.updates_sent", len(updates))
+            self.bot.stats.gauge("sync.pending_updates", len(self._pending_updates))
+
+            guild = self.bot.get_guild(constants.Guild.id)
+            for user_id, result in zip(updates, results):
+                if isinstance(result, Exception):
+                    log.error(f"Failed to update user {user_id}: {result}", exc_info=result)
+                elif user_id not in self._pending_updates:
+                    # Only changes that were sent can be recorded; newer ones are still pending.
+                    member = guild and guild.get_member(user_id)
+                    if member:
+                        self.user_syncer.record(member)
+                    else:
+                        self.user_syncer.forget(user_id)
+
     @Cog.listener()
     async def on_guild_role_create(self, role: Role) -> None:
         """Adds newly create role to the database table over the API."""
@@ -56,11 +142,13 @@ class Sync(Cog):
                 'position': role.position,
             }
         )
+        self.role_syncer.record(role)
 
     @Cog.listener()
     async def on_guild_role_delete(self, role: Role) -> None:
         """Deletes role from the database when it's deleted from the guild."""
         await self.bot.api_client.delete(f'bot/roles/{role.id}')
+        self.role_syncer.forget(role.id)
 
     @Cog.listener()
     async def on_guild_role_update(self, before: Role, after: Role) -> None:
@@ -82,6 +170,7 @@ class Sync(Cog):
                     'position': after.position,
                 }
             )
+            self.role_syncer.record(after)
 
     @Cog.listener()
     async def on_member_join(self, member: Member) -> None:
@@ -101,6 +190,9 @@ class Sync(Cog):
             'roles': sorted(role.id for role in member.roles)
         }
 
+        # The PUT below overwrites every field, so older pending changes must not be applied after it.
+        self._pending_updates.pop(member.id, None)
+
         got_error = False
 
         try:
@@ -119,17 +211,19 @@ class Sync(Cog):
             # If we got `404`, the user is new. Create them.
             await self.bot.api_client.post('bot/users', json=packed)
 
+        self.user_syncer.record(member)
+
     @Cog.listener()
     async def on_member_remove(self, member: Member) -> None:
         """Set the in_guild field to False when a member leaves the guild."""
-        await self.patch_user(member.id, updated_information={"in_guild": False})
+        await self.queue_user_update(member.id, updated_information={"in_guild": False})
 
     @Cog.listener()
     async def on_member_update(self, before: Member, after: Member) -> None:
         """Update the roles of the member in the database if a change is detected."""
         if before.roles != after.roles:
             updated_information = {"roles": sorted(role.id for role in after.roles)}
-            await self.patch_user(after.id, updated_information=updated_information)
+            await self.queue_user_update(after.id, updated_information=updated_information)
 
     @Cog.listener()
     async def on_user_update(self, before: User, after: User) -> None:
@@ -141,7 +235,7 @@ class Sync(Cog):
                 "discriminator": int(after.discriminator),
                 "avatar_hash": after.avatar,
             }
-            await self.patch_user(after.id, updated_information=updated_information)
+            await self.queue_user_update(after.id, updated_information=updated_information)
 
     @commands.group(name='sync')
     @commands.has_permissions(administrator=True)
@@ -1,11 +1,15 @@
 import abc
 import asyncio
+import hashlib
+import json
 import logging
+import time
 import typing as t
 from collections import namedtuple
 from functools import partial
+from pathlib import Path
 
-from discord import Guild, HTTPException, Member, Message, Reaction, User
+from discord import Guild, HTTPException, Member, Message, Reaction, Role, User
 from discord.ext.commands import Context
 
 from bot import constants
@@ -20,6 +24,62 @@ _Role = namedtuple('Role', ('id', 'name', 'colour', 'permissions', 'position'))
 _User = namedtuple('User', ('id', 'name', 'discriminator', 'avatar_hash', 'roles', 'in_guild'))
 _Diff = namedtuple('Diff', ('created', 'updated', 'deleted'))
 
+# An object of which only the ID is known, because it was diffed against a snapshot rather than the site.
+_SnapshotEntry = namedtuple('SnapshotEntry', ('id',))
+
+# The maximum number of requests to per-item endpoints which are in flight at the same time.
+MAX_CONCURRENT_REQUESTS = 10
+
+# The number of users created with each request to the bulk endpoint.
+BULK_CREATE_SIZE = 1000
+
+# The minimum number of seconds between two progress reports of a sync.
+PROGRESS_INTERVAL = 15
+
+# The number of users requested per page when diffing users. Each page is parsed whole by the API
+# client, so this also bounds the memory used for parsing the response.
+USERS_PAGE_SIZE = 10_000
+
+# Where the snapshots of the synced state are kept while the bot isn't running.
+SNAPSHOT_DIRECTORY = Path("data", "sync")
+
+# Snapshots older than this many seconds aren't used, since the site may have been changed by other means.
+SNAPSHOT_MAX_AGE = 60 * 60
+
+
+def _digest(obj: tuple) -> str:
+    """Return a short digest of the synced fields of `obj`, which is stable across restarts."""
+    return hashlib.blake2b(json.dumps(obj).encode(), digest_size=8).hexdigest()
+
+
+class _SyncProgress:
+    """Counts the changes a sync sent to the site and periodically reports the count."""
+
+    def __init__(self, name: str, total: int, message: t.Optional[Message] = None, mention: str = ""):
+        self.name = name
+        self.total = total
+        self.done = 0
+
+        self._message = message
+        self._mention = mention
+        self._last_report = time.monotonic()
+
+    async def advance(self, count: int = 1) -> None:
+        """Count `count` more changes as sent, and report the progress if it wasn't reported recently."""
+        self.done += count
+
+        now = time.monotonic()
+        if now - self._last_report < PROGRESS_INTERVAL or self.done >= self.total:
+            return
+
+        self._last_report = now
+        log.info(f"{self.name} syncer progress: {self.done}/{self.total} changes sent.")
+
+        if self._message:
+            await self._message.edit(
+                content=f"📊 {self._mention}Synchronising {self.name}s: `{self.done}/{self.total}` changes sent."
+            )
+
 
 class Syncer(abc.ABC):
     """Base class for synchronising the database with objects in the Discord cache."""
@@ -29,6 +89,11 @@ class Syncer(abc.ABC):
 
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
+        self._progress = _SyncProgress(self.name, 0)
+
+        # Maps IDs to digests of the objects as they were last sent to the site. It's None while the
+        # state of the site is unknown, e.g. before the first sync or after a failed one.
+        self.snapshot: t.Optional[t.Dict[int, str]] = None
 
     @property
     @abc.abstractmethod
@@ -147,6 +212,145 @@ class Syncer(abc.ABC):
         """Perform the API calls for synchronisation."""
         raise NotImplementedError  # pragma: no cover
 
+    @abc.abstractmethod
+    def _to_tuple(self, obj: t.Union[Role, Member]) -> tuple:
+        """Return the synced fields of `obj` in the format of the database."""
+        raise NotImplementedError  # pragma: no cover
+
+    @abc.abstractmethod
+    def _get_guild_objects(self, guild: Guild) -> t.Iterable[tuple]:
+        """Return the synced fields of the objects in the cache of `guild`, in the format of the database."""
+        raise NotImplementedError  # pragma: no cover
+
+    @property
+    def _snapshot_path(self) -> Path:
+        return SNAPSHOT_DIRECTORY / f"{self.name}s.json"
+
+    def record(self, obj: t.Union[Role, Member]) -> None:
+        """Record in the snapshot that the current state of `obj` was sent to the site."""
+        if self.snapshot is not None:
+            self.snapshot[obj.id] = _digest(self._to_tuple(obj))
+
+    def forget(self, obj_id: int) -> None:
+        """Record in the snapshot that the object with `obj_id` was removed from the site."""
+        if self.snapshot is not None:
+            self.snapshot.pop(obj_id, None)
+
+    def save_snapshot(self) -> None:
+        """Write the snapshot to disk, unless the state of the site is unknown."""
+        if self.snapshot is None:
+            return
+
+        log.info(f"Saving the snapshot of {len(self.snapshot)} {self.name}s.")
+        data = {"saved_at": time.time(), "digests": self.snapshot}
+
+        path = self._snapshot_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so an interrupted write can't leave a truncated snapshot.
+        temp_path = path.with_suffix(".tmp")
+        with temp_path.open("w", encoding="utf-8") as file:
+            json.dump(data, file)
+        temp_path.replace(path)
+
+    def load_snapshot(self) -> bool:
+        """
+        Load the snapshot written to disk on the last shutdown and return True if it can be used.
+
+        The file is deleted once read: from then on, the bot may change the site without the file
+        being updated, so it must not be read again if the bot doesn't shut down cleanly.
+        """
+        path = self._snapshot_path
+
+        try:
+            with path.open(encoding="utf-8") as file:
+                data = json.load(file)
+
+            saved_at = float(data["saved_at"])
+            snapshot = {int(obj_id): digest for obj_id, digest in data["digests"].items()}
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            log.warning(f"Failed to read the {self.name} snapshot; ignoring it.", exc_info=True)
+            return False
+        finally:
+            path.unlink(missing_ok=True)
+
+        age = time.time() - saved_at
+        if age > SNAPSHOT_MAX_AGE:
+            log.info(f"The {self.name} snapshot is {age:.0f} seconds old; ignoring it.")
+            return False
+
+        log.info(f"Loaded the snapshot of {len(snapshot)} {self.name}s.")
+        self.snapshot = snapshot
+        return True
+
+    def _compare_with_snapshot(self, guild: Guild) -> t.Tuple[t.Set[tuple], t.Set[tuple], t.Set[_SnapshotEntry]]:
+        """
+        Compare the cache of `guild` with the snapshot instead of downloading the objects from the site.
+
+        Return the objects missing from the snapshot, the objects whose digest changed, and entries
+        for the IDs which are only in the snapshot.
+        """
+        log.trace(f"Comparing {self.name}s with the snapshot.")
+        new = set()
+        changed = set()
+        guild_ids = set()
+
+        for obj in self._get_guild_objects(guild):
+            guild_ids.add(obj.id)
+            digest = self.snapshot.get(obj.id)
+
+            if digest is None:
+                new.add(obj)
+            elif digest != _digest(obj):
+                changed.add(obj)
+
+        removed = {_SnapshotEntry(obj_id) for obj_id in self.snapshot.keys() - guild_ids}
+        return new, changed, removed
+
+    def _get_snapshot_diff(self, guild: Guild) -> _Diff:
+        """Return the difference between the cache of `guild` and the snapshot."""
+        return _Diff(*self._compare_with_snapshot(guild))
+
+    async def _send_concurrently(
+        self,
+        items: t.Iterable[t.Any],
+        send: t.Callable[[t.Any], t.Awaitable[t.Any]]
+    ) -> None:
+        """
+        Await `send` for each of `items`, with at most `MAX_CONCURRENT_REQUESTS` of them running at once.
+
+        If one of the requests fails, the ones in flight are cancelled, the remaining items are
+        skipped, and the error is raised. Because every sync computes a fresh diff, the next sync
+        picks up where the failed one stopped.
+        """
+        items = iter(items)
+        failed = False
+
+        async def worker() -> None:
+            nonlocal failed
+
+            # All workers share the iterator, so each item is only sent once.
+            for item in items:
+                if failed:
+                    return
+
+                try:
+                    await send(item)
+                except Exception:
+                    failed = True
+                    raise
+
+                await self._progress.advance()
+
+        workers = [asyncio.create_task(worker()) for _ in range(MAX_CONCURRENT_REQUESTS)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
     async def _get_confirmation_result(
         self,
         diff_size: int,
@@ -175,13 +379,16 @@ class Syncer(abc.ABC):
 
         return True, message
 
-    async def sync(self, guild: Guild, ctx: t.Optional[Context] = None) -> None:
+    async def sync(self, guild: Guild, ctx: t.Optional[Context] = None, use_snapshot: bool = False) -> None:
         """
         Synchronise the database with the cache of `guild`.
 
         If the differences between the cache and the database are greater than
         `bot.constants.Sync.max_diff`, then a confirmation prompt will be sent to the dev-core
         channel. The confirmation can be optionally redirect to `ctx` instead.
+
+        If `use_snapshot` is True and a recent snapshot was saved on the last shutdown, the cache is
+        compared with the snapshot instead of the objects on the site, which aren't downloaded.
         """
         log.info(f"Starting {self.name} syncer.")
 
@@ -191,7 +398,14 @@ class Syncer(abc.ABC):
             message = await ctx.send(f"📊 Synchronising {self.name}s.")
             author = ctx.author
 
-        diff = await self._get_diff(guild)
+        if use_snapshot and self.load_snapshot():
+            diff = self._get_snapshot_diff(guild)
+        else:
+            diff = await self._get_diff(guild)
+
+        # Until the sync succeeds, what the site holds isn't known.
+        self.snapshot = None
+
         diff_dict = diff._asdict()  # Ugly method for transforming the NamedTuple into a dict
         totals = {k: len(v) for k, v in diff_dict.items() if v is not None}
         diff_size = sum(totals.values())
@@ -203,16 +417,22 @@ class Syncer(abc.ABC):
         # Preserve the core-dev role mention in the message edits so users aren't confused about
         # where notifications came from.
         mention = self._CORE_DEV_MENTION if author.bot else ""
+        self._progress = _SyncProgress(self.name, diff_size, message, mention)
 
         try:
             await self._sync(diff)
         except ResponseCodeError as e:
-            log.exception(f"{self.name} syncer failed!")
+            log.exception(f"{self.name} syncer failed after {self._progress.done}/{diff_size} changes!")
 
             # Don't show response text because it's probably some really long HTML.
             results = f"status {e.status}\n```{e.response_json or 'See log output for details'}```"
-            content = f":x: {mention}Synchronisation of {self.name}s failed: {results}"
+            content = (
+                f":x: {mention}Synchronisation of {self.name}s failed after "
+                f"`{self._progress.done}/{diff_size}` changes: {results}"
+            )
         else:
+            self.snapshot = {obj.id: _digest(obj) for obj in self._get_guild_objects(guild)}
+
             results = ", ".join(f"{name} `{total}`" for name, total in totals.items())
             log.info(f"{self.name} syncer finished: {results}.")
             content = f":ok_hand: {mention}Synchronisation of {self.name}s complete: {results}"
@@ -226,6 +446,20 @@ class RoleSyncer(Syncer):
 
     name = "role"
 
+    def _to_tuple(self, role: Role) -> _Role:
+        """Return the synced fields of `role` in the format of the database."""
+        return _Role(
+            id=role.id,
+            name=role.name,
+            colour=role.colour.value,
+            permissions=role.permissions.value,
+            position=role.position,
+        )
+
+    def _get_guild_objects(self, guild: Guild) -> t.Iterator[_Role]:
+        """Return the synced fields of the roles of `guild`."""
+        return (self._to_tuple(role) for role in guild.roles)
+
     async def _get_diff(self, guild: Guild) -> _Diff:
         """Return the difference of roles between the cache of `guild` and the database."""
         log.trace("Getting the diff for roles.")
@@ -234,16 +468,7 @@ class RoleSyncer(Syncer):
         # Pack DB roles and guild roles into one common, hashable format.
         # They're hashable so that they're easily comparable with sets later.
         db_roles = {_Role(**role_dict) for role_dict in roles}
-        guild_roles = {
-            _Role(
-                id=role.id,
-                name=role.name,
-                colour=role.colour.value,
-                permissions=role.permissions.value,
-                position=role.position,
-            )
-            for role in guild.roles
-        }
+        guild_roles = set(self._get_guild_objects(guild))
 
         guild_role_ids = {role.id for role in guild_roles}
         api_role_ids = {role.id for role in db_roles}
@@ -260,17 +485,18 @@ class RoleSyncer(Syncer):
 
     async def _sync(self, diff: _Diff) -> None:
         """Synchronise the database with the role cache of `guild`."""
+        api = self.bot.api_client
+
         log.trace("Syncing created roles...")
-        for role in diff.created:
-            await self.bot.api_client.post('bot/roles', json=role._asdict())
+        await self._send_concurrently(diff.created, lambda role: api.post('bot/roles', json=role._asdict()))
 
         log.trace("Syncing updated roles...")
-        for role in diff.updated:
-            await self.bot.api_client.put(f'bot/roles/{role.id}', json=role._asdict())
+        await self._send_concurrently(
+            diff.updated, lambda role: api.put(f'bot/roles/{role.id}', json=role._asdict())
+        )
 
         log.trace("Syncing deleted roles...")
-        for role in diff.deleted:
-            await self.bot.api_client.delete(f'bot/roles/{role.id}')
+        await self._send_concurrently(diff.deleted, lambda role: api.delete(f'bot/roles/{role.id}'))
 
 
 class UserSyncer(Syncer):
@@ -278,65 +504,121 @@ class UserSyncer(Syncer):
 
     name = "user"
 
-    async def _get_diff(self, guild: Guild) -> _Diff:
-        """Return the difference of users between the cache of `guild` and the database."""
-        log.trace("Getting the diff for users.")
-        users = await self.bot.api_client.get('bot/users')
+    async def _get_db_users(self) -> t.AsyncIterator[t.List[dict]]:
+        """
+        Yield the users in the database one page at a time.
 
-        # Pack DB roles and guild roles into one common, hashable format.
-        # They're hashable so that they're easily comparable with sets later.
-        db_users = {
-            user_dict['id']: _User(
-                roles=tuple(sorted(user_dict.pop('roles'))),
-                **user_dict
-            )
-            for user_dict in users
-        }
-        guild_users = {
-            member.id: _User(
-                id=member.id,
-                name=member.name,
-                discriminator=int(member.discriminator),
-                avatar_hash=member.avatar,
-                roles=tuple(sorted(role.id for role in member.roles)),
-                in_guild=True
+        If the site responds with a plain list rather than a page, it doesn't paginate users and
+        the list, which holds all users, is yielded as the only page.
+        """
+        page = 1
+        while page is not None:
+            response = await self.bot.api_client.get(
+                'bot/users', params={'page': page, 'page_size': USERS_PAGE_SIZE}
             )
-            for member in guild.members
-        }
 
-        users_to_create = set()
+            if isinstance(response, list):
+                yield response
+                return
+
+            yield response['results']
+            page = response.get('next_page_no')
+
+    def _to_tuple(self, member: Member) -> _User:
+        """Return the synced fields of `member` in the format of the database."""
+        return _User(
+            id=member.id,
+            name=member.name,
+            discriminator=int(member.discriminator),
+            avatar_hash=member.avatar,
+            roles=tuple(sorted(role.id for role in member.roles)),
+            in_guild=True
+        )
+
+    def _get_guild_objects(self, guild: Guild) -> t.Iterator[_User]:
+        """Return the synced fields of the members of `guild`."""
+        return (self._to_tuple(member) for member in guild.members)
+
+    def _get_snapshot_diff(self, guild: Guild) -> _Diff:
+        """
+        Return the difference between the cache of `guild` and the snapshot.
+
+        The snapshot only holds members, so a member missing from it may have been a member before.
+        Such members are updated instead of created, and created if the update finds no user.
+        Members who left are updated to not be in the guild anymore.
+        """
+        new, changed, left = self._compare_with_snapshot(guild)
+        return _Diff(set(), new | changed | left, None)
+
+    async def _get_diff(self, guild: Guild) -> _Diff:
+        """
+        Return the difference of users between the cache of `guild` and the database.
+
+        The users in the database are compared page by page, and each page is dropped once compared.
+        Besides the diff, only the IDs of the guild members found in the database are kept.
+        """
+        log.trace("Getting the diff for users.")
+        members = {member.id: member for member in guild.members}
+        members_in_db = set()
         users_to_update = set()
 
-        for db_user in db_users.values():
-            guild_user = guild_users.get(db_user.id)
-            if guild_user is not None:
-                if db_user != guild_user:
-                    users_to_update.add(guild_user)
-
-            elif db_user.in_guild:
-                # The user is known in the DB but not the guild, and the
-                # DB currently specifies that the user is a member of the guild.
-                # This means that the user has left since the last sync.
-                # Update the `in_guild` attribute of the user on the site
-                # to signify that the user left.
-                new_api_user = db_user._replace(in_guild=False)
-                users_to_update.add(new_api_user)
-
-        new_user_ids = set(guild_users.keys()) - set(db_users.keys())
-        for user_id in new_user_ids:
-            # The user is known on the guild but not on the API. This means
-            # that the user has joined since the last sync. Create it.
-            new_user = guild_users[user_id]
-            users_to_create.add(new_user)
+        async for page in self._get_db_users():
+            for user_dict in page:
+                db_user = _User(roles=tuple(sorted(user_dict.pop('roles'))), **user_dict)
+                member = members.get(db_user.id)
+
+                if member is not None:
+                    members_in_db.add(db_user.id)
+                    guild_user = self._to_tuple(member)
+                    if db_user != guild_user:
+                        users_to_update.add(guild_user)
+
+                elif db_user.in_guild:
+                    # The user is known in the DB but not the guild, and the
+                    # DB currently specifies that the user is a member of the guild.
+                    # This means that the user has left since the last sync.
+                    # Update the `in_guild` attribute of the user on the site
+                    # to signify that the user left.
+                    users_to_update.add(db_user._replace(in_guild=False))
+
+        # Members which aren't known on the API have joined since the last sync. Create them.
+        users_to_create = {
+            self._to_tuple(member)
+            for member_id, member in members.items()
+            if member_id not in members_in_db
+        }
 
         return _Diff(users_to_create, users_to_update, None)
 
     async def _sync(self, diff: _Diff) -> None:
-        """Synchronise the database with the user cache of `guild`."""
+        """
+        Synchronise the database with the user cache of `guild`.
+
+        New users are created in batches of `BULK_CREATE_SIZE` through the bulk form of the create
+        endpoint, which takes a list of the payloads the endpoint takes for a single user.
+        """
         log.trace("Syncing created users...")
-        for user in diff.created:
-            await self.bot.api_client.post('bot/users', json=user._asdict())
+        created = [user._asdict() for user in diff.created]
+        for start in range(0, len(created), BULK_CREATE_SIZE):
+            batch = created[start:start + BULK_CREATE_SIZE]
+            await self.bot.api_client.post('bot/users', json=batch)
+            await self._progress.advance(len(batch))
 
         log.trace("Syncing updated users...")
-        for user in diff.updated:
+        await self._send_concurrently(diff.updated, self._update_user)
+
+    async def _update_user(self, user: t.Union[_User, _SnapshotEntry]) -> None:
+        """Update `user` in the database, creating it if it doesn't exist yet."""
+        if isinstance(user, _SnapshotEntry):
+            # All that's known of a member who left is their ID.
+            await self.bot.api_client.patch(f'bot/users/{user.id}', json={'in_guild': False})
+            return
+
+        try:
             await self.bot.api_client.put(f'bot/users/{user.id}', json=user._asdict())
+        except ResponseCodeError as e:
+            if e.status != 404:
+                raise
+
+            log.trace(f"User {user.id} doesn't exist yet; creating it.")
+            await self.bot.api_client.post('bot/users', json=user._asdict())
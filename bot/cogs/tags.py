@@ -1,8 +1,9 @@
 import logging
 import re
 import time
+from collections import defaultdict
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Set
 
 from discord import Colour, Embed
 from discord.ext.commands import Cog, Context, group
@@ -12,6 +13,7 @@ from bot.bot import Bot
 from bot.converters import TagNameConverter
 from bot.pagination import LinePaginator
 from bot.utils.messages import wait_for_deletion
+from bot.utils.trigrams import SubstringIndex
 
 log = logging.getLogger(__name__)
 
@@ -31,6 +33,7 @@ class Tags(Cog):
         self.bot = bot
         self.tag_cooldowns = {}
         self._cache = self.get_tags()
+        self._build_index()
 
     @staticmethod
     def get_tags() -> dict:
@@ -49,6 +52,27 @@ class Tags(Cog):
             cache[tag_title] = tag
         return cache
 
+    def _build_index(self) -> None:
+        """Index the titles and contents of the cached tags for suggestions and content searches."""
+        # Results are returned in the order of the cache.
+        self._positions: Dict[str, int] = {title: position for position, title in enumerate(self._cache)}
+
+        # `_fuzzy_search` only matches the start of words, so a tag can only match a name if one of
+        # the words in its title starts with the first letter of the name.
+        self._titles_by_initial: Dict[str, Set[str]] = defaultdict(set)
+        for title in self._cache:
+            for word in REGEX_NON_ALPHABET.split(title.lower()):
+                if word:
+                    self._titles_by_initial[word[0]].add(title)
+
+        self._content_index = SubstringIndex({
+            title: tag['embed']['description'] for title, tag in self._cache.items()
+        })
+
+    def _in_cache_order(self, titles: Iterable[str]) -> list:
+        """Return the tags with `titles` in the order of the cache."""
+        return [self._cache[title] for title in sorted(titles, key=self._positions.__getitem__)]
+
     @staticmethod
     def _fuzzy_search(search: str, target: str) -> float:
         """A simple scoring algorithm based on how many letters are found / total, with order in mind."""
@@ -68,21 +92,24 @@ class Tags(Cog):
 
     def _get_suggestions(self, tag_name: str, thresholds: Optional[List[int]] = None) -> List[str]:
         """Return a list of suggested tags."""
+        letters = REGEX_NON_ALPHABET.sub('', tag_name.lower())
+        candidates = self._titles_by_initial.get(letters[:1], ())
+
         scores: Dict[str, int] = {
-            tag_title: Tags._fuzzy_search(tag_name, tag['title'])
-            for tag_title, tag in self._cache.items()
+            tag_title: Tags._fuzzy_search(tag_name, tag_title)
+            for tag_title in candidates
         }
 
         thresholds = thresholds or [100, 90, 80, 70, 60]
 
         for threshold in thresholds:
             suggestions = [
-                self._cache[tag_title]
+                tag_title
                 for tag_title, matching_score in scores.items()
                 if matching_score >= threshold
             ]
             if suggestions:
-                return suggestions
+                return self._in_cache_order(suggestions)
 
         return []
 
@@ -112,12 +139,14 @@ class Tags(Cog):
             # in that case, we simply want to search for such keywords directly instead.
             keywords_processed = [keywords]
 
-        matching_tags = []
-        for tag in self._cache.values():
-            if check(query in tag['embed']['description'].casefold() for query in keywords_processed):
-                matching_tags.append(tag)
+        # Only tags which contain at least one of the keywords can pass `check`.
+        matches = [self._content_index.search(query) for query in keywords_processed]
+        candidates = set().union(*matches)
 
-        return matching_tags
+        return self._in_cache_order(
+            title for title in candidates
+            if check(title in keyword_matches for keyword_matches in matches)
+        )
 
     async def _send_matching_tags(self, ctx: Context, keywords: str, matching_tags: list) -> None:
         """Send the result of matching tags to user."""
@@ -2,6 +2,8 @@ from typing import Dict, Iterable, List, Optional, Tuple
 
 from discord import Member, Message
 
+from bot.utils.message_features import get_features
+
 
 async def apply(
     last_message: Message, recent_messages: List[Message], config: Dict[str, int]
@@ -11,10 +13,10 @@ async def apply(
         msg
         for msg in recent_messages
         if (
-            msg.author == last_message.author and len(msg.attachments) > 0
+            msg.author == last_message.author and get_features(msg).attachments > 0
         )
     )
-    total_recent_attachments = sum(len(msg.attachments) for msg in relevant_messages)
+    total_recent_attachments = sum(get_features(msg).attachments for msg in relevant_messages)
 
     if total_recent_attachments > config['max']:
         return (
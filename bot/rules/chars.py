@@ -2,6 +2,8 @@ from typing import Dict, Iterable, List, Optional, Tuple
 
 from discord import Member, Message
 
+from bot.utils.message_features import get_features
+
 
 async def apply(
     last_message: Message, recent_messages: List[Message], config: Dict[str, int]
@@ -13,7 +15,7 @@ async def apply(
         if msg.author == last_message.author
     )
 
-    total_recent_chars = sum(len(msg.content) for msg in relevant_messages)
+    total_recent_chars = sum(get_features(msg).chars for msg in relevant_messages)
 
     if total_recent_chars > config['max']:
         return (
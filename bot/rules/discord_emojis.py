@@ -1,10 +1,8 @@
-import re
 from typing import Dict, Iterable, List, Optional, Tuple
 
 from discord import Member, Message
 
-
-DISCORD_EMOJI_RE = re.compile(r"<:\w+:\d+>")
+from bot.utils.message_features import get_features
 
 
 async def apply(
@@ -17,10 +15,7 @@ async def apply(
         if msg.author == last_message.author
     )
 
-    total_emojis = sum(
-        len(DISCORD_EMOJI_RE.findall(msg.content))
-        for msg in relevant_messages
-    )
+    total_emojis = sum(get_features(msg).emojis for msg in relevant_messages)
 
     if total_emojis > config['max']:
         return (
@@ -0,0 +1,297 @@
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from discord import Member, Message
+
+from bot.rules import (
+    attachments, burst, burst_shared, chars, discord_emojis,
+    duplicates, links, mentions, newlines, role_mentions,
+)
+from bot.utils.message_cache import MessageCache, MessageWindow
+from bot.utils.message_features import MessageFeatures, get_features
+
+RuleResult = Optional[Tuple[str, Iterable[Member], Iterable[Message]]]
+RuleFunction = Callable[[Message, List[Message], Dict[str, int]], Awaitable[RuleResult]]
+
+
+class AuthorStats:
+    """Running totals of the messages a single author sent within a window."""
+
+    __slots__ = (
+        "messages", "chars", "attachments", "mentions", "role_mentions", "emojis",
+        "newlines", "newline_groups", "links", "messages_with_links", "contents",
+    )
+
+    def __init__(self):
+        self.messages: Dict[int, Message] = {}
+        self.chars = 0
+        self.attachments = 0
+        self.mentions = 0
+        self.role_mentions = 0
+        self.emojis = 0
+        self.newlines = 0
+        self.newline_groups = Counter()
+        self.links = 0
+        self.messages_with_links = 0
+        self.contents = Counter()
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    @property
+    def max_newline_group(self) -> int:
+        """The size of the largest group of consecutive newlines in any of the author's messages."""
+        return max(self.newline_groups, default=0)
+
+    def newest_first(self) -> Tuple[Message, ...]:
+        """Return the author's messages, newest first."""
+        return tuple(sorted(self.messages.values(), key=lambda message: message.id, reverse=True))
+
+    def add(self, message: Message, features: MessageFeatures) -> None:
+        """Add `message` and its `features` to the running totals."""
+        self.messages[message.id] = message
+        self._update(features, 1)
+
+    def remove(self, message: Message, features: MessageFeatures) -> None:
+        """Subtract `message` and its `features` from the running totals."""
+        del self.messages[message.id]
+        self._update(features, -1)
+
+    def _update(self, features: MessageFeatures, sign: int) -> None:
+        self.chars += sign * features.chars
+        self.attachments += sign * features.attachments
+        self.mentions += sign * features.mentions
+        self.role_mentions += sign * features.role_mentions
+        self.emojis += sign * features.emojis
+        self.newlines += sign * features.newlines
+        self.links += sign * len(features.links)
+        self.messages_with_links += sign * bool(features.links)
+
+        for counter, key in ((self.newline_groups, features.max_newline_group), (self.contents, features.content)):
+            counter[key] += sign
+            if not counter[key]:
+                del counter[key]
+
+
+class AggregateWindow(MessageWindow):
+    """A `MessageWindow` which also keeps per-author running totals of the messages it holds."""
+
+    def __init__(self, interval: float, maxlen: int):
+        super().__init__(interval, maxlen)
+
+        self.authors: Dict[Member, AuthorStats] = {}
+        # The features a message was counted with, in case it's edited before it leaves the window.
+        self._features: Dict[int, MessageFeatures] = {}
+
+    def _on_add(self, message: Message) -> None:
+        features = self._features[message.id] = get_features(message)
+
+        stats = self.authors.get(message.author)
+        if stats is None:
+            stats = self.authors[message.author] = AuthorStats()
+
+        stats.add(message, features)
+
+    def _on_remove(self, message: Message) -> None:
+        stats = self.authors[message.author]
+        stats.remove(message, self._features.pop(message.id))
+
+        if not stats:
+            del self.authors[message.author]
+
+
+class AggregateCache(MessageCache):
+    """A `MessageCache` of `AggregateWindow`s."""
+
+    window_class = AggregateWindow
+
+
+# region: incremental implementations of the built-in rules
+#
+# Each function receives the triggering message, the author's running totals and the window they
+# belong to, and returns the same result as the `apply` function of the rule it implements.
+
+def _check_attachments(last_message: Message, stats: AuthorStats, _: AggregateWindow, config: dict) -> RuleResult:
+    if stats.attachments > config['max']:
+        return (
+            f"sent {stats.attachments} attachments in {config['interval']}s",
+            (last_message.author,),
+            tuple(msg for msg in stats.newest_first() if len(msg.attachments) > 0)
+        )
+    return None
+
+
+def _check_burst(last_message: Message, stats: AuthorStats, _: AggregateWindow, config: dict) -> RuleResult:
+    if len(stats) > config['max']:
+        return (
+            f"sent {len(stats)} messages in {config['interval']}s",
+            (last_message.author,),
+            stats.newest_first()
+        )
+    return None
+
+
+def _check_burst_shared(_: Message, __: AuthorStats, window: AggregateWindow, config: dict) -> RuleResult:
+    if len(window) > config['max']:
+        return (
+            f"sent {len(window)} messages in {config['interval']}s",
+            set(window.authors),
+            list(window)
+        )
+    return None
+
+
+def _check_chars(last_message: Message, stats: AuthorStats, _: AggregateWindow, config: dict) -> RuleResult:
+    if stats.chars > config['max']:
+        return (
+            f"sent {stats.chars} characters in {config['interval']}s",
+            (last_message.author,),
+            stats.newest_first()
+        )
+    return None
+
+
+def _check_discord_emojis(last_message: Message, stats: AuthorStats, _: AggregateWindow, config: dict) -> RuleResult:
+    if stats.emojis > config['max']:
+        return (
+            f"sent {stats.emojis} emojis in {config['interval']}s",
+            (last_message.author,),
+            stats.newest_first()
+        )
+    return None
+
+
+def _check_duplicates(last_message: Message, stats: AuthorStats, _: AggregateWindow, config: dict) -> RuleResult:
+    content = last_message.content
+    total_duplicated = stats.contents[content]
+
+    if total_duplicated > config['max']:
+        return (
+            f"sent {total_duplicated} duplicated messages in {config['interval']}s",
+            (last_message.author,),
+            tuple(msg for msg in stats.newest_first() if msg.content == content)
+        )
+    return None
+
+
+def _check_links(last_message: Message, stats: AuthorStats, _: AggregateWindow, config: dict) -> RuleResult:
+    # See `bot.rules.links` for why more than one message with links is required.
+    if stats.links > config['max'] and stats.messages_with_links > 1:
+        return (
+            f"sent {stats.links} links in {config['interval']}s",
+            (last_message.author,),
+            stats.newest_first()
+        )
+    return None
+
+
+def _check_mentions(last_message: Message, stats: AuthorStats, _: AggregateWindow, config: dict) -> RuleResult:
+    if stats.mentions > config['max']:
+        return (
+            f"sent {stats.mentions} mentions in {config['interval']}s",
+            (last_message.author,),
+            stats.newest_first()
+        )
+    return None
+
+
+def _check_newlines(last_message: Message, stats: AuthorStats, _: AggregateWindow, config: dict) -> RuleResult:
+    if stats.newlines > config['max']:
+        return (
+            f"sent {stats.newlines} newlines in {config['interval']}s",
+            (last_message.author,),
+            stats.newest_first()
+        )
+    elif stats.max_newline_group > config['max_consecutive']:
+        return (
+            f"sent {stats.max_newline_group} consecutive newlines in {config['interval']}s",
+            (last_message.author,),
+            stats.newest_first()
+        )
+    return None
+
+
+def _check_role_mentions(last_message: Message, stats: AuthorStats, _: AggregateWindow, config: dict) -> RuleResult:
+    if stats.role_mentions > config['max']:
+        return (
+            f"sent {stats.role_mentions} role mentions in {config['interval']}s",
+            (last_message.author,),
+            stats.newest_first()
+        )
+    return None
+
+
+# endregion
+
+# Built-in `apply` functions mapped to their incremental implementations. Rules whose function
+# isn't listed here are evaluated by passing the messages in their interval to the function.
+INCREMENTAL_CHECKS = {
+    attachments.apply: _check_attachments,
+    burst.apply: _check_burst,
+    burst_shared.apply: _check_burst_shared,
+    chars.apply: _check_chars,
+    discord_emojis.apply: _check_discord_emojis,
+    duplicates.apply: _check_duplicates,
+    links.apply: _check_links,
+    mentions.apply: _check_mentions,
+    newlines.apply: _check_newlines,
+    role_mentions.apply: _check_role_mentions,
+}
+
+
+class RuleEngine:
+    """
+    Evaluates antispam rules against running per-author totals instead of re-scanning messages.
+
+    A separate `AggregateCache` is kept for every distinct rule interval. Messages are counted once
+    when they enter a window and subtracted again when they expire, are deleted, or are edited, so
+    checking a built-in rule against a new message takes constant time.
+
+    Rules with a function that has no incremental implementation, e.g. custom rules, still work:
+    their `apply(last_message, recent_messages, config)` function is called with the messages that
+    are currently in the window of the rule's interval.
+    """
+
+    def __init__(self, rules: Mapping[str, dict], functions: Mapping[str, RuleFunction], maxlen: int = 1000):
+        self.rules = rules
+        self.functions = functions
+
+        intervals = {config['interval'] for config in rules.values()}
+        self._caches = {interval: AggregateCache(interval, maxlen) for interval in intervals}
+
+    def add(self, message: Message) -> None:
+        """Count a newly received `message` in every window."""
+        for cache in self._caches.values():
+            cache.add(message)
+
+    def update(self, message: Message) -> None:
+        """Recount an edited `message` in every window it's in."""
+        for cache in self._caches.values():
+            cache.update(message)
+
+    def remove(self, channel_id: int, *message_ids: int) -> None:
+        """Stop counting the deleted messages with the given IDs."""
+        for cache in self._caches.values():
+            cache.remove(channel_id, *message_ids)
+
+    async def apply(self, rule_name: str, message: Message, now: Optional[datetime] = None) -> RuleResult:
+        """Apply the rule called `rule_name` to `message`, which must have been added beforehand."""
+        config = self.rules[rule_name]
+        function = self.functions[rule_name]
+        window = self._caches[config['interval']].get_window(message.channel.id)
+
+        if window is None:
+            return None
+
+        window.evict(now)
+        check = INCREMENTAL_CHECKS.get(function)
+
+        if check is None:
+            return await function(message, window.recent(config['interval'], now), config)
+
+        stats = window.authors.get(message.author)
+        if stats is None:
+            return None
+
+        return check(message, stats, window, config)
@@ -1,10 +1,8 @@
-import re
 from typing import Dict, Iterable, List, Optional, Tuple
 
 from discord import Member, Message
 
-
-LINK_RE = re.compile(r"(https?://[^\s]+)")
+from bot.utils.message_features import get_features
 
 
 async def apply(
@@ -20,7 +18,7 @@ async def apply(
     messages_with_links = 0
 
     for msg in relevant_messages:
-        total_matches = len(LINK_RE.findall(msg.content))
+        total_matches = len(get_features(msg).links)
         if total_matches:
             messages_with_links += 1
             total_links += total_matches
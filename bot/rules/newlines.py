@@ -1,8 +1,9 @@
-import re
 from typing import Dict, Iterable, List, Optional, Tuple
 
 from discord import Member, Message
 
+from bot.utils.message_features import get_features
+
 
 async def apply(
     last_message: Message, recent_messages: List[Message], config: Dict[str, int]
@@ -14,19 +15,10 @@ async def apply(
         if msg.author == last_message.author
     )
 
-    # Identify groups of newline characters and get group & total counts
-    exp = r"(\n+)"
-    newline_counts = []
-    for msg in relevant_messages:
-        newline_counts += [len(group) for group in re.findall(exp, msg.content)]
-    total_recent_newlines = sum(newline_counts)
-
-    # Get maximum newline group size
-    if newline_counts:
-        max_newline_group = max(newline_counts)
-    else:
-        # If no newlines are found, newline_counts will be an empty list, which will error out max()
-        max_newline_group = 0
+    # Get the total amount of newlines and the size of the largest group of consecutive ones
+    features = [get_features(msg) for msg in relevant_messages]
+    total_recent_newlines = sum(feature.newlines for feature in features)
+    max_newline_group = max((feature.max_newline_group for feature in features), default=0)
 
     # Check first for total newlines, if this passes then check for large groupings
     if total_recent_newlines > config['max']:
@@ -0,0 +1,252 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class AsyncTTLCache:
+    """
+    A bounded LRU cache whose entries expire `ttl` seconds after they were stored.
+
+    Values are usually filled in by `get_or_fetch`, which makes concurrent misses for the same key
+    share a single call of the fetch coroutine. If `negative_ttl` is given, a None result is cached
+    for that many seconds instead of `ttl`; exceptions raised by the fetch coroutine are never cached.
+
+    If `max_bytes` is given, least recently used entries are also evicted once the total size of the
+    values, as measured by `sizeof`, exceeds it. `hits` and `misses` count the lookups made by
+    `get_or_fetch`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        negative_ttl: Optional[float] = None,
+        *,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+
+        self.hits = 0
+        self.misses = 0
+        self.size_bytes = 0
+
+        # Maps keys to (expiry time, value, size) triples, least recently used first.
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+        # Incremented by `clear`, so a fetch which was running when the cache was cleared isn't cached.
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, key: Hashable) -> Any:
+        """Return the value stored for `key`, raising KeyError if there is none or it expired."""
+        expires_at, value, _ = self._entries[key]
+
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            raise KeyError(key)
+
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value stored for `key`, or `default` if there is none or it expired."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[Hashable]:
+        """Return the keys of all entries, including those which expired but weren't evicted yet."""
+        return list(self._entries)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store `value` for `key`, evicting the least recently used entry if the cache is full."""
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+
+        size = 0
+        if self.max_bytes is not None:
+            size = self.sizeof(value)
+            if size > self.max_bytes:
+                log.trace(f"Not caching {key!r}: its size of {size} is larger than the whole cache.")
+                self.pop(key)
+                return
+
+        self.pop(key)
+        self._entries[key] = (time.monotonic() + ttl, value, size)
+        self.size_bytes += size
+
+        while len(self._entries) > self.maxsize or (self.max_bytes is not None and self.size_bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove the entry for `key` and return its value, or `default` if there is none."""
+        if key not in self._entries:
+            return default
+        return self._remove(key)
+
+    def _remove(self, key: Hashable) -> Any:
+        """Remove the entry for `key`, which has to exist, and return its value."""
+        _, value, size = self._entries.pop(key)
+        self.size_bytes -= size
+        return value
+
+    def clear(self) -> None:
+        """Remove all entries; fetches which are still running won't store their results."""
+        self._entries.clear()
+        self.size_bytes = 0
+        self._pending.clear()
+        self._generation += 1
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the value for `key`, awaiting `fetch()` and caching its result on a miss.
+
+        Callers that miss while a fetch for the same key is already running wait for that fetch
+        instead of starting their own. Cancelling one of them doesn't cancel the shared fetch.
+        """
+        try:
+            value = self[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            return value
+
+        task = self._pending.get(key)
+        if task is None:
+            log.trace(f"Cache miss for {key!r}, fetching it.")
+            task = self._pending[key] = asyncio.create_task(self._fetch(key, fetch, self._generation))
+        else:
+            log.trace(f"Cache miss for {key!r}, waiting for the pending fetch.")
+
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        """Await `fetch()` and store its result for `key`, unless the cache was cleared since `generation`."""
+        try:
+            value = await fetch()
+            if generation == self._generation:
+                self.set(key, value)
+            return value
+        finally:
+            if self._pending.get(key) is asyncio.current_task():
+                del self._pending[key]
+
+
+class ExpiringSet:
+    """
+    A set whose items are removed `ttl` seconds after they were last added.
+
+    Adding, removing and looking up an item take constant time. Expired items are evicted lazily,
+    in order of their deadlines, whenever an item is added or the size of the set is taken.
+    `peak_size` is the most items the set has held at once, and `expired` counts the items which
+    expired without being removed.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.peak_size = 0
+        self.expired = 0
+
+        self._deadlines: Dict[Hashable, float] = {}
+        # (deadline, insertion number, item) triples. Entries whose deadline no longer matches the
+        # one of their item, because it was removed or added again, are skipped when popped.
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        self._evict()
+        return len(self._deadlines)
+
+    def __contains__(self, item: Hashable) -> bool:
+        deadline = self._deadlines.get(item)
+        return deadline is not None and deadline > time.monotonic()
+
+    def __iter__(self) -> Iterator[Hashable]:
+        self._evict()
+        return iter(list(self._deadlines))
+
+    def add(self, item: Hashable, ttl: Optional[float] = None) -> None:
+        """Add `item`, or renew its deadline if it's already in the set."""
+        self._evict()
+
+        deadline = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._deadlines[item] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), item))
+        self.peak_size = max(self.peak_size, len(self._deadlines))
+
+        # Removed items leave their entries in the heap until they would have expired.
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(deadline, next(self._counter), item) for item, deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def discard(self, item: Hashable) -> bool:
+        """Remove `item` if it's in the set and return whether it was."""
+        deadline = self._deadlines.pop(item, None)
+        return deadline is not None and deadline > time.monotonic()
+
+    def clear(self) -> None:
+        """Remove all items."""
+        self._deadlines.clear()
+        self._heap.clear()
+
+    def _evict(self) -> None:
+        """Remove the items whose deadline has passed."""
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, item = heapq.heappop(self._heap)
+            if self._deadlines.get(item) == deadline:
+                del self._deadlines[item]
+                self.expired += 1
+
+
+def async_cache(
+    maxsize: int,
+    ttl: float,
+    negative_ttl: Optional[float] = None,
+    *,
+    max_bytes: Optional[int] = None,
+    sizeof: Callable[[Any], int] = sys.getsizeof,
+    arg_offset: int = 0,
+) -> Callable:
+    """
+    Cache the results of the decorated coroutine function in an `AsyncTTLCache` of its own.
+
+    The cache is keyed by the arguments of each call, skipping the first `arg_offset` positional
+    arguments (such as `self`), and is available as the `cache` attribute of the decorated function.
+    The other arguments are passed on to `AsyncTTLCache`.
+    """
+    def decorator(function: Callable) -> Callable:
+        cache = AsyncTTLCache(maxsize, ttl, negative_ttl, max_bytes=max_bytes, sizeof=sizeof)
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs) -> Any:
+            key = (*args[arg_offset:], *sorted(kwargs.items()))
+            return await cache.get_or_fetch(key, functools.partial(function, *args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,90 @@
+import logging
+import re
+from typing import FrozenSet, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+log = logging.getLogger(__name__)
+
+# The leading run of characters that can make up a host name. Anything after it, such as markdown
+# or punctuation which `URL_RE` in the filtering cog swallows, is not part of the host.
+HOST_RE = re.compile(r"[\w.-]+")
+
+
+def normalise_host(host: str) -> str:
+    """
+    Return `host` lowercased, without a trailing dot, and with punycode labels decoded.
+
+    Decoding punycode makes `xn--yotu-1ra.be` and `yoütu.be` compare equal. Labels which aren't
+    valid punycode are left as they are.
+    """
+    labels = host.lower().strip(".").split(".")
+
+    for index, label in enumerate(labels):
+        if label.startswith("xn--"):
+            try:
+                labels[index] = label.encode("ascii").decode("idna")
+            except UnicodeError:
+                pass
+
+    return ".".join(labels)
+
+
+def url_host(url: str) -> Optional[str]:
+    """Return the normalised host of `url`, or None if it doesn't have one."""
+    try:
+        hostname = urlsplit(url).hostname
+    except ValueError:
+        # Raised for malformed netlocs, such as an unbalanced IPv6 bracket.
+        return None
+
+    if not hostname:
+        return None
+
+    match = HOST_RE.match(hostname)
+    if not match:
+        return None
+
+    return normalise_host(match[0]) or None
+
+
+class DomainBlacklist:
+    """
+    A set of blacklisted domains which also matches their subdomains.
+
+    A host is looked up by checking each of its suffixes which start at a label boundary, so
+    `cdn.pornhub.com` matches a blacklisted `pornhub.com` but `notpornhub.com` doesn't. The cost of
+    a lookup depends on the number of labels in the host rather than on the size of the blacklist.
+    """
+
+    def __init__(self, domains: Iterable[str]):
+        self.entries: Tuple[str, ...] = tuple(domains)
+        self.domains: FrozenSet[str] = frozenset(normalise_host(domain) for domain in self.entries)
+
+        log.trace(f"Built a domain blacklist of {len(self.domains)} domains.")
+
+    def __len__(self) -> int:
+        return len(self.domains)
+
+    def match_host(self, host: str) -> Optional[str]:
+        """Return the blacklisted domain `host` is or belongs to, or None if there isn't one."""
+        host = normalise_host(host)
+
+        while host:
+            if host in self.domains:
+                return host
+            _, _, host = host.partition(".")
+
+        return None
+
+    def search(self, urls: Iterable[str]) -> Optional[str]:
+        """Return the first blacklisted domain that one of `urls` points to, or None if none do."""
+        for url in urls:
+            host = url_host(url)
+            if host is None:
+                continue
+
+            domain = self.match_host(host)
+            if domain:
+                return domain
+
+        return None
@@ -0,0 +1,253 @@
+import hashlib
+import io
+import json
+import logging
+import mmap
+import posixpath
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sphinx.util.inventory import InventoryFile
+
+log = logging.getLogger(__name__)
+
+# An entry of a version 2 inventory, as matched by Sphinx: name, type, priority, location, display name.
+INVENTORY_LINE_RE = re.compile(r"(?x)(.+?)\s+(\S*:\S*)\s+(-?\d+)\s+?(\S*)\s+(.*)")
+
+
+class CachedInventory(NamedTuple):
+    """The metadata of an inventory stored in an `InventoryCache`."""
+
+    url: str
+    file_name: str
+    digest: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+    @property
+    def conditional_headers(self) -> Dict[str, str]:
+        """Return the headers which make a request for the inventory return 304 if it didn't change."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def parse_inventory(stream: object) -> dict:
+    """Parse the intersphinx inventory read from `stream`, with document URLs relative to its base URL."""
+    return InventoryFile.load(stream, "", posixpath.join)
+
+
+class InventoryDecoder:
+    """
+    Decode an intersphinx inventory while it's being downloaded.
+
+    The raw inventory is passed to `feed` in chunks of any size. Version 2 inventories are
+    decompressed and parsed a line at a time as the chunks arrive, the same way Sphinx parses them;
+    the legacy, uncompressed version 1 inventories are parsed by Sphinx once all chunks are in.
+    `close` returns the parsed inventory and `data` the raw inventory.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.inventory: Dict[str, Dict[str, tuple]] = {}
+
+        self._header: List[str] = []
+        self._decompressor = None
+        self._legacy = False
+        self._project = ""
+        self._version = ""
+        # Raw header bytes before the header is complete, and the last partial decompressed line after.
+        self._pending = b""
+
+    @property
+    def data(self) -> bytes:
+        """Return the raw inventory fed so far."""
+        return b"".join(self.chunks)
+
+    def feed(self, chunk: bytes) -> None:
+        """Decode the next `chunk` of the raw inventory, raising ValueError if it isn't valid."""
+        self.chunks.append(chunk)
+        if self._legacy:
+            return
+
+        if self._decompressor is None:
+            self._pending += chunk
+            while self._decompressor is None and not self._legacy:
+                line, newline, self._pending = self._pending.partition(b"\n")
+                if not newline:
+                    self._pending = line
+                    return
+                self._read_header(line.decode("utf-8"))
+
+            # Whatever follows the header is compressed.
+            chunk, self._pending = self._pending, b""
+            if self._legacy:
+                return
+
+        try:
+            self._read_lines(self._decompressor.decompress(chunk))
+        except zlib.error as e:
+            raise ValueError(f"invalid compressed inventory data: {e}")
+
+    def close(self) -> Dict[str, Dict[str, tuple]]:
+        """Finish decoding and return the parsed inventory, raising ValueError if it's incomplete."""
+        if self._legacy:
+            return parse_inventory(io.BytesIO(self.data))
+
+        if self._decompressor is None:
+            raise ValueError("incomplete inventory header")
+
+        self._read_lines(self._decompressor.flush())
+        if not self._decompressor.eof:
+            raise ValueError("truncated inventory")
+
+        if self._pending:
+            self._add(self._pending.decode("utf-8"))
+            self._pending = b""
+
+        return self.inventory
+
+    def _read_header(self, line: str) -> None:
+        """Check and store the next line of the header."""
+        self._header.append(line.rstrip())
+
+        if len(self._header) == 1:
+            if self._header[0] == "# Sphinx inventory version 1":
+                self._legacy = True
+            elif self._header[0] != "# Sphinx inventory version 2":
+                raise ValueError(f"invalid inventory header: {line}")
+
+        elif len(self._header) == 4:
+            if "zlib" not in line:
+                raise ValueError(f"invalid inventory header (not compressed): {line}")
+
+            self._project = self._header[1][11:]
+            self._version = self._header[2][11:]
+            self._decompressor = zlib.decompressobj()
+
+    def _read_lines(self, data: bytes) -> None:
+        """Parse the complete lines of the decompressed `data`, keeping the partial last line for later."""
+        lines = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()
+
+        for line in lines:
+            self._add(line.decode("utf-8"))
+
+    def _add(self, line: str) -> None:
+        """Add the entry on `line` to the inventory."""
+        match = INVENTORY_LINE_RE.match(line.rstrip())
+        if not match:
+            return
+
+        name, type_, _priority, location, display_name = match.groups()
+        if type_ == "py:module" and name in self.inventory.get(type_, ()):
+            # Sphinx 1.1 and below created a second, wrong entry for modules; the first one is correct.
+            return
+
+        if location.endswith("$"):
+            location = location[:-1] + name
+
+        self.inventory.setdefault(type_, {})[name] = (self._project, self._version, location, display_name)
+
+
+class InventoryCache:
+    """
+    Intersphinx inventories stored on disk, keyed by the URL they were downloaded from.
+
+    Each inventory is kept in the compressed format it was served in, in a file of its own, and is
+    parsed straight from a memory map of that file. An index file holds the digest of each
+    inventory and the validators needed to ask the server whether it changed.
+
+    The methods do blocking file IO and should be run in an executor. They may be called from
+    several threads at once.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._index_path = directory / "index.json"
+        self._index: Optional[Dict[str, CachedInventory]] = None
+        self._lock = threading.RLock()
+
+    @property
+    def index(self) -> Dict[str, CachedInventory]:
+        """Map URLs to the metadata of their cached inventories, reading the index file the first time."""
+        with self._lock:
+            if self._index is None:
+                self._index = self._read_index()
+
+        return self._index
+
+    def _read_index(self) -> Dict[str, CachedInventory]:
+        """Read the index file, returning an empty index if there is none or it can't be read."""
+        try:
+            with self._index_path.open(encoding="utf-8") as file:
+                return {url: CachedInventory(*entry) for url, entry in json.load(file).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError, AttributeError):
+            log.warning("Failed to read the inventory cache index; starting with an empty cache.", exc_info=True)
+            return {}
+
+    def get(self, url: str) -> Optional[CachedInventory]:
+        """Return the metadata of the inventory cached for `url`, or None if there is none."""
+        return self.index.get(url)
+
+    def load(self, entry: CachedInventory) -> dict:
+        """
+        Parse and return the cached inventory described by `entry`.
+
+        Raise OSError if the file is missing and ValueError if it isn't a valid inventory.
+        """
+        with (self.directory / entry.file_name).open("rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as stream:
+                return parse_inventory(stream)
+
+    def store(self, url: str, data: bytes, etag: Optional[str], last_modified: Optional[str]) -> CachedInventory:
+        """Cache the raw inventory `data` downloaded from `url` and return its metadata."""
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        file_name = f"{hashlib.blake2b(url.encode(), digest_size=16).hexdigest()}.inv"
+        entry = CachedInventory(url, file_name, digest, etag, last_modified)
+
+        previous = self.get(url)
+        if previous is None or previous.digest != digest:
+            log.trace(f"Caching the inventory of {url} in {file_name}.")
+            self._write(self.directory / file_name, data)
+
+        with self._lock:
+            self.index[url] = entry
+            self._write_index()
+
+        return entry
+
+    def prune(self, urls: Iterable[str]) -> None:
+        """Remove the cached inventories of all URLs except `urls`."""
+        with self._lock:
+            removed = self.index.keys() - set(urls)
+            if not removed:
+                return
+
+            for url in removed:
+                entry = self.index.pop(url)
+                log.trace(f"Removing the cached inventory of {url}.")
+                (self.directory / entry.file_name).unlink(missing_ok=True)
+
+            self._write_index()
+
+    def _write_index(self) -> None:
+        """Write the index to disk."""
+        data = json.dumps({url: list(entry) for url, entry in self.index.items()}).encode("utf-8")
+        self._write(self._index_path, data)
+
+    def _write(self, path: Path, data: bytes) -> None:
+        """Write `data` to `path` through a temporary file, so a reader never sees a partial file."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_bytes(data)
+        temp_path.replace(path)
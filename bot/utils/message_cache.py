@@ -0,0 +1,187 @@
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from discord import Message
+
+log = logging.getLogger(__name__)
+
+
+class MessageWindow:
+    """
+    A time-bounded buffer of the most recent messages sent in a single channel.
+
+    Messages are stored in the order they were received and are evicted once they are older than
+    `interval` seconds or once more than `maxlen` messages are buffered, whichever comes first.
+
+    Edits replace the stored message in place and deletions are applied lazily: the message is
+    dropped from the ID mapping right away and its slot in the queue is discarded on eviction.
+
+    Subclasses can keep derived state in sync with the window by overriding `_on_add` and
+    `_on_remove`, which are called whenever a message enters or leaves the window.
+    """
+
+    def __init__(self, interval: float, maxlen: int):
+        self.interval = timedelta(seconds=interval)
+        self.maxlen = maxlen
+
+        self._queue: Deque[Tuple[datetime, int]] = deque()
+        self._messages: Dict[int, Message] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Message]:
+        """Iterate over the buffered messages, newest first."""
+        for _, message_id in reversed(self._queue):
+            message = self._messages.get(message_id)
+            if message is not None:
+                yield message
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._messages
+
+    def append(self, message: Message) -> None:
+        """Add a newly received `message` to the window and evict anything that expired."""
+        self._queue.append((message.created_at, message.id))
+        self._messages[message.id] = message
+        self._on_add(message)
+
+        while len(self._queue) > self.maxlen:
+            self._pop()
+
+        self.evict(message.created_at)
+
+    def replace(self, message: Message) -> bool:
+        """Replace the buffered copy of an edited `message`; return False if it isn't buffered."""
+        old_message = self._messages.get(message.id)
+        if old_message is None:
+            return False
+
+        self._on_remove(old_message)
+        self._messages[message.id] = message
+        self._on_add(message)
+        return True
+
+    def remove(self, message_id: int) -> Optional[Message]:
+        """Remove the message with the given ID and return it, if it was buffered."""
+        message = self._messages.pop(message_id, None)
+        if message is not None:
+            self._on_remove(message)
+
+        return message
+
+    def evict(self, now: Optional[datetime] = None) -> None:
+        """Drop every message created more than `interval` seconds before `now` (default: utcnow)."""
+        cutoff = (now or datetime.utcnow()) - self.interval
+        while self._queue and self._queue[0][0] <= cutoff:
+            self._pop()
+
+    def recent(self, seconds: float, now: Optional[datetime] = None) -> List[Message]:
+        """
+        Return the messages created in the last `seconds` seconds, newest first.
+
+        This is equivalent to `channel.history(after=now - seconds, oldest_first=False)`.
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=seconds)
+        messages = []
+
+        for created_at, message_id in reversed(self._queue):
+            if created_at <= cutoff:
+                break
+
+            message = self._messages.get(message_id)
+            if message is not None:
+                messages.append(message)
+
+        return messages
+
+    def _pop(self) -> None:
+        """Discard the oldest slot in the queue and the message it refers to."""
+        _, message_id = self._queue.popleft()
+        self.remove(message_id)
+
+    def _on_add(self, message: Message) -> None:
+        """Called after `message` was added to the window."""
+
+    def _on_remove(self, message: Message) -> None:
+        """Called after `message` was removed from the window."""
+
+
+class MessageCache:
+    """
+    A collection of per-channel `MessageWindow`s fed by gateway events.
+
+    The cache itself doesn't listen to any events; the owning cog is expected to call `add`,
+    `update` and `remove` from its `on_message`, `on_message_edit` and raw delete listeners.
+
+    A window only evicts expired messages when it's used, so once every `interval` seconds, `add`
+    sweeps all windows and drops those of channels which have no unexpired messages left.
+    """
+
+    window_class = MessageWindow
+
+    def __init__(self, interval: float, maxlen: int = 1000):
+        self.interval = interval
+        self.maxlen = maxlen
+
+        self._windows: Dict[int, MessageWindow] = {}
+        self._last_sweep: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return sum(len(window) for window in self._windows.values())
+
+    def get_window(self, channel_id: int) -> Optional[MessageWindow]:
+        """Return the window of the channel with the given ID, if any messages were cached for it."""
+        return self._windows.get(channel_id)
+
+    def add(self, message: Message) -> None:
+        """Cache a newly received `message`."""
+        window = self._windows.get(message.channel.id)
+        if window is None:
+            log.trace(f"Creating message window for channel {message.channel.id}.")
+            window = self._windows[message.channel.id] = self.window_class(self.interval, self.maxlen)
+
+        window.append(message)
+
+        now = message.created_at
+        if self._last_sweep is None or now - self._last_sweep >= timedelta(seconds=self.interval):
+            self.sweep(now)
+
+    def sweep(self, now: Optional[datetime] = None) -> None:
+        """Evict expired messages from every window and drop the windows left empty."""
+        self._last_sweep = now or datetime.utcnow()
+
+        for channel_id, window in list(self._windows.items()):
+            window.evict(self._last_sweep)
+            if not window:
+                log.trace(f"Dropping the empty message window of channel {channel_id}.")
+                del self._windows[channel_id]
+
+    def update(self, message: Message) -> None:
+        """Replace the cached copy of an edited `message`, if it's cached."""
+        window = self._windows.get(message.channel.id)
+        if window is not None:
+            window.replace(message)
+
+    def remove(self, channel_id: int, *message_ids: int) -> None:
+        """Remove the messages with the given IDs from the window of the channel with ID `channel_id`."""
+        window = self._windows.get(channel_id)
+        if window is None:
+            return
+
+        for message_id in message_ids:
+            window.remove(message_id)
+
+        if not window:
+            del self._windows[channel_id]
+
+    def recent(self, channel_id: int, seconds: float, now: Optional[datetime] = None) -> List[Message]:
+        """Return the messages created in the channel in the last `seconds` seconds, newest first."""
+        window = self._windows.get(channel_id)
+        if window is None:
+            return []
+
+        window.evict(now)
+        return window.recent(seconds, now)
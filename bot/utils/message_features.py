@@ -0,0 +1,70 @@
+import re
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+from discord import Message
+
+DISCORD_EMOJI_RE = re.compile(r"<:\w+:\d+>")
+LINK_RE = re.compile(r"(https?://[^\s]+)", flags=re.IGNORECASE)
+NEWLINES_RE = re.compile(r"(\n+)")
+
+# Number of messages whose features are remembered. It comfortably covers the messages which are
+# still inside an antispam rule interval, even during raids.
+CACHE_SIZE = 10_000
+
+
+class MessageFeatures:
+    """
+    Quantities derived from a message's content which the antispam rules and filters look at.
+
+    The content is scanned once on creation; use `get_features` to share the instance between
+    every consumer of the same message.
+    """
+
+    __slots__ = (
+        "content", "edited_at", "chars", "newlines", "max_newline_group", "emojis",
+        "links", "mentions", "role_mentions", "attachments",
+    )
+
+    def __init__(self, message: Message):
+        content = message.content
+        newline_groups = [len(group) for group in NEWLINES_RE.findall(content)]
+
+        self.content: str = content
+        self.edited_at: Optional[datetime] = message.edited_at
+        self.chars = len(content)
+        self.newlines = sum(newline_groups)
+        self.max_newline_group = max(newline_groups, default=0)
+        self.emojis = len(DISCORD_EMOJI_RE.findall(content))
+        self.links: Tuple[str, ...] = tuple(LINK_RE.findall(content))
+        self.mentions = len(message.mentions)
+        self.role_mentions = len(message.role_mentions)
+        self.attachments = len(message.attachments)
+
+    def is_stale(self, message: Message) -> bool:
+        """Return True if `message` was edited since these features were extracted from it."""
+        return self.edited_at != message.edited_at or self.content != message.content
+
+
+_cache: "OrderedDict[int, MessageFeatures]" = OrderedDict()
+
+
+def get_features(message: Message) -> MessageFeatures:
+    """
+    Return the features of `message`, extracting them only if they aren't cached yet.
+
+    Features are cached by message ID and re-extracted when the message was edited. Once the cache
+    is full, the features of the least recently used message are dropped.
+    """
+    features = _cache.get(message.id)
+
+    if features is None or features.is_stale(message):
+        features = _cache[message.id] = MessageFeatures(message)
+
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(message.id)
+
+    return features
@@ -0,0 +1,186 @@
+import bisect
+import heapq
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+# The minimum Sørensen–Dice coefficient of the trigrams of a query and a key for the key to be a fuzzy match.
+DEFAULT_THRESHOLD = 0.6
+
+# Fuzzy matches at least this similar are looked for first. Since the index can rule out more keys
+# for a higher threshold, this makes lookups of a misspelt key much faster.
+CLOSE_MATCH_THRESHOLD = 0.8
+
+# A run of word characters, as indexed by `SubstringIndex`.
+WORD_RE = re.compile(r"\w+")
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Return the trigrams of `text`, padded so that its first and last characters get trigrams of their own."""
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """
+    An index of strings supporting ranked prefix and fuzzy lookups.
+
+    Keys are compared case-insensitively. Keys which start with the query rank first, in
+    alphabetical order, and are found with a binary search over the sorted keys. The other keys are
+    ranked by how many trigrams they share with the query, measured as the Sørensen–Dice coefficient.
+
+    Rather than scoring every key, only keys which contain one of the query's rarest trigrams are
+    considered: a key similar enough to the query has to share enough trigrams with it that it
+    can't miss all of those. Of those, only keys which share enough of the rarest trigrams to
+    possibly reach the threshold are scored.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys: List[str] = list(dict.fromkeys(keys))
+        self._trigrams: List[FrozenSet[str]] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        for position, key in enumerate(self.keys):
+            key_trigrams = trigrams(key.casefold())
+            self._trigrams.append(key_trigrams)
+            self._sizes.append(len(key_trigrams))
+            for trigram in key_trigrams:
+                self._postings[trigram].append(position)
+
+        # Keys sorted by their normalised form, for prefix searches.
+        self._sorted: List[Tuple[str, int]] = sorted(
+            (key.casefold(), position) for position, key in enumerate(self.keys)
+        )
+        self._sorted_keys = [key for key, _ in self._sorted]
+
+        log.trace(f"Built a trigram index of {len(self.keys)} keys and {len(self._postings)} trigrams.")
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def prefix_search(self, query: str, limit: int) -> List[str]:
+        """Return up to `limit` keys which start with `query`, in alphabetical order."""
+        query = query.casefold()
+        start = bisect.bisect_left(self._sorted_keys, query)
+
+        matches = []
+        for key, position in self._sorted[start:start + limit]:
+            if not key.startswith(query):
+                break
+            matches.append(self.keys[position])
+
+        return matches
+
+    def fuzzy_search(self, query: str, limit: int, threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, float]]:
+        """Return up to `limit` keys at least `threshold` similar to `query` with their scores, best first."""
+        query_trigrams = trigrams(query.casefold())
+        size = len(query_trigrams)
+
+        # A key with `n` trigrams has to share `threshold * (size + n) / 2` trigrams with the query,
+        # and can't share more than `n`, so it needs `n >= threshold * size / (2 - threshold)`.
+        # Sharing that many, it has to contain one of the `size - required + 1` rarest trigrams.
+        required = max(1, int(threshold * size / (2 - threshold)))
+        rarest = sorted(query_trigrams, key=lambda trigram: len(self._postings.get(trigram, ())))
+        candidates = Counter()
+        for trigram in rarest[:size - required + 1]:
+            candidates.update(self._postings.get(trigram, ()))
+
+        # Even if a key contains all of the other trigrams, it shares at most this many more. Keys
+        # which can't reach the threshold even then, given the smallest possible key, are skipped
+        # without looking at them any further.
+        others = required - 1
+        minimum = math.ceil(threshold * (size + required) / 2) - others
+
+        sizes = self._sizes
+        survivors = [
+            position for position, count in candidates.items()
+            if count >= minimum and 2 * (count + others) >= threshold * (size + sizes[position])
+        ]
+        scores = [
+            (2 * len(query_trigrams & self._trigrams[position]) / (size + sizes[position]), position)
+            for position in survivors
+        ]
+
+        best = heapq.nsmallest(
+            limit,
+            (item for item in scores if item[0] >= threshold),
+            key=lambda item: (-item[0], sizes[item[1]]),
+        )
+        return [(self.keys[position], score) for score, position in best]
+
+    def search(self, query: str, limit: int = 10, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+        """
+        Return up to `limit` keys matching `query`: those starting with it first, then fuzzy matches.
+
+        Fuzzy matches with a similarity of at least `CLOSE_MATCH_THRESHOLD` are looked for first,
+        and only if there are none are matches down to `threshold` included.
+        """
+        matches = self.prefix_search(query, limit)
+        if len(matches) == limit:
+            return matches
+
+        fuzzy = []
+        for tier in sorted({max(threshold, CLOSE_MATCH_THRESHOLD), threshold}, reverse=True):
+            fuzzy = self.fuzzy_search(query, limit + len(matches), tier)
+            if fuzzy:
+                break
+
+        found = set(matches)
+        for key, _ in fuzzy:
+            if key not in found:
+                matches.append(key)
+                if len(matches) == limit:
+                    break
+
+        return matches
+
+
+class SubstringIndex:
+    """
+    An index of texts for finding the texts which contain a substring, ignoring case.
+
+    Rather than the trigrams of the whole texts, which are slow to collect, the distinct words of the
+    texts are indexed: each word by its trigrams, and each text by its words. The longest run of
+    word characters in a query has to be part of a single word of a matching text, so only the texts
+    containing a word which contains that run are searched. Queries without a run of at least three
+    word characters are searched for in every text.
+    """
+
+    def __init__(self, texts: Dict[Hashable, str]):
+        self.texts: Dict[Hashable, str] = {key: text.casefold() for key, text in texts.items()}
+        self._texts_by_word: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._words_by_trigram: Dict[str, Set[str]] = defaultdict(set)
+
+        for key, text in self.texts.items():
+            for word in set(WORD_RE.findall(text)):
+                self._texts_by_word[word].add(key)
+
+        for word in self._texts_by_word:
+            for i in range(len(word) - 2):
+                self._words_by_trigram[word[i:i + 3]].add(word)
+
+        log.trace(f"Built a substring index of {len(self.texts)} texts and {len(self._texts_by_word)} words.")
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def search(self, query: str) -> Set[Hashable]:
+        """Return the keys of the texts which contain `query`."""
+        query = query.casefold()
+        run = max(WORD_RE.findall(query), key=len, default="")
+        if len(run) < 3:
+            return {key for key, text in self.texts.items() if query in text}
+
+        postings = sorted(
+            (self._words_by_trigram.get(run[i:i + 3], set()) for i in range(len(run) - 2)),
+            key=len,
+        )
+        words = [word for word in postings[0].intersection(*postings[1:]) if run in word]
+
+        candidates = set().union(*(self._texts_by_word[word] for word in words))
+        return {key for key in candidates if query in self.texts[key]}
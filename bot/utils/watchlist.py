@@ -0,0 +1,134 @@
+import logging
+import re
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# The regex parser moved into the `re` package in Python 3.11, which deprecated the old modules.
+if sys.version_info >= (3, 11):
+    from re import _constants as sre_constants, _parser as sre_parse
+else:
+    import sre_constants
+    import sre_parse
+
+log = logging.getLogger(__name__)
+
+# Maximum length of the literal prefixes used to index the expressions.
+KEY_LENGTH = 3
+
+# Below this many keys of the same length, checking each key with `in` is faster than collecting
+# every substring of the text of that length and intersecting the two sets.
+SCAN_THRESHOLD = 256
+
+# Characters which match an ASCII letter under `re.IGNORECASE` but don't casefold to it.
+_CASEFOLD_FIXES = str.maketrans({"İ": "i", "ı": "i"})
+
+
+def normalise(text: str) -> str:
+    """Fold the case of `text` so that substring checks agree with case-insensitive regex matching."""
+    return text.translate(_CASEFOLD_FIXES).casefold()
+
+
+def _is_foldable(char: str) -> bool:
+    """Return True if `normalise` is guaranteed to map everything `char` matches case-insensitively onto it."""
+    return char.isascii() or char.lower() == char.upper() == char.casefold()
+
+
+def literal_prefix(expression: str, flags: int = 0) -> str:
+    """
+    Return a normalised literal string that every match of `expression` has to start with.
+
+    The prefix is built from the leading literal characters of the parsed expression; a repeated
+    literal contributes its minimum of one occurrence and ends the prefix. An empty string is
+    returned if the expression doesn't start with a literal.
+    """
+    prefix = []
+    parsed = sre_parse.parse(expression, flags)
+
+    for op, av in parsed:
+        if op is sre_constants.AT:
+            # Zero-width assertions such as `^` or `\b` don't consume any characters.
+            continue
+
+        if op is sre_constants.LITERAL:
+            prefix.append(chr(av))
+            continue
+
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            minimum, _, item = av
+            if minimum >= 1 and len(item) == 1 and item[0][0] is sre_constants.LITERAL:
+                prefix.append(chr(item[0][1]))
+
+        break
+
+    # Cut the prefix off at the first character whose case-insensitive matches can't be predicted.
+    if parsed.state.flags & re.IGNORECASE:
+        for index, char in enumerate(prefix):
+            if not _is_foldable(char):
+                prefix = prefix[:index]
+                break
+
+    return normalise("".join(prefix))
+
+
+class Watchlist:
+    """
+    An ordered collection of regular expressions which are searched for together.
+
+    `search` returns the match of the first expression, in the given order, that matches the text.
+    Rather than running every expression over the text, the expressions are indexed by their literal
+    prefix: only those whose prefix occurs in the text are run. Expressions without a literal
+    prefix are always run.
+
+    The expression a match came from is available as `match.re.pattern`.
+    """
+
+    def __init__(self, expressions: Iterable[str], flags: int = re.IGNORECASE):
+        self.expressions: Tuple[str, ...] = tuple(expressions)
+        self.flags = flags
+        self.patterns = [re.compile(expression, flags) for expression in self.expressions]
+
+        self._unindexed: List[int] = []
+        self._index: Dict[int, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+
+        for position, expression in enumerate(self.expressions):
+            prefix = literal_prefix(expression, flags)
+
+            if prefix:
+                key = prefix[:KEY_LENGTH]
+                self._index[len(key)][key].append(position)
+            else:
+                self._unindexed.append(position)
+
+        log.trace(
+            f"Built a watchlist of {len(self.patterns)} expressions, "
+            f"{len(self._unindexed)} of which are not indexed."
+        )
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def candidates(self, text: str) -> List[int]:
+        """Return the positions of the expressions which could match `text`, in order."""
+        positions: Set[int] = set(self._unindexed)
+        text = normalise(text)
+
+        for length, keys in self._index.items():
+            if len(keys) < SCAN_THRESHOLD:
+                found = [key for key in keys if key in text]
+            else:
+                found = {text[i:i + length] for i in range(len(text) - length + 1)} & keys.keys()
+
+            for key in found:
+                positions.update(keys[key])
+
+        return sorted(positions)
+
+    def search(self, text: str) -> Optional[re.Match]:
+        """Return the match of the first expression that matches `text`, or None if none of them do."""
+        for position in self.candidates(text):
+            match = self.patterns[position].search(text)
+            if match:
+                return match
+
+        return None
@@ -0,0 +1,101 @@
+"""
+Compare tag suggestions and content searches using the index of the Tags cog with scanning every tag.
+
+Run from the repository root with `python -m scripts.bench_tags`.
+"""
+import logging
+import random
+import string
+import time
+import timeit
+from typing import Callable
+
+from bot.cogs.tags import Tags
+
+TAGS = 10_000
+WORDS = 5_000
+QUERIES = 100
+REPEAT = 3
+
+
+def random_word(rng: random.Random) -> str:
+    """Return a random lowercase word of 2 to 10 letters."""
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 10)))
+
+
+def make_tags(rng: random.Random) -> dict:
+    """Return a synthetic tag cache, with hyphenated titles and bodies of around a hundred words."""
+    vocabulary = [random_word(rng) for _ in range(WORDS)]
+    cache = {}
+    while len(cache) < TAGS:
+        title = "-".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 3)))
+        description = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(50, 150)))
+        cache[title] = {"title": title, "embed": {"description": description}}
+    return cache
+
+
+def scan_suggestions(cache: dict, tag_name: str) -> list:
+    """Score every tag, the way suggestions used to be found."""
+    scores = {title: Tags._fuzzy_search(tag_name, title) for title in cache}
+    for threshold in (100, 90, 80, 70, 60):
+        suggestions = [cache[title] for title, score in scores.items() if score >= threshold]
+        if suggestions:
+            return suggestions
+    return []
+
+
+def scan_contents(cache: dict, keywords: list) -> list:
+    """Search the body of every tag, the way content searches used to be done."""
+    return [
+        tag for tag in cache.values()
+        if all(keyword in tag['embed']['description'].casefold() for keyword in keywords)
+    ]
+
+
+def main() -> None:
+    """Print the time it takes to build the index and the mean time of each kind of lookup."""
+    logging.getLogger("bot").setLevel(logging.WARNING)
+    rng = random.Random(0)
+
+    tags = Tags.__new__(Tags)
+    tags._cache = make_tags(rng)
+
+    start = time.perf_counter()
+    tags._build_index()
+    print(f"Indexed {len(tags._cache)} tags in {time.perf_counter() - start:.2f}s.")
+
+    titles = list(tags._cache)
+    names = [rng.choice(titles)[:rng.randint(3, 8)] for _ in range(QUERIES)]
+    keywords = [
+        [rng.choice(tags._cache[rng.choice(titles)]['embed']['description'].split()) for _ in range(2)]
+        for _ in range(QUERIES)
+    ]
+
+    def run(search: Callable, queries: list) -> float:
+        def lookups() -> None:
+            for query in queries:
+                search(query)
+        return min(timeit.repeat(lookups, number=1, repeat=REPEAT)) / len(queries)
+
+    benchmarks = (
+        ("suggestions", names, lambda name: scan_suggestions(tags._cache, name), tags._get_suggestions),
+        (
+            "content search",
+            keywords,
+            lambda words: scan_contents(tags._cache, words),
+            lambda words: tags._get_tags_via_content(all, ",".join(words)),
+        ),
+    )
+
+    print(f"{'lookup':>14} | {'scan':>10} | {'indexed':>10} | speed-up")
+    for name, queries, scan, indexed in benchmarks:
+        scan_time = run(scan, queries)
+        indexed_time = run(indexed, queries)
+        print(
+            f"{name:>14} | {scan_time * 1e3:>8.2f}ms | {indexed_time * 1e3:>8.2f}ms | "
+            f"{scan_time / indexed_time:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
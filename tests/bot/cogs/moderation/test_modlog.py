@@ -0,0 +1,205 @@
+import asyncio
+import json
+import unittest
+from collections import deque
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+
+from bot.cogs.moderation.modlog import ModLog, QueuedLog
+from bot.constants import Channels, Event, Guild, URLs
+from tests.helpers import MockBot, MockMember, MockMessage, MockTextChannel
+
+
+class RawMessageEventTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the raw message event listeners of the `ModLog` cog."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.cog = ModLog(self.bot)
+        self.cog.send_log_message = AsyncMock()
+        self.cog.upload_log = AsyncMock(return_value="https://logs/1")
+
+        self.channel = MockTextChannel(id=1234, category=None)
+        self.bot.get_channel.return_value = self.channel
+
+    def make_event(self, **kwargs):
+        """Return a raw event of the guild in `self.channel` with the attributes given in `kwargs`."""
+        return MagicMock(guild_id=Guild.id, channel_id=self.channel.id, **kwargs)
+
+    async def test_raw_delete_of_cached_message_is_skipped(self):
+        """Deleted cached messages are left to `on_message_delete` without waiting."""
+        await self.cog.on_raw_message_delete(self.make_event(message_id=1, cached_message=MockMessage()))
+
+        self.cog.send_log_message.assert_not_awaited()
+
+    async def test_raw_delete_of_uncached_message_is_logged(self):
+        """Deleted uncached messages are logged straight away, unless they're ignored."""
+        self.cog.ignore(Event.message_delete, 2)
+
+        await self.cog.on_raw_message_delete(self.make_event(message_id=1, cached_message=None))
+        await self.cog.on_raw_message_delete(self.make_event(message_id=2, cached_message=None))
+
+        self.cog.send_log_message.assert_awaited_once()
+        self.assertIn("`1`", self.cog.send_log_message.call_args[0][3])
+
+    async def test_raw_edit_of_cached_message_is_skipped(self):
+        """Edits of cached messages are left to `on_message_edit` without fetching the message."""
+        await self.cog.on_raw_message_edit(self.make_event(message_id=1, cached_message=MockMessage()))
+
+        self.channel.fetch_message.assert_not_awaited()
+        self.cog.send_log_message.assert_not_awaited()
+
+    async def test_bulk_delete_is_logged_once(self):
+        """A bulk delete is logged as one entry, leaving out ignored messages and those of bots."""
+        human = MockMessage(id=1, author=MockMember(bot=False))
+        bot = MockMessage(id=2, author=MockMember(bot=True))
+        self.cog.ignore(Event.message_delete, 3)
+
+        event = self.make_event(message_ids={1, 2, 3, 4}, cached_messages=[human, bot])
+        await self.cog.on_raw_bulk_message_delete(event)
+
+        self.cog.upload_log.assert_awaited_once_with(messages=[human], actor_id=self.bot.user.id)
+        self.cog.send_log_message.assert_awaited_once()
+
+        args, kwargs = self.cog.send_log_message.call_args
+        self.assertIn("**Messages:** 2", args[3])
+        self.assertIn("1 of the messages were not cached", args[3])
+        self.assertEqual(kwargs["channel_id"], Channels.message_log)
+
+    async def test_bulk_delete_of_ignored_messages_is_not_logged(self):
+        """Nothing is logged if all of the deleted messages were ignored."""
+        self.cog.ignore(Event.message_delete, 1, 2)
+
+        await self.cog.on_raw_bulk_message_delete(self.make_event(message_ids={1, 2}, cached_messages=[]))
+
+        self.cog.send_log_message.assert_not_awaited()
+        self.assertEqual(len(self.cog._ignored[Event.message_delete]), 0)
+
+
+class LogDeliveryTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the queueing and packing of the messages sent by `ModLog.send_log_message`."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.cog = ModLog(self.bot)
+
+        self.channel = MockTextChannel(id=Channels.mod_log)
+        self.bot.get_channel.return_value = self.channel
+        self.bot.http.request = AsyncMock(return_value={"id": 1})
+
+        patcher = patch("bot.cogs.moderation.modlog.LOG_FLUSH_DELAY", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def send(self, count, **kwargs):
+        """Send `count` logs to the mod log concurrently, each with the arguments given in `kwargs`."""
+        await asyncio.gather(*(
+            self.cog.send_log_message(None, 0, None, f"log {number}", **kwargs)
+            for number in range(count)
+        ))
+
+    async def test_concurrent_logs_are_packed_into_one_message(self):
+        """Logs queued together are sent in a single message with several embeds."""
+        await self.send(3)
+
+        self.channel.send.assert_not_awaited()
+        self.bot.http.request.assert_awaited_once()
+
+        embeds = self.bot.http.request.call_args.kwargs["json"]["embeds"]
+        self.assertEqual([embed["description"] for embed in embeds], ["log 0", "log 1", "log 2"])
+        self.bot._connection.create_message.assert_called_once_with(channel=self.channel, data={"id": 1})
+
+    async def test_single_log_is_sent_normally(self):
+        """A log which is sent on its own doesn't need a raw request."""
+        await self.send(1)
+
+        self.channel.send.assert_awaited_once()
+        self.bot.http.request.assert_not_awaited()
+
+    async def test_logs_with_files_are_sent_alone(self):
+        """Logs with files are sent in messages of their own."""
+        await self.send(2, files=[MagicMock()])
+
+        self.assertEqual(self.channel.send.await_count, 2)
+        self.bot.http.request.assert_not_awaited()
+
+    async def test_errors_are_raised_to_callers(self):
+        """An error when sending a message is raised by `send_log_message`."""
+        self.channel.send.side_effect = discord.HTTPException(MagicMock(), "")
+
+        with self.assertRaises(discord.HTTPException):
+            await self.send(1)
+
+        self.assertEqual(self.cog._log_senders, {})
+        self.assertEqual(self.cog._queued_logs, 0)
+
+    def test_batches_respect_discord_limits(self):
+        """Batches end at ten embeds, the total embed size limit, and logs with content."""
+        def queued(text, content=None):
+            return QueuedLog(content, discord.Embed(description=text), None, 0, None)
+
+        cases = (
+            ("ten embeds", [queued("a") for _ in range(12)], 10),
+            ("too many characters", [queued("a" * 4000), queued("b" * 2001), queued("c")], 1),
+            ("content", [queued("a"), queued("b", content="@everyone"), queued("c")], 1),
+        )
+
+        for name, logs, size in cases:
+            with self.subTest(case=name):
+                queue = deque(logs)
+                self.assertEqual(len(ModLog._take_log_batch(queue)), size)
+
+    async def test_priority_logs_are_not_held_back(self):
+        """Logs to mod alerts are sent without waiting for the flush delay."""
+        with patch("bot.cogs.moderation.modlog.LOG_FLUSH_DELAY", 60):
+            await asyncio.wait_for(self.send(1, channel_id=Channels.mod_alerts), timeout=1)
+
+        self.channel.send.assert_awaited_once()
+
+
+class UploadLogTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for `ModLog.upload_log`."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.cog = ModLog(self.bot)
+        self.uploaded = None
+
+        async def post(endpoint, *, data, headers):
+            self.uploaded = json.loads(data.read())
+            return {"id": 42}
+
+        self.bot.api_client.post = AsyncMock(side_effect=post)
+
+    async def test_messages_are_uploaded_as_json(self):
+        """Every message is serialised with its attachments, which default to none."""
+        embed = discord.Embed(description="embed")
+        author = MockMember(id=10)
+        channel = MockTextChannel(id=20)
+        messages = [
+            MockMessage(id=number, author=author, channel=channel, content=f"message {number}", embeds=[])
+            for number in range(150)
+        ]
+        messages[0].embeds = [embed]
+
+        url = await self.cog.upload_log(iter(messages), actor_id=5, attachments=[["https://attachment"]])
+
+        self.assertEqual(url, f"{URLs.site_logs_view}/42")
+        self.assertEqual(self.uploaded["actor"], 5)
+        self.assertEqual(len(self.uploaded["deletedmessage_set"]), 150)
+        self.assertEqual(self.uploaded["deletedmessage_set"][0], {
+            "id": 0,
+            "author": 10,
+            "channel_id": 20,
+            "content": "message 0",
+            "embeds": [embed.to_dict()],
+            "attachments": ["https://attachment"],
+        })
+        self.assertEqual(self.uploaded["deletedmessage_set"][1]["attachments"], [])
+
+    async def test_no_messages(self):
+        """An empty log is still valid JSON."""
+        await self.cog.upload_log([], actor_id=5)
+
+        self.assertEqual(self.uploaded["deletedmessage_set"], [])
@@ -1,12 +1,16 @@
 import asyncio
+import json
+import tempfile
+import time
 import unittest
+from pathlib import Path
 from unittest import mock
 
 import discord
 
 from bot import constants
 from bot.api import ResponseCodeError
-from bot.cogs.sync.syncers import Syncer, _Diff
+from bot.cogs.sync.syncers import Syncer, _Diff, _SnapshotEntry, _SyncProgress, _digest
 from tests import helpers
 
 
@@ -16,6 +20,8 @@ class TestSyncer(Syncer):
     name = "test"
     _get_diff = mock.AsyncMock()
     _sync = mock.AsyncMock()
+    _to_tuple = mock.MagicMock()
+    _get_guild_objects = mock.MagicMock(return_value=[])
 
 
 class SyncerBaseTests(unittest.TestCase):
@@ -402,3 +408,143 @@ class SyncerSyncTests(unittest.IsolatedAsyncioTestCase):
                     self.syncer._wait_for_confirmation.assert_called_once_with(
                         author, expected_message
                     )
+
+
+class SyncerConcurrencyTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for sending requests to per-item endpoints concurrently."""
+
+    def setUp(self):
+        self.bot = helpers.MockBot()
+        self.syncer = TestSyncer(self.bot)
+
+    @mock.patch("bot.cogs.sync.syncers.MAX_CONCURRENT_REQUESTS", new=3)
+    async def test_send_concurrently_limits_requests_in_flight(self):
+        """Every item should be sent, with no more than `MAX_CONCURRENT_REQUESTS` requests at once."""
+        in_flight = 0
+        max_in_flight = 0
+        sent = []
+
+        async def send(item):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            sent.append(item)
+            in_flight -= 1
+
+        await self.syncer._send_concurrently(range(10), send)
+
+        self.assertCountEqual(sent, range(10))
+        self.assertEqual(max_in_flight, 3)
+        self.assertEqual(self.syncer._progress.done, 10)
+
+    async def test_send_concurrently_stops_on_error(self):
+        """A failed request should be raised, and the remaining items should not be sent."""
+        error = ResponseCodeError(mock.MagicMock())
+        send = mock.AsyncMock(side_effect=[None, error] + [None] * 100)
+
+        with self.assertRaises(ResponseCodeError):
+            await self.syncer._send_concurrently(range(100), send)
+
+        self.assertLess(send.await_count, 100)
+
+    @mock.patch("bot.cogs.sync.syncers.PROGRESS_INTERVAL", new=0)
+    async def test_progress_is_reported_on_the_message(self):
+        """The sync message should be edited to show how many changes were sent so far."""
+        message = helpers.MockMessage()
+        self.syncer._progress = _SyncProgress("test", 3, message)
+
+        await self.syncer._send_concurrently(range(3), mock.AsyncMock())
+
+        message.edit.assert_called_with(content="📊 Synchronising tests: `2/3` changes sent.")
+
+
+class SyncerSnapshotTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for diffing against the snapshot saved on shutdown."""
+
+    def setUp(self):
+        self.bot = helpers.MockBot()
+        self.syncer = TestSyncer(self.bot)
+        self.syncer._get_diff = mock.AsyncMock()
+        self.syncer._sync = mock.AsyncMock()
+        self.syncer._get_guild_objects = mock.MagicMock(return_value=[])
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        patcher = mock.patch("bot.cogs.sync.syncers.SNAPSHOT_DIRECTORY", new=Path(directory.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_snapshot_round_trip(self):
+        """A saved snapshot should be loaded once and then deleted."""
+        self.syncer.snapshot = {1: "a", 2: "b"}
+        self.syncer.save_snapshot()
+
+        self.syncer.snapshot = None
+        self.assertTrue(self.syncer.load_snapshot())
+        self.assertEqual(self.syncer.snapshot, {1: "a", 2: "b"})
+
+        self.assertFalse(self.syncer._snapshot_path.exists())
+        self.assertFalse(self.syncer.load_snapshot())
+
+    def test_unknown_state_is_not_saved(self):
+        """Nothing should be written if the state of the site is unknown."""
+        self.syncer.snapshot = None
+        self.syncer.save_snapshot()
+
+        self.assertFalse(self.syncer._snapshot_path.exists())
+
+    def test_stale_or_corrupt_snapshot_is_ignored(self):
+        """Snapshots which are too old or can't be parsed should be deleted without being used."""
+        subtests = (
+            ("stale", json.dumps({"saved_at": time.time() - 2 * 60 * 60, "digests": {"1": "a"}})),
+            ("corrupt", "{not json"),
+            ("missing keys", json.dumps({"digests": {}})),
+        )
+
+        for name, content in subtests:
+            with self.subTest(snapshot=name):
+                path = self.syncer._snapshot_path
+                path.write_text(content, encoding="utf-8")
+
+                self.assertFalse(self.syncer.load_snapshot())
+                self.assertIsNone(self.syncer.snapshot)
+                self.assertFalse(path.exists())
+
+    def test_snapshot_diff(self):
+        """Objects should be compared with the snapshot by their digests."""
+        unchanged, changed, new = _SnapshotEntry(1), _SnapshotEntry(2), _SnapshotEntry(3)
+        self.syncer.snapshot = {1: _digest(unchanged), 2: "outdated", 4: "removed"}
+        self.syncer._get_guild_objects.return_value = [unchanged, changed, new]
+
+        diff = self.syncer._get_snapshot_diff(helpers.MockGuild())
+
+        self.assertEqual(diff, _Diff({new}, {changed}, {_SnapshotEntry(4)}))
+
+    async def test_sync_uses_snapshot(self):
+        """The site should not be diffed if a snapshot was loaded, and the snapshot should be rebuilt."""
+        guild = helpers.MockGuild()
+        guild_objects = [_SnapshotEntry(1), _SnapshotEntry(2)]
+        self.syncer._get_guild_objects.return_value = guild_objects
+        self.syncer._get_confirmation_result = mock.AsyncMock(return_value=(True, None))
+
+        self.syncer.snapshot = {1: _digest(guild_objects[0])}
+        self.syncer.save_snapshot()
+
+        await self.syncer.sync(guild, use_snapshot=True)
+
+        self.syncer._get_diff.assert_not_called()
+        self.syncer._sync.assert_called_with(_Diff({guild_objects[1]}, set(), set()))
+        self.assertEqual(self.syncer.snapshot, {obj.id: _digest(obj) for obj in guild_objects})
+
+    async def test_failed_sync_forgets_snapshot(self):
+        """The snapshot should be unknown after a sync failed, so it isn't saved."""
+        self.syncer._get_diff.return_value = _Diff({1}, set(), None)
+        self.syncer._get_confirmation_result = mock.AsyncMock(return_value=(True, None))
+        self.syncer._sync.side_effect = ResponseCodeError(mock.MagicMock())
+        self.syncer.snapshot = {1: "a"}
+
+        await self.syncer.sync(helpers.MockGuild())
+
+        self.assertIsNone(self.syncer.snapshot)
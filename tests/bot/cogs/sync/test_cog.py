@@ -1,4 +1,6 @@
+import tempfile
 import unittest
+from pathlib import Path
 from unittest import mock
 
 import discord
@@ -6,7 +8,7 @@ import discord
 from bot import constants
 from bot.api import ResponseCodeError
 from bot.cogs import sync
-from bot.cogs.sync.syncers import Syncer
+from bot.cogs.sync.syncers import Syncer, _SnapshotEntry
 from tests import helpers
 from tests.base import CommandTestCase
 
@@ -96,8 +98,8 @@ class SyncCogTests(SyncCogTestCase):
                     self.cog.role_syncer.sync.assert_not_called()
                     self.cog.user_syncer.sync.assert_not_called()
                 else:
-                    self.cog.role_syncer.sync.assert_called_once_with(guild)
-                    self.cog.user_syncer.sync.assert_called_once_with(guild)
+                    self.cog.role_syncer.sync.assert_called_once_with(guild, use_snapshot=True)
+                    self.cog.user_syncer.sync.assert_called_once_with(guild, use_snapshot=True)
 
     async def patch_user_helper(self, side_effect: BaseException) -> None:
         """Helper to set a side effect for bot.api_client.patch and then assert it is called."""
@@ -124,12 +126,139 @@ class SyncCogTests(SyncCogTestCase):
             await self.patch_user_helper(self.response_error(500))
 
 
+class SyncCogUserUpdateQueueTests(SyncCogTestCase):
+    """Tests for the queue of pending user changes of the Sync cog."""
+
+    def setUp(self):
+        super().setUp()
+        self.cog.patch_user = mock.AsyncMock(spec_set=self.cog.patch_user)
+
+    async def test_queued_changes_are_merged_per_user(self):
+        """Changes to the same user should be merged and sent with one request when flushed."""
+        await self.cog.queue_user_update(1, {"roles": [1]})
+        await self.cog.queue_user_update(1, {"roles": [1, 2], "in_guild": False})
+        await self.cog.queue_user_update(2, {"name": "new name"})
+        self.cog.patch_user.assert_not_called()
+
+        await self.cog.flush_user_updates()
+
+        self.cog.patch_user.assert_has_calls([
+            mock.call(1, updated_information={"roles": [1, 2], "in_guild": False}),
+            mock.call(2, updated_information={"name": "new name"}),
+        ], any_order=True)
+        self.assertEqual(self.cog.patch_user.call_count, 2)
+        self.bot.stats.incr.assert_called_with("sync.updates_sent", 2)
+
+    async def test_flush_is_scheduled_once(self):
+        """Only one delayed flush should be scheduled while one is pending."""
+        self.bot.loop.create_task = mock.Mock(side_effect=lambda coro: coro.close())
+        self.cog._flush_task = None
+
+        await self.cog.queue_user_update(1, {"in_guild": False})
+        self.cog._flush_task = mock.Mock(done=mock.Mock(return_value=False))
+        await self.cog.queue_user_update(2, {"in_guild": False})
+
+        self.bot.loop.create_task.assert_called_once()
+
+    @mock.patch("bot.cogs.sync.cog.MAX_PENDING_UPDATES", new=2)
+    async def test_changes_are_sent_right_away_when_queue_is_full(self):
+        """Pending changes should be sent without delay once too many users have pending changes."""
+        await self.cog.queue_user_update(1, {"in_guild": False})
+        self.cog.patch_user.assert_not_called()
+
+        await self.cog.queue_user_update(2, {"in_guild": False})
+        self.assertEqual(self.cog.patch_user.call_count, 2)
+        self.assertEqual(self.cog._pending_updates, {})
+
+    async def test_failed_update_does_not_stop_others(self):
+        """An error sending the changes of one user should not prevent sending the others."""
+        self.cog.patch_user.side_effect = [self.response_error(500), None]
+
+        await self.cog.queue_user_update(1, {"in_guild": False})
+        await self.cog.queue_user_update(2, {"in_guild": False})
+        await self.cog.flush_user_updates()
+
+        self.assertEqual(self.cog.patch_user.call_count, 2)
+
+    async def test_member_join_discards_pending_changes(self):
+        """Pending changes of a member should be dropped when the member joins."""
+        member = helpers.MockMember(discriminator="1234")
+        await self.cog.queue_user_update(member.id, {"in_guild": False})
+
+        await self.cog.on_member_join(member)
+        await self.cog.flush_user_updates()
+
+        self.cog.patch_user.assert_not_called()
+
+    async def test_sent_changes_are_recorded_in_snapshot(self):
+        """Users whose changes were sent should be recorded if they're members and forgotten otherwise."""
+        member = helpers.MockMember(id=1)
+        guild = self.bot.get_guild.return_value
+        guild.get_member.side_effect = lambda user_id: member if user_id == 1 else None
+
+        await self.cog.queue_user_update(1, {"name": "new name"})
+        await self.cog.queue_user_update(2, {"in_guild": False})
+        await self.cog.flush_user_updates()
+
+        self.cog.user_syncer.record.assert_called_once_with(member)
+        self.cog.user_syncer.forget.assert_called_once_with(2)
+
+    def test_unload_saves_snapshots_and_flushes(self):
+        """Unloading should save both snapshots and have the bot send the pending changes before closing."""
+        self.bot.loop.create_task = mock.Mock(side_effect=lambda coro: coro.close())
+        self.cog._flush_task = None
+        self.cog._pending_updates = {1: {"in_guild": False}}
+
+        self.cog.cog_unload()
+
+        self.cog.user_syncer.forget.assert_not_called()
+        self.cog.role_syncer.save_snapshot.assert_called_once_with()
+        self.cog.user_syncer.save_snapshot.assert_called_once_with()
+        self.bot.loop.create_task.assert_called_once()
+        self.bot.closing_tasks.append.assert_called_once()
+
+
+class SyncCogShutdownTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the snapshot the Sync cog saves when it's unloaded."""
+
+    def setUp(self):
+        self.bot = helpers.MockBot()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        patcher = mock.patch("bot.cogs.sync.syncers.SNAPSHOT_DIRECTORY", new=Path(directory.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_member_who_left_before_unflushed_unload_is_removed_after_restart(self):
+        """A member who left shortly before an unload which didn't send the change should be removed on restart."""
+        cog = sync.Sync(self.bot)
+        member = helpers.MockMember(id=1, name="bob", discriminator="1234", avatar=None, roles=[])
+        cog.user_syncer.snapshot = {}
+        cog.user_syncer.record(member)
+
+        # The bot mock closes the coroutines of scheduled tasks, so the pending change is never sent.
+        await cog.on_member_remove(member)
+        cog.cog_unload()
+        self.bot.api_client.patch.assert_not_called()
+
+        restarted = sync.Sync(self.bot)
+        self.assertTrue(restarted.user_syncer.load_snapshot())
+        diff = restarted.user_syncer._get_snapshot_diff(helpers.MockGuild(members=[]))
+
+        self.assertEqual(diff.updated, {_SnapshotEntry(1)})
+        await restarted.user_syncer._sync(diff)
+        self.bot.api_client.patch.assert_awaited_once_with("bot/users/1", json={"in_guild": False})
+
+
 class SyncCogListenerTests(SyncCogTestCase):
     """Tests for the listeners of the Sync cog."""
 
     def setUp(self):
         super().setUp()
         self.cog.patch_user = mock.AsyncMock(spec_set=self.cog.patch_user)
+        self.cog.queue_user_update = mock.AsyncMock(spec_set=self.cog.queue_user_update)
 
     async def test_sync_cog_on_guild_role_create(self):
         """A POST request should be sent with the new role's data."""
@@ -194,19 +323,19 @@ class SyncCogListenerTests(SyncCogTestCase):
                         self.bot.api_client.put.assert_not_called()
 
     async def test_sync_cog_on_member_remove(self):
-        """Member should patched to set in_guild as False."""
+        """A change setting in_guild to False should be queued for the member."""
         self.assertTrue(self.cog.on_member_remove.__cog_listener__)
 
         member = helpers.MockMember()
         await self.cog.on_member_remove(member)
 
-        self.cog.patch_user.assert_called_once_with(
+        self.cog.queue_user_update.assert_called_once_with(
             member.id,
             updated_information={"in_guild": False}
         )
 
     async def test_sync_cog_on_member_update_roles(self):
-        """Members should be patched if their roles have changed."""
+        """A change of the roles should be queued if the roles of a member changed."""
         self.assertTrue(self.cog.on_member_update.__cog_listener__)
 
         # Roles are intentionally unsorted.
@@ -217,10 +346,10 @@ class SyncCogListenerTests(SyncCogTestCase):
         await self.cog.on_member_update(before_member, after_member)
 
         data = {"roles": sorted(role.id for role in after_member.roles)}
-        self.cog.patch_user.assert_called_once_with(after_member.id, updated_information=data)
+        self.cog.queue_user_update.assert_called_once_with(after_member.id, updated_information=data)
 
     async def test_sync_cog_on_member_update_other(self):
-        """Members should not be patched if other attributes have changed."""
+        """No change should be queued if other attributes of a member changed."""
         self.assertTrue(self.cog.on_member_update.__cog_listener__)
 
         subtests = (
@@ -231,17 +360,17 @@ class SyncCogListenerTests(SyncCogTestCase):
 
         for attribute, old_value, new_value in subtests:
             with self.subTest(attribute=attribute):
-                self.cog.patch_user.reset_mock()
+                self.cog.queue_user_update.reset_mock()
 
                 before_member = helpers.MockMember(**{attribute: old_value})
                 after_member = helpers.MockMember(**{attribute: new_value})
 
                 await self.cog.on_member_update(before_member, after_member)
 
-                self.cog.patch_user.assert_not_called()
+                self.cog.queue_user_update.assert_not_called()
 
     async def test_sync_cog_on_user_update(self):
-        """A user should be patched only if the name, discriminator, or avatar changes."""
+        """A change should be queued only if the name, discriminator, or avatar of a user changes."""
         self.assertTrue(self.cog.on_user_update.__cog_listener__)
 
         before_data = {
@@ -260,7 +389,7 @@ class SyncCogListenerTests(SyncCogTestCase):
 
         for should_patch, attribute, api_field, value, api_value in subtests:
             with self.subTest(attribute=attribute):
-                self.cog.patch_user.reset_mock()
+                self.cog.queue_user_update.reset_mock()
 
                 after_data = before_data.copy()
                 after_data[attribute] = value
@@ -270,10 +399,10 @@ class SyncCogListenerTests(SyncCogTestCase):
                 await self.cog.on_user_update(before_user, after_user)
 
                 if should_patch:
-                    self.cog.patch_user.assert_called_once()
+                    self.cog.queue_user_update.assert_called_once()
 
                     # Don't care if *all* keys are present; only the changed one is required
-                    call_args = self.cog.patch_user.call_args
+                    call_args = self.cog.queue_user_update.call_args
                     self.assertEqual(call_args[0][0], after_user.id)
                     self.assertIn("updated_information", call_args[1])
 
@@ -281,7 +410,7 @@ class SyncCogListenerTests(SyncCogTestCase):
                     self.assertIn(api_field, updated_information)
                     self.assertEqual(updated_information[api_field], api_value)
                 else:
-                    self.cog.patch_user.assert_not_called()
+                    self.cog.queue_user_update.assert_not_called()
 
     async def on_member_join_helper(self, side_effect: Exception) -> dict:
         """
@@ -1,7 +1,8 @@
 import unittest
 from unittest import mock
 
-from bot.cogs.sync.syncers import UserSyncer, _Diff, _User
+from bot.api import ResponseCodeError
+from bot.cogs.sync.syncers import UserSyncer, _Diff, _SnapshotEntry, _User, _digest
 from tests import helpers
 
 
@@ -44,6 +45,7 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
 
     async def test_empty_diff_for_no_users(self):
         """When no users are given, an empty diff should be returned."""
+        self.bot.api_client.get.return_value = []
         guild = self.get_guild()
 
         actual_diff = await self.syncer._get_diff(guild)
@@ -121,6 +123,28 @@ class UserSyncerDiffTests(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(actual_diff, expected_diff)
 
+    async def test_diff_for_paginated_users(self):
+        """Every page of users should be requested and diffed if the site paginates users."""
+        pages = [
+            {"results": [fake_user(id=63, name="old")], "next_page_no": 2},
+            {"results": [fake_user(id=64, in_guild=True)], "next_page_no": None},
+        ]
+        self.bot.api_client.get.side_effect = pages
+        guild = self.get_guild(fake_user(id=63), fake_user(id=65))
+
+        actual_diff = await self.syncer._get_diff(guild)
+        expected_diff = (
+            {_User(**fake_user(id=65))},
+            {_User(**fake_user(id=63)), _User(**fake_user(id=64, in_guild=False))},
+            None
+        )
+
+        self.assertEqual(actual_diff, expected_diff)
+        self.bot.api_client.get.assert_has_calls([
+            mock.call("bot/users", params={"page": 1, "page_size": mock.ANY}),
+            mock.call("bot/users", params={"page": 2, "page_size": mock.ANY}),
+        ])
+
 
 class UserSyncerSyncTests(unittest.IsolatedAsyncioTestCase):
     """Tests for the API requests that sync users."""
@@ -130,20 +154,34 @@ class UserSyncerSyncTests(unittest.IsolatedAsyncioTestCase):
         self.syncer = UserSyncer(self.bot)
 
     async def test_sync_created_users(self):
-        """Only POST requests should be made with the correct payload."""
+        """Only a bulk POST request should be made with the payloads of all users."""
         users = [fake_user(id=111), fake_user(id=222)]
 
         user_tuples = {_User(**user) for user in users}
         diff = _Diff(user_tuples, set(), None)
         await self.syncer._sync(diff)
 
-        calls = [mock.call("bot/users", json=user) for user in users]
-        self.bot.api_client.post.assert_has_calls(calls, any_order=True)
-        self.assertEqual(self.bot.api_client.post.call_count, len(users))
+        self.bot.api_client.post.assert_called_once()
+        endpoint, = self.bot.api_client.post.call_args[0]
+        payload = self.bot.api_client.post.call_args[1]["json"]
+        self.assertEqual(endpoint, "bot/users")
+        self.assertCountEqual(payload, users)
 
         self.bot.api_client.put.assert_not_called()
         self.bot.api_client.delete.assert_not_called()
 
+    @mock.patch("bot.cogs.sync.syncers.BULK_CREATE_SIZE", new=2)
+    async def test_sync_created_users_in_batches(self):
+        """Created users should be split into batches of at most `BULK_CREATE_SIZE` users."""
+        users = [fake_user(id=user_id) for user_id in range(5)]
+
+        diff = _Diff({_User(**user) for user in users}, set(), None)
+        await self.syncer._sync(diff)
+
+        batches = [kwargs["json"] for _, kwargs in self.bot.api_client.post.call_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertCountEqual([user for batch in batches for user in batch], users)
+
     async def test_sync_updated_users(self):
         """Only PUT requests should be made with the correct payload."""
         users = [fake_user(id=111), fake_user(id=222)]
@@ -158,3 +196,41 @@ class UserSyncerSyncTests(unittest.IsolatedAsyncioTestCase):
 
         self.bot.api_client.post.assert_not_called()
         self.bot.api_client.delete.assert_not_called()
+
+    async def test_update_creates_missing_user(self):
+        """A user which the PUT request doesn't find should be created with a POST request."""
+        user = fake_user()
+        self.bot.api_client.put.side_effect = ResponseCodeError(mock.MagicMock(status=404))
+
+        await self.syncer._update_user(_User(**user))
+
+        self.bot.api_client.put.assert_called_once_with(f"bot/users/{user['id']}", json=user)
+        self.bot.api_client.post.assert_called_once_with("bot/users", json=user)
+
+    async def test_update_user_who_left(self):
+        """A user who left since the snapshot was taken should be marked as not in the guild."""
+        await self.syncer._update_user(_SnapshotEntry(43))
+
+        self.bot.api_client.patch.assert_called_once_with("bot/users/43", json={"in_guild": False})
+        self.bot.api_client.put.assert_not_called()
+
+
+class UserSyncerSnapshotTests(unittest.TestCase):
+    """Tests for diffing users against the snapshot."""
+
+    def setUp(self):
+        self.bot = helpers.MockBot()
+        self.syncer = UserSyncer(self.bot)
+
+    def test_snapshot_diff_only_updates(self):
+        """New, changed, and departed members should all be updated rather than created."""
+        unchanged = helpers.MockMember(id=1, discriminator="0001", avatar=None, roles=[])
+        changed = helpers.MockMember(id=2, discriminator="0002", avatar=None, roles=[])
+        new = helpers.MockMember(id=3, discriminator="0003", avatar=None, roles=[])
+        guild = helpers.MockGuild(members=[unchanged, changed, new])
+
+        self.syncer.snapshot = {1: _digest(self.syncer._to_tuple(unchanged)), 2: "outdated", 4: "left"}
+        diff = self.syncer._get_snapshot_diff(guild)
+
+        expected_updated = {self.syncer._to_tuple(changed), self.syncer._to_tuple(new), _SnapshotEntry(4)}
+        self.assertEqual(diff, _Diff(set(), expected_updated, None))
@@ -0,0 +1,178 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+
+from bot.cogs import doc
+from tests.helpers import MockBot, MockContext, MockMessage
+
+PAGE_URL = "https://docs.python.org/3/library/example.html"
+PAGE_HTML = """
+<html><body>
+<dl>
+<dt id="example.first">example.first(x)<a class="headerlink">¶</a></dt>
+<dd><p>Return the first thing.</p></dd>
+</dl>
+<dl>
+<dt id="example.second">example.second(y)<a class="headerlink">¶</a></dt>
+<dd><p>Return the second thing.</p></dd>
+</dl>
+</body></html>
+"""
+
+
+class DocPageTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the downloading, caching and parsing of documentation pages."""
+
+    async def asyncSetUp(self):
+        self.bot = MockBot()
+        with patch.object(doc.Doc, "_load_symbol_requests", return_value=doc.Counter()):
+            self.cog = doc.Doc(self.bot)
+        self.bot.loop = asyncio.get_running_loop()
+        self.addCleanup(self.cog._parser.shutdown)
+
+        self.cog.inventories = {
+            "example.first": f"{PAGE_URL}#example.first",
+            "example.second": f"{PAGE_URL}#example.second",
+        }
+        response = MagicMock(text=AsyncMock(return_value=PAGE_HTML))
+        self.bot.http_session = MagicMock()
+        self.bot.http_session.get.return_value.__aenter__.return_value = response
+
+    async def test_page_is_downloaded_and_parsed_once_for_symbols_on_it(self):
+        """Looking up two symbols on the same page downloads and parses the page once."""
+        with patch("bot.cogs.doc.BeautifulSoup", wraps=doc.BeautifulSoup) as parse:
+            first = await self.cog.get_symbol_html("example.first")
+            second = await self.cog.get_symbol_html("example.second")
+
+        self.bot.http_session.get.assert_called_once_with(PAGE_URL)
+        parse.assert_called_once()
+        self.assertEqual(first[0], ["example.first(x)"])
+        self.assertIn("Return the first thing.", first[1])
+        self.assertEqual(second[0], ["example.second(y)"])
+        self.assertIn("Return the second thing.", second[1])
+        self.assertEqual((self.cog._pages.hits, self.cog._pages.misses), (1, 1))
+
+    async def test_symbol_missing_from_page_is_not_found(self):
+        """A symbol whose ID isn't on its page isn't found."""
+        self.cog.inventories["example.missing"] = f"{PAGE_URL}#example.missing"
+
+        self.assertIsNone(await self.cog.get_symbol_html("example.missing"))
+
+    async def test_pages_are_cached_as_sections_limited_by_size(self):
+        """The page cache holds the scraped sections of pages and counts their characters against its limit."""
+        await self.cog.get_symbol_html("example.first")
+
+        sections = self.cog._pages.get(PAGE_URL)
+        self.assertEqual(sections.keys(), {"example.first", "example.second"})
+        self.assertEqual(self.cog._pages.max_bytes, doc.PAGE_CACHE_MAX_BYTES)
+        self.assertEqual(self.cog._pages.size_bytes, doc.page_size(sections))
+        self.assertLess(self.cog._pages.size_bytes, len(PAGE_HTML))
+
+    async def test_page_larger_than_the_cache_is_not_kept(self):
+        """A page whose sections are larger than the whole cache is scraped but not cached."""
+        self.cog._pages.max_bytes = 1
+
+        self.assertIsNotNone(await self.cog.get_symbol_html("example.first"))
+        self.assertIsNotNone(await self.cog.get_symbol_html("example.first"))
+
+        self.assertEqual(self.bot.http_session.get.call_count, 2)
+        self.assertEqual(len(self.cog._pages), 0)
+
+    async def test_pages_are_parsed_in_the_parser_threads(self):
+        """Pages are parsed by the parser threads rather than the thread running the event loop."""
+        threads = []
+        parse = doc.BeautifulSoup
+
+        def record_thread(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return parse(*args, **kwargs)
+
+        with patch("bot.cogs.doc.BeautifulSoup", side_effect=record_thread):
+            await self.cog.get_symbol_html("example.first")
+
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("doc-parser"))
+
+
+class SymbolRequestTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the counting of symbol requests and the warm-up of the most requested symbols."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name, "doc", "symbol_requests.json")
+
+        path_patcher = patch("bot.cogs.doc.SYMBOL_REQUESTS_PATH", self.path)
+        path_patcher.start()
+        self.addCleanup(path_patcher.stop)
+
+        self.bot = MockBot()
+        self.cog = doc.Doc(self.bot)
+        self.addCleanup(self.cog._parser.shutdown)
+        self.ctx = MockContext(bot=self.bot, message=MockMessage())
+
+    def test_no_saved_counts_start_from_zero(self):
+        """Without a saved file, no symbol has been requested."""
+        self.assertEqual(self.cog.symbol_requests, doc.Counter())
+
+    async def test_found_symbols_are_counted(self):
+        """Symbols whose documentation is sent are counted, symbols which weren't found aren't."""
+        self.cog.inventories = {"found": "https://example.com/#found"}
+        embeds = {"found": discord.Embed()}
+
+        with patch.object(self.cog, "get_symbol_embed", AsyncMock(side_effect=embeds.get)):
+            for symbol in ("found", "found", "missing"):
+                await self.cog.get_command.callback(self.cog, self.ctx, symbol)
+
+        self.assertEqual(self.cog.symbol_requests, doc.Counter({"found": 2}))
+
+    def test_saved_counts_are_loaded(self):
+        """The counts saved when the cog is unloaded are loaded by the next instance of the cog."""
+        self.cog.symbol_requests.update({"str.join": 3, "print": 5})
+        self.cog.cog_unload()
+
+        self.assertEqual(doc.Doc(self.bot).symbol_requests, doc.Counter({"str.join": 3, "print": 5}))
+
+    def test_only_most_requested_symbols_are_saved(self):
+        """Only the counts of the `MAX_TRACKED_SYMBOLS` most requested symbols are saved."""
+        self.cog.symbol_requests.update({"a": 3, "b": 1, "c": 2})
+
+        with patch("bot.cogs.doc.MAX_TRACKED_SYMBOLS", 2):
+            self.cog._save_symbol_requests()
+
+        self.assertEqual(doc.Doc._load_symbol_requests(), doc.Counter({"a": 3, "c": 2}))
+
+    def test_invalid_saved_counts_start_from_zero(self):
+        """A saved file which can't be read is ignored."""
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text("[1, 2", encoding="utf-8")
+
+        with self.assertLogs("bot.cogs.doc", "WARNING"):
+            self.assertEqual(doc.Doc._load_symbol_requests(), doc.Counter())
+
+    async def test_warm_up_renders_most_requested_symbols_in_inventory(self):
+        """The warm-up renders the most requested symbols still in the inventory, most requested first."""
+        self.cog.symbol_requests.update({"a": 5, "removed": 4, "b": 3, "c": 2, "d": 1})
+        self.cog.inventories = dict.fromkeys(("a", "b", "c", "d"), "https://example.com/")
+
+        with patch.object(self.cog, "get_symbol_embed", AsyncMock()) as get_symbol_embed:
+            with patch("bot.cogs.doc.WARM_UP_SYMBOLS", 3):
+                await self.cog.warm_up()
+
+        self.assertEqual([call.args for call in get_symbol_embed.await_args_list], [("a",), ("b",), ("c",)])
+
+    async def test_warm_up_continues_after_a_failure(self):
+        """A symbol which fails to render doesn't stop the rest from being warmed up."""
+        self.cog.symbol_requests.update({"a": 2, "b": 1})
+        self.cog.inventories = dict.fromkeys(("a", "b"), "https://example.com/")
+
+        with patch.object(self.cog, "get_symbol_embed", AsyncMock(side_effect=[ValueError, None])) as get_embed:
+            with self.assertLogs("bot.cogs.doc", "WARNING"):
+                await self.cog.warm_up()
+
+        self.assertEqual(get_embed.await_count, 2)
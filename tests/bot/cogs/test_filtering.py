@@ -1,5 +1,8 @@
 import asyncio
 import unittest.mock
+
+import discord
+
 from bot import constants
 from bot.cogs import filtering
 from tests import helpers
@@ -48,3 +51,104 @@ class FilteringCogTests(unittest.TestCase):
         return_values = asyncio.run(self.cog.nickname_filter.callback(self.cog, self.ctx.message))
         new_nickname = return_values[1]
         self.assertEqual(username, new_nickname)
+
+
+class FilterPipelineTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the order in which `_filter_message` runs the filters."""
+
+    def setUp(self):
+        self.bot = helpers.MockBot()
+        self.cog = filtering.Filtering(self.bot)
+        self.cog._handle_match = unittest.mock.AsyncMock()
+        self.msg = helpers.MockMessage(content="message")
+        self.msg.author.bot = False
+
+        self.cog.filters = {
+            "slow": self._filter(priority=1, io_bound=True),
+            "cheap": self._filter(priority=2, io_bound=False),
+            "slower": self._filter(priority=3, io_bound=True),
+            "disabled": self._filter(priority=0, io_bound=False, enabled=False),
+        }
+
+    @staticmethod
+    def _filter(priority: int, io_bound: bool, enabled: bool = True, type_: str = "filter") -> dict:
+        """Return a filter definition whose function doesn't match anything."""
+        return {
+            "enabled": enabled,
+            "function": unittest.mock.AsyncMock(return_value=False),
+            "priority": priority,
+            "io_bound": io_bound,
+            "type": type_,
+            "content_only": True,
+        }
+
+    async def test_cheap_match_skips_io_bound_filters(self):
+        """A match of a cheap filter is handled without running the network-bound filters."""
+        self.cog.filters["cheap"]["function"].return_value = True
+
+        await self.cog._filter_message(self.msg)
+
+        self.cog._handle_match.assert_awaited_once_with(self.msg, "cheap", self.cog.filters["cheap"], True)
+        self.cog.filters["slow"]["function"].assert_not_awaited()
+        self.cog.filters["slower"]["function"].assert_not_awaited()
+        self.cog.filters["disabled"]["function"].assert_not_awaited()
+
+    async def test_io_bound_match_with_highest_priority_is_handled(self):
+        """All network-bound filters run, and only the match of the one with the highest priority is handled."""
+        self.cog.filters["slow"]["function"].return_value = "slow match"
+        self.cog.filters["slower"]["function"].return_value = "slower match"
+
+        await self.cog._filter_message(self.msg)
+
+        self.cog.filters["slower"]["function"].assert_awaited_once_with("message")
+        self.cog._handle_match.assert_awaited_once_with(self.msg, "slow", self.cog.filters["slow"], "slow match")
+
+    async def test_alert_only_match_does_not_skip_deleting_filters(self):
+        """A message matching an alert-only filter and a network-bound deleting filter is deleted."""
+        self.cog.filters["embeds"] = self._filter(priority=0, io_bound=False, type_="watchlist")
+        self.cog.filters["embeds"]["function"].return_value = True
+        self.cog.filters["slow"]["function"].return_value = "invite"
+
+        await self.cog._filter_message(self.msg)
+
+        self.cog._handle_match.assert_awaited_once_with(self.msg, "slow", self.cog.filters["slow"], "invite")
+
+    async def test_alert_only_filters_run_when_nothing_is_deleted(self):
+        """Alert-only filters are handled if none of the deleting filters match."""
+        self.cog.filters["embeds"] = self._filter(priority=0, io_bound=False, type_="watchlist")
+        self.cog.filters["embeds"]["function"].return_value = True
+
+        await self.cog._filter_message(self.msg)
+
+        self.cog.filters["slower"]["function"].assert_awaited_once()
+        self.cog._handle_match.assert_awaited_once_with(self.msg, "embeds", self.cog.filters["embeds"], True)
+
+    async def test_message_with_rich_embed_and_invite_is_deleted(self):
+        """A message with a rich embed and an invite is handled by the invite filter, not the embed watch."""
+        cog = filtering.Filtering(self.bot)
+        cog._handle_match = unittest.mock.AsyncMock()
+        invite_data = {"python": {"guild_id": 1}}
+        cog._has_invites = unittest.mock.AsyncMock(return_value=invite_data)
+        cog.filters["filter_invites"]["function"] = cog._has_invites
+
+        msg = helpers.MockMessage(content="join discord.gg/python", embeds=[discord.Embed(title="rich")])
+        msg.author.bot = False
+
+        with unittest.mock.patch.multiple(
+            filtering.Filter, channel_whitelist=[], role_whitelist=[]
+        ), unittest.mock.patch.dict(cog.filters["filter_invites"], enabled=True), \
+                unittest.mock.patch.dict(cog.filters["watch_rich_embeds"], enabled=True):
+            await cog._filter_message(msg)
+
+        cog._handle_match.assert_awaited_once_with(
+            msg, "filter_invites", cog.filters["filter_invites"], invite_data
+        )
+
+    async def test_filter_latency_is_timed(self):
+        """The time each filter takes is sent to statsd."""
+        await self.cog._filter_message(self.msg)
+
+        self.bot.stats.timer.assert_has_calls(
+            [unittest.mock.call(f"filters.latency.{name}") for name in ("cheap", "slow", "slower")],
+            any_order=True
+        )
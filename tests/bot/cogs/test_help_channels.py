@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import discord
+
+from bot.cogs import help_channels
+from bot.cogs.help_channels import ChannelState, HelpChannels
+from tests.helpers import MockBot, MockTextChannel
+
+
+def snowflake_at(time: datetime) -> int:
+    """Return a snowflake of a message created at `time`."""
+    return discord.utils.time_snowflake(time)
+
+
+class ChannelStateTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the channel state tracking of the `HelpChannels` cog."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.cog = HelpChannels(self.bot)
+
+        self.channel = MockTextChannel(id=1)
+        self.cog.channel_states[self.channel.id] = ChannelState("help-hydrogen", 10)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = patch.object(help_channels, "STATE_PATH", Path(directory.name, "help_channels.json"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_idle_time_is_taken_from_last_message_id(self):
+        """The idle time is derived from the ID of the last message, which may be days old."""
+        last_message_at = datetime.utcnow() - timedelta(days=1, seconds=30)
+        self.cog.update_channel_state(self.channel.id, last_message_id=snowflake_at(last_message_at))
+
+        self.assertAlmostEqual(self.cog.get_idle_time(self.channel), 24 * 60 * 60 + 30, delta=2)
+
+        self.cog.update_channel_state(self.channel.id, last_message_id=None)
+        self.assertIsNone(self.cog.get_idle_time(self.channel))
+
+    def test_saved_states_are_loaded(self):
+        """The saved states are read back as they were."""
+        self.cog.update_channel_state(self.channel.id, claimant_id=2, last_message_id=3, dormant_message_id=3)
+        self.cog.save_channel_states()
+
+        self.assertEqual(HelpChannels.load_channel_states(), self.cog.channel_states)
+
+    def test_corrupt_state_file_is_ignored(self):
+        """An unreadable state file results in no saved states."""
+        help_channels.STATE_PATH.write_text('{"1": {"unknown": 1}}', encoding="utf-8")
+
+        self.assertEqual(HelpChannels.load_channel_states(), {})
+
+    async def test_tracked_dormant_message_is_edited_without_fetching(self):
+        """The dormant message is edited if it's the last message, without fetching messages."""
+        self.cog.update_channel_state(self.channel.id, last_message_id=5, dormant_message_id=5)
+        self.bot.http.edit_message = AsyncMock()
+
+        with patch.object(HelpChannels, "get_last_message") as get_last_message:
+            await self.cog.send_available_message(self.channel)
+
+        get_last_message.assert_not_called()
+        self.bot.http.edit_message.assert_awaited_once()
+        self.assertEqual(self.bot.http.edit_message.call_args[0][:2], (self.channel.id, 5))
+        self.channel.send.assert_not_awaited()
+
+    async def test_new_message_is_sent_after_other_messages(self):
+        """A new available message is sent if something was sent after the dormant message."""
+        self.cog.update_channel_state(self.channel.id, last_message_id=6, dormant_message_id=5)
+        self.bot.http.edit_message = AsyncMock()
+
+        await self.cog.send_available_message(self.channel)
+
+        self.bot.http.edit_message.assert_not_awaited()
+        self.channel.send.assert_awaited_once()
+
+    async def test_deleted_channel_frees_its_name(self):
+        """Deleting a help channel stops tracking it and makes its name available again."""
+        self.cog.name_queue = deque()
+        self.cog.name_positions = ["help-hydrogen"]
+
+        await self.cog.on_guild_channel_delete(self.channel)
+
+        self.assertNotIn(self.channel.id, self.cog.channel_states)
+        self.assertEqual(list(self.cog.name_queue), ["help-hydrogen"])
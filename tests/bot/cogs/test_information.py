@@ -240,24 +240,28 @@ class UserInfractionHelperMethodTests(unittest.TestCase):
             {
                 "helper_method": self.cog.basic_user_infraction_counts,
                 "expected_args": ("bot/infractions", {'hidden': 'False', 'user__id': str(self.member.id)}),
+                "expected_kwargs": {"cache_ttl": information.INFRACTION_COUNTS_CACHE_TTL},
             },
             {
                 "helper_method": self.cog.expanded_user_infraction_counts,
                 "expected_args": ("bot/infractions", {'user__id': str(self.member.id)}),
+                "expected_kwargs": {"cache_ttl": information.INFRACTION_COUNTS_CACHE_TTL},
             },
             {
                 "helper_method": self.cog.user_nomination_counts,
                 "expected_args": ("bot/nominations", {'user__id': str(self.member.id)}),
+                "expected_kwargs": {},
             },
         )
 
         for test_value in test_values:
             helper_method = test_value["helper_method"]
             endpoint, params = test_value["expected_args"]
+            kwargs = test_value["expected_kwargs"]
 
             with self.subTest(method=helper_method, endpoint=endpoint, params=params):
                 asyncio.run(helper_method(self.member))
-                self.bot.api_client.get.assert_called_once_with(endpoint, params=params)
+                self.bot.api_client.get.assert_called_once_with(endpoint, params=params, **kwargs)
                 self.bot.api_client.get.reset_mock()
 
     def _method_subtests(self, method, test_values, default_header):
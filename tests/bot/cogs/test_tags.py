@@ -0,0 +1,38 @@
+import unittest
+
+from bot.cogs.tags import Tags
+from tests.helpers import MockBot, MockContext
+
+
+class TagSuggestionTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the tag suggestions of the `Tags` cog."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.cog = Tags(self.bot)
+        self.ctx = MockContext(bot=self.bot)
+
+    def scan_suggestions(self, tag_name):
+        """Return the suggestions found by scoring every tag."""
+        scores = {title: Tags._fuzzy_search(tag_name, title) for title in self.cog._cache}
+        for threshold in (100, 90, 80, 70, 60):
+            suggestions = [self.cog._cache[title] for title, score in scores.items() if score >= threshold]
+            if suggestions:
+                return suggestions
+        return []
+
+    def test_suggestions_agree_with_scoring_every_tag(self):
+        """The index suggests the same tags, in the same order, as scoring every tag would."""
+        for tag_name in ("class", "cls", "fstr", "mut-def", "pth", "dictc", "xyz", "qotes", "q"):
+            with self.subTest(tag_name=tag_name):
+                self.assertEqual(self.cog._get_suggestions(tag_name), self.scan_suggestions(tag_name))
+
+    async def test_misspelt_name_does_not_post_a_tag(self):
+        """A name with a typo, such as an unknown command, doesn't post a similarly spelt tag."""
+        for tag_name in ("qotes", "xclass"):
+            with self.subTest(tag_name=tag_name):
+                self.ctx.send.reset_mock()
+
+                await self.cog.get_command.callback(self.cog, self.ctx, tag_name=tag_name)
+
+                self.ctx.send.assert_not_awaited()
@@ -0,0 +1,139 @@
+import itertools
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from bot.rules import (
+    attachments, burst, burst_shared, chars, discord_emojis,
+    duplicates, engine, links, mentions, newlines, role_mentions,
+)
+from tests.helpers import MockAttachment, MockMessage, MockTextChannel
+
+
+NOW = datetime(2020, 1, 1, 12, 0, 0)
+CHANNEL = MockTextChannel(id=1)
+
+RULES = {
+    "attachments": (attachments.apply, {"interval": 10, "max": 3}),
+    "burst": (burst.apply, {"interval": 10, "max": 4}),
+    "burst_shared": (burst_shared.apply, {"interval": 10, "max": 8}),
+    "chars": (chars.apply, {"interval": 5, "max": 60}),
+    "discord_emojis": (discord_emojis.apply, {"interval": 10, "max": 3}),
+    "duplicates": (duplicates.apply, {"interval": 10, "max": 2}),
+    "links": (links.apply, {"interval": 10, "max": 2}),
+    "mentions": (mentions.apply, {"interval": 10, "max": 3}),
+    "newlines": (newlines.apply, {"interval": 10, "max": 6, "max_consecutive": 3}),
+    "role_mentions": (role_mentions.apply, {"interval": 10, "max": 2}),
+}
+
+CONTENTS = (
+    "hello",
+    "hello",
+    "<:lemon:123> <:lemon:123>",
+    "https://pydis.com and https://python.org",
+    "a\n\n\n\nb",
+    "a\nb\nc",
+    "x" * 40,
+)
+
+
+def make_engine(custom_apply: bool = False) -> engine.RuleEngine:
+    """Make an engine for all rules in `RULES`, optionally hiding the built-in functions behind wrappers."""
+    functions = {}
+    for name, (function, _) in RULES.items():
+        if custom_apply:
+            async def function(*args, _function=function):  # noqa: F811
+                return await _function(*args)
+        functions[name] = function
+
+    return engine.RuleEngine({name: config for name, (_, config) in RULES.items()}, functions)
+
+
+def make_messages(seed: int, count: int = 60) -> list:
+    """Generate `count` random messages from a few authors, spread over a little more than a minute."""
+    rng = random.Random(seed)
+    ids = itertools.count(1)
+    messages = []
+
+    for i in range(count):
+        messages.append(MockMessage(
+            id=next(ids),
+            author=rng.choice(("alice", "bob", "carol")),
+            channel=CHANNEL,
+            content=rng.choice(CONTENTS),
+            created_at=NOW + timedelta(seconds=i * 1.2),
+            attachments=[MockAttachment()] * rng.randint(0, 2),
+            mentions=["alice"] * rng.randint(0, 2),
+            role_mentions=["role"] * rng.randint(0, 1),
+        ))
+
+    return messages
+
+
+def normalise(result: engine.RuleResult) -> tuple:
+    """Make rule results comparable regardless of the container types used for their members."""
+    if result is None:
+        return None
+
+    reason, members, messages = result
+    return reason, set(members), [message.id for message in messages]
+
+
+class RuleEngineTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the incremental antispam `RuleEngine`."""
+
+    async def assert_matches_apply(self, rule_engine: engine.RuleEngine, messages: list) -> None:
+        """Feed `messages` to `rule_engine` and compare every result to the rule's own `apply` function."""
+        for index, message in enumerate(messages):
+            rule_engine.add(message)
+            now = message.created_at
+
+            for name, (function, config) in RULES.items():
+                interval_start = now - timedelta(seconds=config["interval"])
+                recent_messages = [msg for msg in messages[index::-1] if msg.created_at > interval_start]
+
+                with self.subTest(rule=name, message=index):
+                    self.assertEqual(
+                        normalise(await rule_engine.apply(name, message, now)),
+                        normalise(await function(message, recent_messages, config)),
+                    )
+
+    async def test_incremental_checks_match_apply(self):
+        """The incremental checks give the same results as the `apply` functions they replace."""
+        for seed in range(5):
+            await self.assert_matches_apply(make_engine(), make_messages(seed))
+
+    async def test_custom_functions_receive_recent_messages(self):
+        """Functions without an incremental implementation are called with the messages in the interval."""
+        await self.assert_matches_apply(make_engine(custom_apply=True), make_messages(0))
+
+    async def test_deleted_and_edited_messages_are_recounted(self):
+        """Deleted messages stop counting and edited messages are counted with their new content."""
+        rule_engine = make_engine()
+        first, second, third = (
+            MockMessage(id=i, author="bob", channel=CHANNEL, content="spam", created_at=NOW)
+            for i in range(1, 4)
+        )
+        for message in (first, second, third):
+            rule_engine.add(message)
+
+        self.assertIsNotNone(await rule_engine.apply("duplicates", third, NOW))
+
+        rule_engine.remove(CHANNEL.id, first.id)
+        self.assertIsNone(await rule_engine.apply("duplicates", third, NOW))
+
+        rule_engine.update(MockMessage(id=2, author="bob", channel=CHANNEL, content="ham", created_at=NOW))
+        self.assertIsNone(await rule_engine.apply("duplicates", third, NOW))
+
+    async def test_expired_messages_are_not_counted(self):
+        """Messages older than a rule's interval no longer count towards it."""
+        rule_engine = make_engine()
+        messages = [
+            MockMessage(id=i, author="bob", channel=CHANNEL, content="x" * 40, created_at=NOW + timedelta(seconds=i))
+            for i in range(3)
+        ]
+        for message in messages:
+            rule_engine.add(message)
+
+        self.assertIsNotNone(await rule_engine.apply("chars", messages[-1], NOW + timedelta(seconds=2)))
+        self.assertIsNone(await rule_engine.apply("chars", messages[-1], NOW + timedelta(seconds=6.5)))
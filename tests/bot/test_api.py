@@ -1,5 +1,6 @@
+import asyncio
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from bot import api
 
@@ -72,3 +73,94 @@ class APIClientTests(unittest.IsolatedAsyncioTestCase):
             response_text=text_data
         )
         self.assertEqual(str(error), f"Status: {self.error_api_response.status} Response: {text_data}")
+
+
+class APIClientCacheTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the response cache of the API client."""
+
+    async def asyncSetUp(self):
+        with patch.object(api.APIClient, "recreate"):
+            self.client = api.APIClient(loop=asyncio.get_running_loop(), stats=MagicMock())
+
+        self.client.session = MagicMock()
+        self.client._ready.set()
+        self.response = self.mock_response(200, ["name"])
+
+    def mock_response(self, status: int, data, headers: dict = None) -> MagicMock:
+        """Make every request of the session respond with `status` and the JSON `data`."""
+        response = MagicMock(status=status, headers=headers or {})
+        response.json = AsyncMock(return_value=data)
+        self.client.session.get.return_value.__aenter__.return_value = response
+        self.client.session.request.return_value.__aenter__.return_value = response
+        self.client.session.delete.return_value.__aenter__.return_value = response
+        return response
+
+    async def test_get_without_ttl_is_not_cached(self):
+        """GET requests are only cached if a TTL is given."""
+        await self.client.get("bot/off-topic-channel-names")
+        await self.client.get("bot/off-topic-channel-names")
+
+        self.assertEqual(self.client.session.request.call_count, 2)
+
+    async def test_cached_response_is_returned_until_ttl(self):
+        """A cached copy of the response is returned until its TTL has passed."""
+        with patch("bot.api.time.monotonic", return_value=0):
+            first = await self.client.get("bot/off-topic-channel-names", cache_ttl=10)
+            first.append("modified")
+            second = await self.client.get("bot/off-topic-channel-names", cache_ttl=10)
+
+        self.assertEqual(second, ["name"])
+        self.client.session.get.assert_called_once()
+        self.client.stats.incr.assert_any_call("api.cache.hit")
+
+        with patch("bot.api.time.monotonic", return_value=10):
+            await self.client.get("bot/off-topic-channel-names", cache_ttl=10)
+
+        self.assertEqual(self.client.session.get.call_count, 2)
+
+    async def test_params_are_part_of_the_key(self):
+        """Requests with different query parameters are cached separately."""
+        await self.client.get("bot/infractions", params={"user__id": "1"}, cache_ttl=10)
+        await self.client.get("bot/infractions", params={"user__id": "2"}, cache_ttl=10)
+        await self.client.get("bot/infractions", params={"user__id": "1"}, cache_ttl=10)
+
+        self.assertEqual(self.client.session.get.call_count, 2)
+
+    async def test_stale_response_is_revalidated(self):
+        """A stale response with an ETag is revalidated with a conditional request."""
+        self.mock_response(200, ["name"], headers={"ETag": '"v1"'})
+        with patch("bot.api.time.monotonic", return_value=0):
+            await self.client.get("bot/off-topic-channel-names", cache_ttl=10)
+
+        self.mock_response(304, None)
+        with patch("bot.api.time.monotonic", return_value=20):
+            data = await self.client.get("bot/off-topic-channel-names", cache_ttl=10)
+
+        self.assertEqual(data, ["name"])
+        _, kwargs = self.client.session.get.call_args
+        self.assertEqual(kwargs["headers"], {"If-None-Match": '"v1"'})
+        self.client.stats.incr.assert_any_call("api.cache.revalidate")
+
+    async def test_writes_invalidate_related_resources(self):
+        """Writing to a resource drops the cached responses of it, its parents, and its children."""
+        endpoints = ("bot/infractions", "bot/infractions/5", "bot/infractions/6", "bot/infractions-other")
+        for endpoint in endpoints:
+            await self.client.get(endpoint, cache_ttl=10)
+
+        await self.client.patch("bot/infractions/5", json={"active": False})
+
+        cached = {key[0] for key in self.client._cache.keys()}
+        self.assertEqual(cached, {"bot/infractions/6", "bot/infractions-other"})
+
+        await self.client.delete("bot/infractions")
+        self.assertEqual({key[0] for key in self.client._cache.keys()}, {"bot/infractions-other"})
+
+    async def test_error_responses_are_not_cached(self):
+        """Responses with an error status aren't cached."""
+        self.mock_response(404, {"detail": "Not found."})
+
+        for _ in range(2):
+            with self.assertRaises(api.ResponseCodeError):
+                await self.client.get("bot/bot-settings/defcon", cache_ttl=10)
+
+        self.assertEqual(self.client.session.get.call_count, 2)
@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bot import async_stats
+
+
+class AsyncStatsClientTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the buffered `AsyncStatsClient` transport."""
+
+    async def asyncSetUp(self):
+        self.client = async_stats.AsyncStatsClient(asyncio.get_running_loop(), "127.0.0.1", 8125, prefix="bot")
+        self.client._transport = MagicMock()
+
+    def sent_metrics(self) -> list:
+        """Return every metric sent so far, in order."""
+        packets = [args[0].decode("ascii") for args, _ in self.client._transport.sendto.call_args_list]
+        return [metric for packet in packets for metric in packet.split("\n")]
+
+    async def test_metrics_are_sent_after_flush_interval(self):
+        """Nothing is sent until the flush interval elapsed, then everything is sent in one datagram."""
+        with patch("bot.async_stats.FLUSH_INTERVAL", 0):
+            self.client.timing("latency", 5)
+            self.client.gauge("members", 10)
+            self.client._transport.sendto.assert_not_called()
+
+            await asyncio.sleep(0.01)
+
+        self.client._transport.sendto.assert_called_once_with(
+            b"bot.latency:5.000000|ms\nbot.members:10|g", ("127.0.0.1", 8125)
+        )
+
+    async def test_increments_are_summed(self):
+        """Unsampled increments of the same stat are sent as one counter."""
+        self.client.incr("messages")
+        self.client.incr("messages", 2)
+        self.client.decr("members")
+        self.client.flush()
+
+        self.assertEqual(self.sent_metrics(), ["bot.messages:3|c", "bot.members:-1|c"])
+
+    async def test_sampled_increments_are_not_summed(self):
+        """Increments with a sample rate are sent as they are."""
+        with patch("statsd.client.base.random.random", return_value=0):
+            self.client.incr("messages", rate=0.5)
+            self.client.incr("messages", rate=0.5)
+        self.client.flush()
+
+        self.assertEqual(self.sent_metrics(), ["bot.messages:1|c|@0.5"] * 2)
+
+    async def test_full_buffer_is_sent_immediately(self):
+        """Once a datagram's worth of metrics is buffered, it's sent without waiting."""
+        metric_count = async_stats.MAX_PACKET_SIZE // len("bot.latency:5.000000|ms") + 1
+        for _ in range(metric_count):
+            self.client.timing("latency", 5)
+
+        self.client._transport.sendto.assert_called_once()
+        self.assertEqual(len(self.sent_metrics()) + len(self.client._buffer), metric_count)
+
+    def test_pack_respects_packet_size(self):
+        """Metrics are split into packets no larger than `MAX_PACKET_SIZE`."""
+        metrics = [f"bot.stat{i}:1|c" for i in range(500)]
+        packets = async_stats.AsyncStatsClient._pack(metrics)
+
+        self.assertGreater(len(packets), 1)
+        self.assertTrue(all(len(packet) <= async_stats.MAX_PACKET_SIZE for packet in packets))
+        self.assertEqual("\n".join(packets).split("\n"), metrics)
+
+    async def test_close_flushes(self):
+        """Closing the client sends the buffered metrics and closes the socket."""
+        self.client.incr("messages")
+        await self.client.close()
+
+        self.assertEqual(self.sent_metrics(), ["bot.messages:1|c"])
+        self.client._transport.close.assert_called_once()
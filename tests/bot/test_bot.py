@@ -0,0 +1,47 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from discord.ext import commands
+
+from bot.bot import Bot
+
+
+class BotCloseTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for closing the `Bot`."""
+
+    async def asyncSetUp(self):
+        self.bot = Bot(command_prefix="!", loop=asyncio.get_running_loop())
+        self.bot.api_client = MagicMock(close=AsyncMock())
+        self.bot.stats = MagicMock(close=AsyncMock())
+
+    async def test_closing_tasks_finish_before_api_client_is_closed(self):
+        """Tasks started while unloading the cogs are awaited before the API client is closed."""
+        events = []
+
+        async def flush():
+            await asyncio.sleep(0)
+            events.append("flushed")
+
+        async def unload_cogs():
+            self.bot.closing_tasks.append(asyncio.create_task(flush()))
+
+        self.bot.api_client.close.side_effect = lambda: events.append("closed")
+
+        with patch.object(commands.Bot, "close", side_effect=unload_cogs):
+            await self.bot.close()
+
+        self.assertEqual(events, ["flushed", "closed"])
+        self.assertEqual(self.bot.closing_tasks, [])
+
+    async def test_failed_closing_task_is_logged(self):
+        """A closing task which fails is logged and doesn't stop the bot from closing."""
+        async def fail():
+            raise ValueError
+
+        self.bot.closing_tasks.append(asyncio.create_task(fail()))
+
+        with patch.object(commands.Bot, "close", AsyncMock()), self.assertLogs("bot", "ERROR"):
+            await self.bot.close()
+
+        self.bot.api_client.close.assert_awaited_once()
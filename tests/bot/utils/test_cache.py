@@ -0,0 +1,205 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from bot.utils.cache import AsyncTTLCache, ExpiringSet, async_cache
+
+
+class AsyncTTLCacheTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the `AsyncTTLCache` utility."""
+
+    def setUp(self):
+        self.now = 0.0
+        patcher = patch("bot.utils.cache.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cache = AsyncTTLCache(maxsize=2, ttl=10, negative_ttl=1)
+
+    def test_entries_expire_after_ttl(self):
+        """An entry can be read until its TTL has passed."""
+        self.cache.set("key", "value")
+
+        self.now = 9.9
+        self.assertEqual(self.cache["key"], "value")
+
+        self.now = 10
+        self.assertNotIn("key", self.cache)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_none_uses_negative_ttl(self):
+        """None values expire after `negative_ttl` seconds."""
+        self.cache.set("key", None)
+
+        self.now = 0.5
+        self.assertIn("key", self.cache)
+
+        self.now = 1
+        self.assertNotIn("key", self.cache)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Once the cache is full, the entry read or written least recently is evicted first."""
+        self.cache.set("first", 1)
+        self.cache.set("second", 2)
+        self.cache["first"]
+        self.cache.set("third", 3)
+
+        self.assertIn("first", self.cache)
+        self.assertNotIn("second", self.cache)
+        self.assertIn("third", self.cache)
+
+    def test_entries_are_evicted_by_size(self):
+        """Least recently used entries are evicted once the values are larger than `max_bytes` in total."""
+        cache = AsyncTTLCache(maxsize=10, ttl=10, max_bytes=10, sizeof=len)
+        cache.set("first", "aaaa")
+        cache.set("second", "bbbb")
+        cache["first"]
+        cache.set("third", "cccc")
+
+        self.assertEqual(cache.keys(), ["first", "third"])
+        self.assertEqual(cache.size_bytes, 8)
+
+        cache.set("too large", "d" * 11)
+        self.assertNotIn("too large", cache)
+        self.assertEqual(cache.size_bytes, 8)
+
+    async def test_get_or_fetch_counts_hits_and_misses(self):
+        """Lookups made through `get_or_fetch` are counted as hits or misses."""
+        fetch = AsyncMock(return_value="value")
+
+        for _ in range(3):
+            await self.cache.get_or_fetch("key", fetch)
+
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    async def test_get_or_fetch_caches_result(self):
+        """The fetch coroutine is only awaited on a miss."""
+        fetch = AsyncMock(return_value="value")
+
+        self.assertEqual(await self.cache.get_or_fetch("key", fetch), "value")
+        self.assertEqual(await self.cache.get_or_fetch("key", fetch), "value")
+        fetch.assert_awaited_once()
+
+    async def test_concurrent_misses_share_one_fetch(self):
+        """Concurrent misses for the same key wait for a single fetch."""
+        event = asyncio.Event()
+
+        async def fetch():
+            await event.wait()
+            return "value"
+
+        fetch_mock = AsyncMock(side_effect=fetch)
+        waiters = [asyncio.create_task(self.cache.get_or_fetch("key", fetch_mock)) for _ in range(3)]
+        await asyncio.sleep(0)
+        event.set()
+
+        self.assertEqual(await asyncio.gather(*waiters), ["value"] * 3)
+        fetch_mock.assert_awaited_once()
+
+    async def test_exceptions_are_not_cached(self):
+        """A fetch which raises is propagated to the caller and retried on the next call."""
+        fetch = AsyncMock(side_effect=[ValueError, "value"])
+
+        with self.assertRaises(ValueError):
+            await self.cache.get_or_fetch("key", fetch)
+
+        self.assertEqual(await self.cache.get_or_fetch("key", fetch), "value")
+        self.assertEqual(fetch.await_count, 2)
+
+    async def test_fetch_running_when_cleared_is_not_cached(self):
+        """A fetch which started before `clear` doesn't store its stale result, and isn't shared after it."""
+        event = asyncio.Event()
+
+        async def fetch_stale():
+            await event.wait()
+            return "stale"
+
+        stale = asyncio.create_task(self.cache.get_or_fetch("key", fetch_stale))
+        await asyncio.sleep(0)
+        self.cache.clear()
+
+        fresh = asyncio.create_task(self.cache.get_or_fetch("key", AsyncMock(return_value="fresh")))
+        event.set()
+
+        self.assertEqual(await asyncio.gather(stale, fresh), ["stale", "fresh"])
+        self.assertEqual(self.cache.get("key"), "fresh")
+        self.assertFalse(self.cache._pending)
+
+
+class ExpiringSetTests(unittest.TestCase):
+    """Tests for the `ExpiringSet` utility."""
+
+    def setUp(self):
+        self.now = 0.0
+        patcher = patch("bot.utils.cache.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.set = ExpiringSet(ttl=10)
+
+    def test_items_expire_after_ttl(self):
+        """Items are members until their TTL has passed, and are then counted as expired."""
+        self.set.add(1)
+        self.set.add(2, ttl=20)
+
+        self.now = 9.9
+        self.assertIn(1, self.set)
+
+        self.now = 10
+        self.assertNotIn(1, self.set)
+        self.assertEqual(list(self.set), [2])
+        self.assertEqual(self.set.expired, 1)
+        self.assertEqual(self.set.peak_size, 2)
+
+    def test_adding_again_renews_deadline(self):
+        """Adding an item which is already in the set extends its lifetime."""
+        self.set.add(1)
+        self.now = 5
+        self.set.add(1)
+
+        self.now = 12
+        self.assertIn(1, self.set)
+        self.assertEqual(len(self.set), 1)
+
+        self.now = 15
+        self.assertEqual(len(self.set), 0)
+
+    def test_discard_returns_whether_item_was_present(self):
+        """Discarding removes an item, and only reports live items as having been present."""
+        self.set.add(1)
+        self.set.add(2)
+
+        self.assertTrue(self.set.discard(1))
+        self.assertFalse(self.set.discard(1))
+        self.assertNotIn(1, self.set)
+
+        self.now = 10
+        self.assertFalse(self.set.discard(2))
+        self.assertEqual(self.set.expired, 0)
+
+    def test_heap_is_compacted(self):
+        """Entries of removed items don't accumulate in the heap."""
+        for item in range(1000):
+            self.set.add(item)
+            self.set.discard(item)
+
+        self.assertLess(len(self.set._heap), 100)
+
+
+class AsyncCacheDecoratorTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for the `async_cache` decorator."""
+
+    async def test_functions_have_separate_caches(self):
+        """Each decorated function caches its results by its arguments in a cache of its own."""
+        first = AsyncMock(side_effect=lambda *args: ("first", args))
+        second = AsyncMock(side_effect=lambda *args: ("second", args))
+        cached_first = async_cache(maxsize=10, ttl=10, arg_offset=1)(first)
+        cached_second = async_cache(maxsize=10, ttl=10, arg_offset=1)(second)
+
+        self.assertEqual(await cached_first("self", "a"), ("first", ("self", "a")))
+        self.assertEqual(await cached_first("other self", "a"), ("first", ("self", "a")))
+        self.assertEqual(await cached_second("self", "a"), ("second", ("self", "a")))
+
+        first.assert_awaited_once()
+        self.assertEqual(cached_first.cache.keys(), [("a",)])
+        self.assertEqual(cached_second.cache.keys(), [("a",)])
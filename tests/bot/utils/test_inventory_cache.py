@@ -0,0 +1,111 @@
+import io
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+from bot.utils.inventory_cache import InventoryCache, InventoryDecoder, parse_inventory
+
+
+def make_inventory(*symbols):
+    """Return the raw bytes of a version 2 intersphinx inventory of Python functions named `symbols`."""
+    header = (
+        b"# Sphinx inventory version 2\n"
+        b"# Project: test\n"
+        b"# Version: 1.0\n"
+        b"# The remainder of this file is compressed using zlib.\n"
+    )
+    body = "".join(f"{symbol} py:function 1 api.html#$ -\n" for symbol in symbols)
+    return header + zlib.compress(body.encode())
+
+
+class InventoryCacheTests(unittest.TestCase):
+    """Tests for the `InventoryCache` utility."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        self.directory = Path(directory.name)
+        self.cache = InventoryCache(self.directory)
+
+    def test_stored_inventory_is_loaded(self):
+        """A stored inventory should be parsed from disk, also by a new cache instance."""
+        self.cache.store("https://a/objects.inv", make_inventory("foo"), '"etag"', None)
+
+        entry = InventoryCache(self.directory).get("https://a/objects.inv")
+        inventory = self.cache.load(entry)
+
+        self.assertEqual(inventory, {"py:function": {"foo": ("test", "1.0", "api.html#foo", "-")}})
+        self.assertEqual(entry.conditional_headers, {"If-None-Match": '"etag"'})
+
+    def test_digest_changes_with_contents(self):
+        """The digest should only change if the contents of the inventory do."""
+        first = self.cache.store("https://a/objects.inv", make_inventory("foo"), None, None)
+        same = self.cache.store("https://a/objects.inv", make_inventory("foo"), None, "Mon, 01 Jan 2020")
+        self.assertEqual(first.digest, same.digest)
+
+        changed = self.cache.store("https://a/objects.inv", make_inventory("bar"), None, None)
+        self.assertNotEqual(first.digest, changed.digest)
+        self.assertEqual(list(self.cache.load(changed)["py:function"]), ["bar"])
+
+    def test_prune_removes_other_inventories(self):
+        """Pruning should delete the files of inventories which aren't kept."""
+        kept = self.cache.store("https://a/objects.inv", make_inventory("foo"), None, None)
+        removed = self.cache.store("https://b/objects.inv", make_inventory("bar"), None, None)
+
+        self.cache.prune(["https://a/objects.inv"])
+
+        self.assertEqual(InventoryCache(self.directory).index, {"https://a/objects.inv": kept})
+        self.assertTrue((self.directory / kept.file_name).exists())
+        self.assertFalse((self.directory / removed.file_name).exists())
+
+    def test_corrupt_index_is_ignored(self):
+        """An unreadable index should result in an empty cache."""
+        (self.directory / "index.json").write_text("{not json", encoding="utf-8")
+
+        self.assertIsNone(self.cache.get("https://a/objects.inv"))
+
+
+class InventoryDecoderTests(unittest.TestCase):
+    """Tests for the `InventoryDecoder` utility."""
+
+    def test_decoding_in_chunks_matches_sphinx(self):
+        """The inventory should be parsed the same way as Sphinx does, regardless of chunk sizes."""
+        data = make_inventory(*(f"module.symbol_{number}" for number in range(100)))
+        expected = parse_inventory(io.BytesIO(data))
+
+        for chunk_size in (1, 7, 100, len(data)):
+            with self.subTest(chunk_size=chunk_size):
+                decoder = InventoryDecoder()
+                for start in range(0, len(data), chunk_size):
+                    decoder.feed(data[start:start + chunk_size])
+
+                self.assertEqual(decoder.close(), expected)
+                self.assertEqual(decoder.data, data)
+
+    def test_legacy_inventory_is_parsed(self):
+        """Uncompressed version 1 inventories should be parsed once all data is in."""
+        decoder = InventoryDecoder()
+        decoder.feed(b"# Sphinx inventory version 1\n# Project: test\n# Version: 1.0\nfoo function api.html\n")
+
+        self.assertEqual(decoder.close(), {"py:function": {"foo": ("test", "1.0", "api.html#foo", "-")}})
+
+    def test_invalid_inventories_raise(self):
+        """Inventories with a wrong header, corrupt data, or missing data should raise ValueError."""
+        valid = make_inventory("foo")
+        header_end = valid.index(b"zlib.\n") + len(b"zlib.\n")
+
+        subtests = (
+            ("wrong header", b"<html>Not found</html>\n"),
+            ("corrupt", valid[:header_end] + b"not compressed data"),
+            ("truncated", valid[:-4]),
+            ("no data", b""),
+        )
+
+        for name, data in subtests:
+            with self.subTest(inventory=name):
+                decoder = InventoryDecoder()
+                with self.assertRaises(ValueError):
+                    decoder.feed(data)
+                    decoder.close()
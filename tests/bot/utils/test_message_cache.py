@@ -0,0 +1,125 @@
+import unittest
+from datetime import datetime, timedelta
+
+from bot.utils.message_cache import MessageCache, MessageWindow
+from tests.helpers import MockMessage, MockTextChannel
+
+
+NOW = datetime(2020, 1, 1, 12, 0, 0)
+
+
+def make_msg(message_id: int, seconds_ago: float, channel_id: int = 1) -> MockMessage:
+    """Make a message in the channel with ID `channel_id` sent `seconds_ago` seconds before `NOW`."""
+    return MockMessage(
+        id=message_id,
+        created_at=NOW - timedelta(seconds=seconds_ago),
+        channel=MockTextChannel(id=channel_id),
+    )
+
+
+class MessageWindowTests(unittest.TestCase):
+    """Tests for the `MessageWindow` time-bounded buffer."""
+
+    def setUp(self):
+        self.window = MessageWindow(interval=10, maxlen=5)
+
+    def test_recent_returns_newest_first_within_interval(self):
+        """`recent` only returns messages newer than the given amount of seconds, newest first."""
+        messages = [make_msg(i, seconds_ago) for i, seconds_ago in enumerate((8, 6, 3, 1))]
+        for message in messages:
+            self.window.append(message)
+
+        self.assertListEqual(self.window.recent(5, NOW), [messages[3], messages[2]])
+        self.assertListEqual(self.window.recent(10, NOW), messages[::-1])
+
+    def test_append_evicts_expired_messages(self):
+        """Messages older than the window's interval are evicted when a new message arrives."""
+        old = make_msg(1, 30)
+        new = make_msg(2, 0)
+        self.window.append(old)
+        self.window.append(new)
+
+        self.assertNotIn(old.id, self.window)
+        self.assertListEqual(list(self.window), [new])
+
+    def test_append_respects_maxlen(self):
+        """The window never holds more than `maxlen` messages."""
+        messages = [make_msg(i, 0) for i in range(8)]
+        for message in messages:
+            self.window.append(message)
+
+        self.assertEqual(len(self.window), 5)
+        self.assertListEqual(list(self.window), messages[:2:-1])
+
+    def test_replace_updates_buffered_message(self):
+        """Edited messages replace the buffered copy, but unknown messages are ignored."""
+        original = make_msg(1, 1)
+        edited = make_msg(1, 1)
+        self.window.append(original)
+
+        self.assertTrue(self.window.replace(edited))
+        self.assertFalse(self.window.replace(make_msg(2, 1)))
+        self.assertListEqual(self.window.recent(10, NOW), [edited])
+
+    def test_remove_drops_message(self):
+        """Removed messages are no longer returned."""
+        first, second = make_msg(1, 2), make_msg(2, 1)
+        self.window.append(first)
+        self.window.append(second)
+
+        self.assertIs(self.window.remove(first.id), first)
+        self.assertIsNone(self.window.remove(first.id))
+        self.assertListEqual(self.window.recent(10, NOW), [second])
+
+
+class MessageCacheTests(unittest.TestCase):
+    """Tests for the per-channel `MessageCache`."""
+
+    def setUp(self):
+        self.cache = MessageCache(interval=10)
+
+    def test_messages_are_kept_per_channel(self):
+        """Messages are only returned for the channel they were sent in."""
+        first, second = make_msg(1, 1, channel_id=1), make_msg(2, 1, channel_id=2)
+        self.cache.add(first)
+        self.cache.add(second)
+
+        self.assertListEqual(self.cache.recent(1, 10, NOW), [first])
+        self.assertListEqual(self.cache.recent(2, 10, NOW), [second])
+        self.assertListEqual(self.cache.recent(3, 10, NOW), [])
+
+    def test_update_and_remove(self):
+        """Edits and deletions are applied to the right channel's window."""
+        message = make_msg(1, 1)
+        edited = make_msg(1, 1)
+        self.cache.add(message)
+
+        self.cache.update(edited)
+        self.assertListEqual(self.cache.recent(1, 10, NOW), [edited])
+
+        self.cache.remove(1, message.id)
+        self.assertListEqual(self.cache.recent(1, 10, NOW), [])
+        self.assertIsNone(self.cache.get_window(1))
+
+    def test_idle_channel_windows_are_swept(self):
+        """The windows of channels without unexpired messages are dropped by the sweep in `add`."""
+        self.cache.add(make_msg(1, 30, channel_id=1))
+        self.cache.add(make_msg(2, 25, channel_id=2))
+        self.assertIsNotNone(self.cache.get_window(1))
+
+        self.cache.add(make_msg(3, 0, channel_id=3))
+
+        self.assertIsNone(self.cache.get_window(1))
+        self.assertIsNone(self.cache.get_window(2))
+        self.assertEqual(len(self.cache), 1)
+
+    def test_sweep_keeps_windows_with_unexpired_messages(self):
+        """Only the expired messages of a window are evicted by the sweep."""
+        old, new = make_msg(1, 15), make_msg(2, 5)
+        self.cache.add(old)
+        self.cache.add(new)
+
+        self.cache.sweep(NOW)
+
+        self.assertListEqual(self.cache.recent(1, 10, NOW), [new])
+        self.assertNotIn(old.id, self.cache.get_window(1))
@@ -0,0 +1,53 @@
+import unittest
+from unittest.mock import patch
+
+from bot.utils import message_features
+from tests.helpers import MockAttachment, MockMessage
+
+
+class MessageFeaturesTests(unittest.TestCase):
+    """Tests for the shared per-message feature extraction."""
+
+    def test_features_are_extracted_from_content(self):
+        """All quantities the rules look at are extracted from the message."""
+        message = MockMessage(
+            id=1,
+            content="hi <:lemon:1> <:lemon:2>\n\n\nhttps://pydis.com HTTP://python.org\nbye",
+            mentions=["alice", "bob"],
+            role_mentions=["role"],
+            attachments=[MockAttachment()],
+        )
+        features = message_features.MessageFeatures(message)
+
+        self.assertEqual(features.chars, len(message.content))
+        self.assertEqual(features.newlines, 4)
+        self.assertEqual(features.max_newline_group, 3)
+        self.assertEqual(features.emojis, 2)
+        self.assertEqual(features.links, ("https://pydis.com", "HTTP://python.org"))
+        self.assertEqual(features.mentions, 2)
+        self.assertEqual(features.role_mentions, 1)
+        self.assertEqual(features.attachments, 1)
+
+    def test_get_features_caches_by_message_id(self):
+        """Features are only extracted again once the message was edited."""
+        message = MockMessage(id=1, content="spam")
+        features = message_features.get_features(message)
+
+        self.assertIs(message_features.get_features(message), features)
+
+        edited = MockMessage(id=1, content="ham", edited_at=message.edited_at)
+        self.assertEqual(message_features.get_features(edited).chars, 3)
+
+    @patch("bot.utils.message_features.CACHE_SIZE", 2)
+    @patch("bot.utils.message_features._cache", new_callable=message_features.OrderedDict)
+    def test_get_features_evicts_least_recently_used(self, cache):
+        """Once the cache is full, the features of the least recently used message are dropped."""
+        first, second, third = (MockMessage(id=id_, content="spam") for id_ in range(3))
+
+        first_features = message_features.get_features(first)
+        message_features.get_features(second)
+        message_features.get_features(first)
+        message_features.get_features(third)
+
+        self.assertEqual(list(cache), [first.id, third.id])
+        self.assertIs(message_features.get_features(first), first_features)
@@ -0,0 +1,108 @@
+import random
+import string
+import unittest
+
+from bot.utils.trigrams import SubstringIndex, TrigramIndex, trigrams
+
+
+class CountingList(list):
+    """A list which counts how many of its items were looked up."""
+
+    lookups = 0
+
+    def __getitem__(self, index):
+        self.lookups += 1
+        return super().__getitem__(index)
+
+
+class TrigramIndexTests(unittest.TestCase):
+    """Tests for the `TrigramIndex` utility."""
+
+    def setUp(self):
+        self.keys = [
+            "aiohttp.ClientSession",
+            "aiohttp.ClientSession.get",
+            "aiohttp.ClientResponse",
+            "asyncio.gather",
+            "asyncio.get_event_loop",
+            "discord.ext.commands.Bot",
+        ]
+        self.index = TrigramIndex(self.keys)
+
+    def test_prefix_matches_come_first(self):
+        """Keys starting with the query are returned in alphabetical order, ignoring case."""
+        self.assertEqual(
+            self.index.prefix_search("AIOHTTP.client", limit=10),
+            ["aiohttp.ClientResponse", "aiohttp.ClientSession", "aiohttp.ClientSession.get"],
+        )
+        self.assertEqual(self.index.prefix_search("aiohttp.", limit=1), ["aiohttp.ClientResponse"])
+
+    def test_fuzzy_matches_are_ranked_by_similarity(self):
+        """Misspelt keys are found, the most similar first."""
+        matches = self.index.fuzzy_search("asyncio.gahter", limit=10, threshold=0.5)
+
+        self.assertEqual(matches[0][0], "asyncio.gather")
+        self.assertTrue(all(first[1] >= second[1] for first, second in zip(matches, matches[1:])))
+
+    def test_fuzzy_search_agrees_with_scoring_every_key(self):
+        """The index finds the same keys as scoring every key would."""
+        for query in ("ClientSesion", "discord.Bot", "get_event", "gather", "xyz"):
+            for threshold in (0.3, 0.6, 0.8):
+                with self.subTest(query=query, threshold=threshold):
+                    query_trigrams = trigrams(query.casefold())
+                    expected = {
+                        key for key in self.keys
+                        if 2 * len(query_trigrams & trigrams(key.casefold()))
+                        / (len(query_trigrams) + len(trigrams(key.casefold()))) >= threshold
+                    }
+
+                    found = {key for key, _ in self.index.fuzzy_search(query, limit=100, threshold=threshold)}
+                    self.assertEqual(found, expected)
+
+    def test_fuzzy_search_of_typo_scores_few_keys(self):
+        """A misspelt key among many is found while scoring only a small fraction of the keys."""
+        rng = random.Random(0)
+
+        def word():
+            return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12)))
+
+        modules = [f"{word()}.{word()}" for _ in range(100)]
+        keys = list(dict.fromkeys(f"{rng.choice(modules)}.{word()}" for _ in range(20_000)))
+        index = TrigramIndex(keys)
+        index._trigrams = CountingList(index._trigrams)
+
+        for key in rng.sample(keys, 10):
+            position = rng.randrange(len(key))
+            query = key[:position] + rng.choice(string.ascii_lowercase) + key[position + 1:]
+
+            with self.subTest(query=query):
+                index._trigrams.lookups = 0
+                found = [match for match, _ in index.fuzzy_search(query, limit=len(keys))]
+
+                self.assertIn(key, found)
+                self.assertLess(index._trigrams.lookups, len(keys) / 100)
+
+    def test_search_combines_prefix_and_fuzzy_matches(self):
+        """Prefix matches are followed by fuzzy matches, without duplicates."""
+        self.assertEqual(self.index.search("asyncio.gather", limit=3), ["asyncio.gather"])
+        self.assertEqual(self.index.search("asyncio.gathre", limit=3), ["asyncio.gather"])
+        self.assertEqual(self.index.search("nothing like it"), [])
+
+
+class SubstringIndexTests(unittest.TestCase):
+    """Tests for the `SubstringIndex` utility."""
+
+    def test_search_agrees_with_scanning_every_text(self):
+        """The index finds the same texts as searching each of them would, ignoring case."""
+        texts = {
+            "pep8": "PEP 8 is the style guide for Python code.",
+            "f-strings": "Use f-strings to format strings, e.g. f'{value!r}'.",
+            "classmethod": "A classmethod receives the class as its first argument.",
+            "none": "",
+        }
+        index = SubstringIndex(texts)
+
+        for query in ("style", "STRINGS", "f-str", "ass", "class as", "e.g. f'{", "py", "", "missing"):
+            with self.subTest(query=query):
+                expected = {key for key, text in texts.items() if query.casefold() in text.casefold()}
+                self.assertEqual(index.search(query), expected)
@@ -0,0 +1,88 @@
+import random
+import re
+import unittest
+
+from bot.constants import Filter
+from bot.utils.watchlist import Watchlist, literal_prefix
+
+
+EXPRESSIONS = (*Filter.word_watchlist, *Filter.token_watchlist)
+
+
+def sequential_search(expressions: tuple, text: str) -> re.Match:
+    """Search `text` for every expression in order, the way the watchlist used to be checked."""
+    for expression in expressions:
+        match = re.search(expression, text, flags=re.IGNORECASE)
+        if match:
+            return match
+
+
+class LiteralPrefixTests(unittest.TestCase):
+    """Tests for extracting the literal prefix of an expression."""
+
+    def test_literal_prefix(self):
+        """The prefix consists of the leading literals, including the first occurrence of a repeat."""
+        test_values = (
+            ("goo+ks*", "goo"),
+            ("ky+s+", "ky"),
+            (r"\bSuicide", "suicide"),
+            ("cuck(?!oo+)", "cuck"),
+            ("(re+)tar+(d+|t+)(ed)?", ""),
+            ("a*b", ""),
+            ("卐", "卐"),
+            ("aßb", "a"),
+            ("abc|def", ""),
+            ("abc|abd", "ab"),
+            ("[|]ab(c|d)", "|ab"),
+            (r"a\.b\d", "a.b"),
+            ("ab{2}c", "ab"),
+            ("ab(?#c)*", "a"),
+            ("(?i)AB?c", "a"),
+            ("(?x)a b", "ab"),
+        )
+
+        for expression, prefix in test_values:
+            with self.subTest(expression=expression, prefix=prefix):
+                self.assertEqual(literal_prefix(expression, re.IGNORECASE), prefix)
+
+
+class WatchlistTests(unittest.TestCase):
+    """Tests for the indexed `Watchlist` matcher."""
+
+    def setUp(self):
+        self.watchlist = Watchlist(EXPRESSIONS)
+
+    def test_search_returns_first_matching_expression(self):
+        """The match of the first expression in the configured order is returned."""
+        match = self.watchlist.search("this is not a rape joke about suicide")
+
+        self.assertEqual(match.re.pattern, "suicide")
+        self.assertEqual(match.span(), (30, 37))
+
+    def test_search_is_case_insensitive(self):
+        """Case-insensitive matches are found, including for letters that don't casefold to ASCII."""
+        test_values = ("SUICIDE", "SuIcIdE", "suıcıde", "SUİCİDE")
+
+        for text in test_values:
+            with self.subTest(text=text):
+                self.assertIsNotNone(self.watchlist.search(text))
+
+    def test_search_without_match(self):
+        """None is returned if none of the expressions match."""
+        self.assertIsNone(self.watchlist.search("a perfectly friendly message"))
+
+    def test_search_agrees_with_sequential_search(self):
+        """Indexed search gives the same result as searching for every expression in order."""
+        rng = random.Random(0)
+        words = ("hello", "gooks", "KYS", "retarded", "cuckoo", "cuck", "tarrd", "Rape", "spick", "卍", "İ", "friend")
+
+        for _ in range(500):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 6)))
+            expected = sequential_search(EXPRESSIONS, text)
+            actual = self.watchlist.search(text)
+
+            with self.subTest(text=text):
+                self.assertEqual(
+                    (actual.re.pattern, actual.span()) if actual else None,
+                    (expected.re.pattern, expected.span()) if expected else None,
+                )
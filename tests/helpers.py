@@ -389,7 +389,7 @@ class MockMessage(CustomMockMixin, unittest.mock.MagicMock):
     spec_set = message_instance
 
     def __init__(self, **kwargs) -> None:
-        default_kwargs = {'attachments': []}
+        default_kwargs = {'attachments': [], 'content': ''}
         super().__init__(**collections.ChainMap(kwargs, default_kwargs))
         self.author = kwargs.get('author', MockMember())
         self.channel = kwargs.get('channel', MockTextChannel())